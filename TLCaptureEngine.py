@@ -0,0 +1,80 @@
+'''
+Capture engine for the tip locator application.
+Owns the camera (or a frame source standing in for it, such as TLSyntheticCamera) and grabs frames continuously
+on its own thread, separate from the Qt event loop.
+Each frame is stamped with the monotonic time it was captured, the red pixels are counted and the
+(timestamp, pixel count) sample is published to every subscriber.
+'''
+
+## Imports
+# Built in modules
+import threading
+try:
+    import SimpleCV # computer vision handler
+except ImportError:
+    # A frame source such as TLSyntheticCamera can be used without SimpleCV
+    SimpleCV = None
+# Custom modules
+import TLClock # Monotonic time used to stamp the frames
+import TLTrace # Spans of the frame capture and count
+
+# Capture engine that runs on its own thread
+class CaptureEngine(threading.Thread):
+    def __init__(self,redPixelCounter,cameraIndex=0,camera=None):
+        # Initializes the thread, as a daemon so that it closes with the application
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        # Creates the camera that will be used to capture the video feed, unless a frame source with a getImage method is given
+        self.camera = SimpleCV.Camera(cameraIndex) if camera is None else camera
+        # Counting engine used to count the red pixels in each frame
+        self.redPixelCounter = redPixelCounter
+
+        # Functions called with (timestamp, pixelCount) for every frame
+        self._subscribers = []
+        self._subscribersLock = threading.Lock()
+
+        # Event used to stop the capture loop
+        self._stopCapture = threading.Event()
+
+        # Number of frames captured and the capture time of the last frame
+        self.frameCount = 0
+        self.lastFrameTime = None
+
+    # Method to add a function that receives the (timestamp, pixelCount) sample of every frame
+    def subscribe(self,subscriber):
+        with self._subscribersLock:
+            self._subscribers.append(subscriber)
+
+    # Method to remove a subscriber
+    def unsubscribe(self,subscriber):
+        with self._subscribersLock:
+            self._subscribers.remove(subscriber)
+
+    # Method for capturing the video feed, runs until the capture engine is stopped
+    def run(self):
+        while not self._stopCapture.is_set():
+            # Grabs the next frame from the camera and stamps it with the time it was captured
+            with TLTrace.span('getImage','capture'):
+                videoFeed = self.camera.getImage()
+            captureTime = TLClock.monotonicTime()
+            # Counts the number of red pixels above the threshold value straight from the frame buffer
+            with TLTrace.span('countRedPixels','capture') as countSpan:
+                pixelSum = self.redPixelCounter.countRedPixels(videoFeed.getNumpyCv2())
+                countSpan.annotate(pixelCount=pixelSum)
+
+            self.frameCount += 1
+            self.lastFrameTime = captureTime
+
+            # Publishes the sample to all of the subscribers
+            with self._subscribersLock:
+                subscribers = list(self._subscribers)
+            for subscriber in subscribers:
+                subscriber(captureTime,pixelSum)
+
+    # Method to stop the capture loop and release the camera
+    def stop(self):
+        self._stopCapture.set()
+        if self.is_alive():
+            self.join(1)
+        self.camera = None
@@ -1,44 +1,271 @@
 '''
 Circle fitting module for the tip locator application.
 Accepts the input of data points and fits a 2D circle to the data points
+Batches of point sets, an (N, k, 2) array, are fitted in one call on plain arrays. Point sets with fewer than
+k points are padded with nan.
+The fit method is selected per call: 'algebraic' (closed form Kasa fit), 'taubin' (algebraic fit without the bias
+of the Kasa fit on short arcs) or 'geometric' (Levenberg-Marquardt fit of the distances of the points to the circle,
+started from the Taubin fit). Outlying points can be rejected with 'huber' (iteratively reweighted fit) or
+'ransac' (consensus of the circles through random triplets of points).
 '''
 
 ## Imports
 # Built in imports
+import warnings
 import numpy as np
-from math import sqrt
 # Custom imports
 
-class CircleFit():
-    def __init__(self):
-        print('FitCircle __init__ accessed')
+# Largest condition number of the normal equations of a point set that is still fitted
+maximumConditionNumber = 1e8
 
-    # Method for fitting the circle, pass in orthoginal coordinate point data to fit
-    def fitCircle(self,x,y):
+# Iterations of the Newton solve of the Taubin fit, of the Levenberg-Marquardt fit and of the Huber reweighting
+taubinIterations = 30
+geometricIterations = 20
+huberIterations = 5
+# Tuning constant of the Huber weights, in robust standard deviations of the residuals
+huberTuning = 1.345
+# Number of random triplets drawn for each point set by RANSAC and the inlier threshold in robust standard deviations
+ransacSamples = 100
+ransacThreshold = 3.0
+# Smallest standard deviation of the edge positions taken by RANSAC [mm], so the threshold of a clean point set is not
+# set by the few points that happen to lie on the circle through a triplet
+ransacNoiseFloor = 0.002
+# Smallest fraction of the points of a set that RANSAC keeps, sets without such a consensus keep all their points
+ransacMinimumInlierFraction = 0.5
+
+# Function that fits a circle to each point set of a batch, points is an (N, k, 2) array (or a (k, 2) array for a single set)
+# method is 'algebraic', 'taubin' or 'geometric' and outlierRejection is None, 'huber' or 'ransac'
+# For RANSAC the inlier threshold can be given in the units of the points, it defaults to a multiple of the least median residual
+# (at least ransacThreshold times noiseFloor, in the units of the points)
+# Returns (centers, radii, residuals, conditionNumbers), with the (N, 2) centers, the N radii, the (N, k) radial residuals
+# of the points (nan for padding) and the N condition numbers of the normal equations
+# The fit of a point set with less than three points or a condition number above the maximum (points on a line) is nan
+def fitCircles(points,method='algebraic',outlierRejection=None,inlierThreshold=None,randomState=None,noiseFloor=ransacNoiseFloor):
+    points = np.asarray(points,dtype=float)
+    singleSet = points.ndim == 2
+    if singleSet:
+        points = points[np.newaxis]
+
+    # Padding points are given no weight
+    weights = np.all(np.isfinite(points),axis=2).astype(float)
+    numberOfPoints = weights.sum(axis=1)
+    filledPoints = np.where(weights[:,:,np.newaxis] > 0,points,0.0)
+
+    # Centers and scales each point set so that the conditioning does not depend on where the circle is
+    pointCenters = (filledPoints * weights[:,:,np.newaxis]).sum(axis=1) / np.maximum(numberOfPoints,1)[:,np.newaxis]
+    shiftedPoints = (filledPoints - pointCenters[:,np.newaxis,:]) * weights[:,:,np.newaxis]
+    pointScales = np.sqrt((shiftedPoints**2).sum(axis=(1,2)) / np.maximum(numberOfPoints,1))
+    pointScales[pointScales == 0] = 1.0
+    shiftedPoints /= pointScales[:,np.newaxis,np.newaxis]
+
+    # Point sets that can not be fitted are solved as the unit circle and set to nan
+    conditionNumbers = _conditionNumbers(shiftedPoints,weights)
+    fitted = (numberOfPoints >= 3) & np.isfinite(conditionNumbers) & (conditionNumbers < maximumConditionNumber)
+
+    # Rejects the outliers of each point set before the fit (RANSAC) or downweights them during it (Huber)
+    if outlierRejection == 'ransac':
+        if inlierThreshold is not None:
+            inlierThreshold = np.broadcast_to(np.asarray(inlierThreshold,dtype=float),pointScales.shape) / pointScales
+        inliers = _ransacInliers(shiftedPoints,weights,fitted,inlierThreshold,randomState,noiseFloor / pointScales)
+        weights = weights * inliers
+        fitted &= inliers.sum(axis=1) >= 3
+    elif outlierRejection not in (None, 'huber'):
+        raise ValueError('Unknown outlier rejection: {}'.format(outlierRejection))
+
+    robustWeights = np.ones_like(weights)
+    for iteration in range(huberIterations if outlierRejection == 'huber' else 1):
+        (centers, radii) = _fitMethod(method,shiftedPoints,weights * robustWeights,fitted)
+        if outlierRejection == 'huber':
+            robustWeights = _huberWeights(_radialResiduals(shiftedPoints,centers,radii),weights)
+
+    # Center and radius back in the coordinates of the points
+    centers = pointCenters + pointScales[:,np.newaxis] * centers
+    radii = pointScales * radii
+    centers[~fitted] = np.nan
+    radii[~fitted] = np.nan
+
+    # Distance of each point from the fitted circle
+    with np.errstate(invalid='ignore'):
+        residuals = np.sqrt(((points - centers[:,np.newaxis,:])**2).sum(axis=2)) - radii[:,np.newaxis]
+
+    if singleSet:
+        return centers[0], radii[0], residuals[0], conditionNumbers[0]
+    return centers, radii, residuals, conditionNumbers
+
+# Function that returns the condition number of the normal equations of the algebraic fit of each point set
+def _conditionNumbers(shiftedPoints,weights):
+    design = np.concatenate((shiftedPoints,np.ones_like(weights)[:,:,np.newaxis]),axis=2)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        return np.linalg.cond(np.einsum('nk,nki,nkj->nij',weights,design,design))
+
+# Function that fits the circles with a method, in the centered and scaled coordinates
+def _fitMethod(method,shiftedPoints,weights,fitted):
+    if method == 'algebraic':
+        return _fitAlgebraic(shiftedPoints,weights,fitted)
+    elif method == 'taubin':
+        return _fitTaubin(shiftedPoints,weights,fitted)
+    elif method == 'geometric':
+        (centers, radii) = _fitTaubin(shiftedPoints,weights,fitted)
+        return _fitGeometric(shiftedPoints,weights,fitted,centers,radii)
+    raise ValueError('Unknown circle fit method: {}'.format(method))
 
-        x = np.squeeze(np.asarray(x))
-        y = np.squeeze(np.asarray(y))
+# Function that returns the radial residuals of the points (zero for padding)
+def _radialResiduals(shiftedPoints,centers,radii):
+    return np.sqrt(((shiftedPoints - centers[:,np.newaxis,:])**2).sum(axis=2)) - radii[:,np.newaxis]
 
-        # print('fitCircle accessed')
-        coefA = np.matrix((x, y, np.ones(len(x)))).getT()
-        coefB = []
+# Function that returns the robust standard deviation (scaled median absolute residual) of the points of each set
+def _robustSpread(residuals,weights):
+    absoluteResiduals = np.where(weights > 0,np.abs(residuals),np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        spread = 1.4826 * np.nanmedian(absoluteResiduals,axis=1)
+    # Exact fits keep a floor relative to the scaled coordinates
+    return np.maximum(np.nan_to_num(spread),1e-6)
 
-        for i in  range(0,len(x)):
-            coefB.append(-(x[i]**2+y[i]**2))
+# Closed form algebraic (Kasa) fit, solves u*D + v*E + F = -(u^2 + v^2) in the least squares sense
+def _fitAlgebraic(shiftedPoints,weights,fitted):
+    design = np.concatenate((shiftedPoints,np.ones_like(weights)[:,:,np.newaxis]),axis=2)
+    target = -(shiftedPoints**2).sum(axis=2)
+    normalMatrices = np.einsum('nk,nki,nkj->nij',weights,design,design)
+    normalTargets = np.einsum('nk,nki,nk->ni',weights,design,target)
+    normalMatrices[~fitted] = np.eye(3)
+    (D, E, F) = np.linalg.solve(normalMatrices,normalTargets[:,:,np.newaxis])[:,:,0].T
+    return np.column_stack((-D / 2,-E / 2)), np.sqrt(np.maximum((D**2 + E**2) / 4 - F,0))
 
-        coefB = np.matrix(coefB).getT()
+# Taubin fit, the algebraic fit normalized by the mean gradient, solved with Newton's method on its characteristic polynomial
+def _fitTaubin(shiftedPoints,weights,fitted):
+    totalWeights = np.where(fitted,weights.sum(axis=1),1.0)
+    meanPoints = np.einsum('nk,nki->ni',weights,shiftedPoints) / totalWeights[:,np.newaxis]
+    (x, y) = np.rollaxis(shiftedPoints - meanPoints[:,np.newaxis,:],2)
+    z = x**2 + y**2
+    moment = lambda values: (weights * values).sum(axis=1) / totalWeights
+    (Mxx, Myy, Mxy, Mxz, Myz, Mzz) = (moment(x * x), moment(y * y), moment(x * y), moment(x * z), moment(y * z), moment(z * z))
+    Mz = Mxx + Myy
+    covarianceXY = Mxx * Myy - Mxy**2
 
-        # print(coefA)
-        # print(coefB)
+    # Coefficients of the characteristic polynomial, its smallest positive root is found from zero
+    A3 = 4 * Mz
+    A2 = -3 * Mz**2 - Mzz
+    A1 = Mzz * Mz + 4 * covarianceXY * Mz - Mxz**2 - Myz**2 - Mz**3
+    A0 = Mxz**2 * Myy + Myz**2 * Mxx - Mzz * covarianceXY - 2 * Mxz * Myz * Mxy + Mz**2 * covarianceXY
+    root = np.zeros_like(Mz)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        for iteration in range(taubinIterations):
+            value = A0 + root * (A1 + root * (A2 + root * A3))
+            derivative = A1 + root * (2 * A2 + root * 3 * A3)
+            newRoot = root - value / derivative
+            root = np.where(np.isfinite(newRoot) & (newRoot >= 0),newRoot,root)
 
-        coefficients = np.linalg.lstsq(coefA,coefB)
+        determinant = 2 * (root**2 - root * Mz + covarianceXY)
+        centers = np.column_stack(((Mxz * (Myy - root) - Myz * Mxy) / determinant,(Myz * (Mxx - root) - Mxz * Mxy) / determinant))
+    radii = np.sqrt((centers**2).sum(axis=1) + Mz)
+    centers += meanPoints
 
-        print(coefficients[0])
+    # Falls back to the algebraic fit where the Newton solve failed
+    failed = fitted & ~(np.all(np.isfinite(centers),axis=1) & np.isfinite(radii))
+    if failed.any():
+        (centers[failed], radii[failed]) = _fitAlgebraic(shiftedPoints[failed],weights[failed],fitted[failed])
+    centers[~fitted] = 0.0
+    radii[~fitted] = 1.0
+    return centers, radii
 
-        center_X = -0.5 * coefficients[0][0]
-        center_Y = -0.5 * coefficients[0][1]
+# Geometric fit, Levenberg-Marquardt minimization of the weighted squared distances of the points to the circles
+def _fitGeometric(shiftedPoints,weights,fitted,centers,radii):
+    (centers, radii) = (centers.copy(), radii.copy())
+    damping = np.full(len(radii),1e-3)
+    cost = lambda centers, radii: (weights * _radialResiduals(shiftedPoints,centers,radii)**2).sum(axis=1)
+    currentCost = cost(centers,radii)
+    for iteration in range(geometricIterations):
+        differences = shiftedPoints - centers[:,np.newaxis,:]
+        distances = np.maximum(np.sqrt((differences**2).sum(axis=2)),1e-12)
+        residuals = distances - radii[:,np.newaxis]
+
+        # Jacobian of the residuals against the center and the radius
+        jacobian = np.concatenate((-differences / distances[:,:,np.newaxis],-np.ones_like(weights)[:,:,np.newaxis]),axis=2)
+        normalMatrices = np.einsum('nk,nki,nkj->nij',weights,jacobian,jacobian)
+        gradients = np.einsum('nk,nki,nk->ni',weights,jacobian,residuals)
+        normalMatrices += np.eye(3) * (damping[:,np.newaxis,np.newaxis] * np.diagonal(normalMatrices,axis1=1,axis2=2)[:,np.newaxis,:] + 1e-12)
+        normalMatrices[~fitted] = np.eye(3)
+        steps = np.linalg.solve(normalMatrices,-gradients[:,:,np.newaxis])[:,:,0]
+
+        # Keeps the steps that lower the cost and adapts the damping
+        (newCenters, newRadii) = (centers + steps[:,:2], radii + steps[:,2])
+        newCost = cost(newCenters,newRadii)
+        improved = fitted & (newCost < currentCost)
+        centers[improved] = newCenters[improved]
+        radii[improved] = newRadii[improved]
+        currentCost = np.where(improved,newCost,currentCost)
+        damping = np.clip(np.where(improved,damping * 0.1,damping * 10),1e-9,1e9)
+    return centers, np.abs(radii)
+
+# Function that returns the Huber weights of the points from their residuals
+def _huberWeights(residuals,weights):
+    tuning = huberTuning * _robustSpread(residuals,weights)
+    return np.minimum(1.0,tuning[:,np.newaxis] / np.maximum(np.abs(residuals),1e-12))
+
+# Function that returns the inliers of the circle through the random triplet of points that best fits each point set
+def _ransacInliers(shiftedPoints,weights,fitted,inlierThreshold,randomState,noiseFloors):
+    if randomState is None:
+        randomState = np.random.RandomState(0)
+    (numberOfSets, numberOfPoints) = weights.shape
+    valid = weights > 0
+    setIndices = np.arange(numberOfSets)[:,np.newaxis,np.newaxis]
+
+    # Draws the triplets from the valid points of each set (moved to the front of the set)
+    validOrder = np.argsort(~valid,axis=1,kind='mergesort')
+    tripletIndices = (randomState.uniform(size=(numberOfSets,ransacSamples,3)) * valid.sum(axis=1)[:,np.newaxis,np.newaxis]).astype(int)
+    triplets = shiftedPoints[setIndices,validOrder[setIndices,tripletIndices]]
+    ((ax, ay), (bx, by), (cx, cy)) = [np.rollaxis(triplets[:,:,corner],2) for corner in range(3)]
+
+    # Circle through each triplet, repeated or aligned points give no circle
+    determinant = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    (aa, bb, cc) = (ax**2 + ay**2, bx**2 + by**2, cx**2 + cy**2)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        tripletCenters = np.stack(((aa * (by - cy) + bb * (cy - ay) + cc * (ay - by)) / determinant,(aa * (cx - bx) + bb * (ax - cx) + cc * (bx - ax)) / determinant),axis=2)
+        tripletRadii = np.hypot(ax - tripletCenters[:,:,0],ay - tripletCenters[:,:,1])
+        distances = np.sqrt(((shiftedPoints[:,np.newaxis,:,:] - tripletCenters[:,:,np.newaxis,:])**2).sum(axis=3))
+        absoluteResiduals = np.abs(distances - tripletRadii[:,:,np.newaxis])
+    absoluteResiduals[~np.isfinite(absoluteResiduals)] = np.inf
+    validCircles = np.abs(determinant) > 1e-12
+
+    # Threshold from the spread of the residuals around the circle with the least median residual when none is given
+    if inlierThreshold is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            medianResiduals = np.nanmedian(np.where(valid[:,np.newaxis,:],absoluteResiduals,np.nan),axis=2)
+        medianResiduals = np.where(validCircles,medianResiduals,np.inf).min(axis=1)
+        spread = 1.4826 * (1 + 5.0 / np.maximum(valid.sum(axis=1) - 3,1)) * np.where(np.isfinite(medianResiduals),medianResiduals,0.0)
+        inlierThreshold = ransacThreshold * np.maximum(spread,np.maximum(noiseFloors,1e-6))
+    inlierThreshold = np.asarray(inlierThreshold)[:,np.newaxis,np.newaxis]
+    inliers = (absoluteResiduals <= inlierThreshold) & valid[:,np.newaxis,:]
+
+    # Scores each circle by its residuals capped at the threshold (MSAC), so ties in the number of inliers go to the closest fit
+    scores = np.where(valid[:,np.newaxis,:],np.minimum(absoluteResiduals,inlierThreshold)**2,0.0).sum(axis=2)
+    minimumInliers = np.maximum(np.ceil(ransacMinimumInlierFraction * valid.sum(axis=1)),3)
+    usable = validCircles & (inliers.sum(axis=2) >= minimumInliers[:,np.newaxis])
+    scores = np.where(usable,scores,np.inf)
+
+    # Sets without a usable triplet keep all their points
+    bestTriplets = np.argmin(scores,axis=1)
+    bestInliers = inliers[np.arange(numberOfSets),bestTriplets]
+    noConsensus = ~usable[np.arange(numberOfSets),bestTriplets]
+    bestInliers[noConsensus] = valid[noConsensus]
+    return bestInliers
+
+class CircleFit():
+    def __init__(self):
+        print('FitCircle __init__ accessed')
+
+    # Method for fitting the circle, pass in orthoginal coordinate point data to fit
+    # The fit method and outlier rejection are those of fitCircles
+    # Returns (center_X, center_Y, radius, coefficients) with the coefficients (D, E, F) of x^2 + y^2 + D*x + E*y + F = 0
+    # Points that can not be fitted (fewer than three or on a line) return nan for all of them
+    def fitCircle(self,x,y,method='algebraic',outlierRejection=None):
+        x = np.ravel(np.asarray(x,dtype=float))
+        y = np.ravel(np.asarray(y,dtype=float))
 
-        radius = sqrt((coefficients[0][0]**2 + coefficients[0][1]**2)/4 - coefficients[0][2])
-        # print(center_X,center_Y,radius)
+        ((center_X, center_Y), radius, residuals, conditionNumber) = fitCircles(np.column_stack((x,y)),method,outlierRejection)
+        (center_X, center_Y, radius) = (float(center_X), float(center_Y), float(radius))
+        coefficients = np.array([-2 * center_X,-2 * center_Y,center_X**2 + center_Y**2 - radius**2])
 
-        return(center_X,center_Y,radius,coefficients)
\ No newline at end of file
+        return(center_X,center_Y,radius,coefficients)
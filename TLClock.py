@@ -0,0 +1,38 @@
+'''
+Clock module for the tip locator application.
+Provides a monotonic time that is shared between the processes of the application so that
+samples stamped in one process can be compared with times taken in another.
+'''
+
+## Imports
+# Built in modules
+import sys
+import time
+import ctypes
+import ctypes.util
+
+# Function that returns the monotonic time in seconds
+try:
+    monotonicTime = time.monotonic
+except AttributeError:
+    # Older versions of python do not have time.monotonic, so CLOCK_MONOTONIC is read through the C library
+    class _timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+    # ID of CLOCK_MONOTONIC (1 on Linux, 6 on OS X)
+    _CLOCK_MONOTONIC = 6 if sys.platform == 'darwin' else 1
+
+    try:
+        _clock_gettime = ctypes.CDLL(ctypes.util.find_library('rt') or ctypes.util.find_library('c')).clock_gettime
+        _clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_timespec)]
+    except (OSError, AttributeError, TypeError):
+        _clock_gettime = None
+
+    if _clock_gettime is None:
+        # Falls back to the wall clock when CLOCK_MONOTONIC is not available
+        monotonicTime = time.time
+    else:
+        def monotonicTime():
+            currentTime = _timespec()
+            _clock_gettime(_CLOCK_MONOTONIC, ctypes.byref(currentTime))
+            return currentTime.tv_sec + currentTime.tv_nsec * 1e-9
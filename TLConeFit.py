@@ -0,0 +1,145 @@
+'''
+Cone fitting module for the tip locator application.
+Fits the laser cone to the edges collected by the routine, estimating the apex (focal point), the direction of the
+axis and the half angle of the cone together, with the standard error of each from the covariance of the fit.
+The axis is parameterized as the direction of (axisX, 1, axisZ), close to the y axis of the stages, and the
+residual of each point is its signed distance to the (double) cone. The fit is converged once the standard errors
+are below the tolerances, so the routine can stop collecting passes.
+'''
+
+## Imports
+# Built in modules
+import math
+import numpy as np
+from scipy import optimize
+# Custom modules
+import TLCircleFit # Method for fitting the cross sections of the cone to circles
+
+# Cone fitter of a routine
+class ConeFit():
+    def __init__(self,laserSlope,apexTolerance=0.02,axisTolerance=0.01,halfAngleTolerance=0.002,levelSpacing=0.001):
+        # Change of the cone radius along y, the initial half angle when the points do not give one
+        self.laserSlope = laserSlope
+        # Standard errors under which the fit is converged: apex [mm], axis direction and half angle [rad]
+        self.apexTolerance = apexTolerance
+        self.axisTolerance = axisTolerance
+        self.halfAngleTolerance = halfAngleTolerance
+        # Smallest change of y between the passes of two different cross sections [mm]
+        self.levelSpacing = levelSpacing
+
+        self.clear()
+
+    # Method to forget the fit of the previous routine
+    def clear(self):
+        # Fitted apex, unit axis direction (pointing to +y) and half angle, None before a fit
+        self.apex = None
+        self.axis = None
+        self.halfAngle = None
+        # Standard errors of the apex coordinates, of the axis tilt along x and z and of the half angle
+        self.apexError = None
+        self.axisError = None
+        self.halfAngleError = None
+        # RMS distance of the points to the fitted cone and number of points fitted
+        self.residualRMS = None
+        self.numberOfPoints = 0
+
+    # Method that returns the signed distance of each (N, 3) point to the cone of the parameters
+    # (apex x, apex y, apex z, axisX, axisZ, half angle)
+    def residuals(self,parameters,points):
+        (apex, axis, halfAngle) = self._unpack(parameters)
+        offsets = points - apex
+        heights = offsets.dot(axis)
+        radialDistances = np.sqrt(np.maximum((offsets**2).sum(axis=1) - heights**2,0))
+        return radialDistances * math.cos(halfAngle) - np.abs(heights) * math.sin(halfAngle)
+
+    # Method that returns the (N, 6) Jacobian of the residuals against the parameters
+    def jacobian(self,parameters,points):
+        (apex, axis, halfAngle) = self._unpack(parameters)
+        offsets = points - apex
+        heights = offsets.dot(axis)
+        radialOffsets = offsets - heights[:,np.newaxis] * axis
+        radialDistances = np.maximum(np.sqrt((radialOffsets**2).sum(axis=1)),1e-12)
+        (cosine, sine) = (math.cos(halfAngle), math.sin(halfAngle))
+        signs = np.sign(heights)
+
+        # Against the apex, the point moves away from it along the radial direction and along the axis
+        apexDerivatives = -cosine * radialOffsets / radialDistances[:,np.newaxis] + (sine * signs)[:,np.newaxis] * axis
+        # Against the axis direction, through the normalization of (axisX, 1, axisZ)
+        directionDerivatives = -offsets * (cosine * heights / radialDistances + sine * signs)[:,np.newaxis]
+        axisVectorNorm = math.sqrt(1 + parameters[3]**2 + parameters[4]**2)
+        projection = (np.eye(3) - np.outer(axis,axis)) / axisVectorNorm
+        axisDerivatives = directionDerivatives.dot(projection[:,[0,2]])
+        # Against the half angle
+        halfAngleDerivatives = -radialDistances * sine - np.abs(heights) * cosine
+        return np.column_stack((apexDerivatives,axisDerivatives,halfAngleDerivatives))
+
+    # Method that returns the apex, unit axis and half angle of the parameters
+    def _unpack(self,parameters):
+        axisVector = np.array([parameters[3],1.0,parameters[4]])
+        return np.asarray(parameters[:3],dtype=float), axisVector / np.linalg.norm(axisVector), parameters[5]
+
+    # Method that returns the initial parameters from the circle of the cross section at each y position of the points
+    # The centers and radii are fitted linearly along y, a single y position uses the y axis and the laser slope
+    def initialParameters(self,points):
+        # Splits the points sorted along y where the gap between two points is larger than the level spacing
+        sortedPoints = points[np.argsort(points[:,1])]
+        levelPoints = np.split(sortedPoints,np.flatnonzero(np.diff(sortedPoints[:,1]) > self.levelSpacing) + 1)
+        levels = np.array([pointSet[:,1].mean() for pointSet in levelPoints])
+        levelPoints = [pointSet[:,[0,2]] for pointSet in levelPoints]
+        paddedPoints = np.full((len(levels),max(len(pointSet) for pointSet in levelPoints),2),np.nan)
+        for (level, pointSet) in enumerate(levelPoints):
+            paddedPoints[level,:len(pointSet)] = pointSet
+        (centers, radii, residuals, conditionNumbers) = TLCircleFit.fitCircles(paddedPoints)
+        fitted = np.isfinite(radii)
+        (levels, centers, radii) = (levels[fitted], centers[fitted], radii[fitted])
+
+        if len(levels) == 0:
+            center = points.mean(axis=0)
+            return np.array([center[0],center[1],center[2],0.0,0.0,math.atan(self.laserSlope)])
+        if len(levels) == 1:
+            (centerSlopes, radiusSlope) = (np.zeros(2), -self.laserSlope)
+        else:
+            centerSlopes = np.array([np.polyfit(levels,centers[:,axis],1)[0] for axis in range(2)])
+            radiusSlope = np.polyfit(levels,radii,1)[0]
+            # Keeps a cone when the radii do not change along y
+            if abs(radiusSlope) < 1e-3 * self.laserSlope:
+                radiusSlope = -self.laserSlope
+
+        # The apex is where the radius reaches zero along the line of the centers
+        apexY = levels[0] - radii[0] / radiusSlope
+        apex = np.array([centers[0,0] + centerSlopes[0] * (apexY - levels[0]),apexY,centers[0,1] + centerSlopes[1] * (apexY - levels[0])])
+        halfAngle = math.atan(abs(radiusSlope) / math.sqrt(1 + (centerSlopes**2).sum()))
+        return np.array([apex[0],apex[1],apex[2],centerSlopes[0],centerSlopes[1],halfAngle])
+
+    # Method that fits the cone to the (N, 3) points, starting from the circles of the cross sections unless initial parameters are given
+    # Returns (apex, axis, halfAngle), the standard errors are kept in the attributes of the fitter
+    def fit(self,points,initialParameters=None):
+        points = np.asarray(points,dtype=float).reshape(-1,3)
+        if initialParameters is None:
+            initialParameters = self.initialParameters(points)
+
+        result = optimize.least_squares(self.residuals,initialParameters,jac=self.jacobian,args=(points,),bounds=([-np.inf] * 5 + [1e-6],[np.inf] * 5 + [math.pi / 2 - 1e-6]),xtol=1e-12,ftol=1e-12)
+        (self.apex, self.axis, self.halfAngle) = self._unpack(result.x)
+        self.numberOfPoints = len(points)
+        self.residualRMS = math.sqrt(np.mean(result.fun**2))
+
+        # Covariance of the parameters from the Jacobian at the solution and the variance of the residuals
+        # The errors are infinite when the points do not constrain all the parameters
+        degreesOfFreedom = len(points) - len(result.x)
+        (singularValues, rightVectors) = np.linalg.svd(result.jac,full_matrices=False)[1:]
+        if degreesOfFreedom > 0 and singularValues[-1] > 1e-9 * singularValues[0]:
+            covariance = (rightVectors.T / singularValues**2).dot(rightVectors) * np.sum(result.fun**2) / degreesOfFreedom
+            standardErrors = np.sqrt(np.diag(covariance))
+        else:
+            standardErrors = np.full(len(result.x),np.inf)
+        self.apexError = standardErrors[:3]
+        # The axis tilt errors scale with the normalization of the axis vector
+        self.axisError = standardErrors[3:5] / (1 + result.x[3]**2 + result.x[4]**2)
+        self.halfAngleError = standardErrors[5]
+        return self.apex, self.axis, self.halfAngle
+
+    # Method that returns True when the last fit has standard errors below the tolerances
+    def converged(self):
+        if self.apex is None:
+            return False
+        return bool(np.all(self.apexError < self.apexTolerance) and np.all(self.axisError < self.axisTolerance) and self.halfAngleError < self.halfAngleTolerance)
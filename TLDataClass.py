@@ -2,6 +2,7 @@
 Data class for the tip locator application.
 This module will be imported and then an instance of the class will be created for each of the
 data points collected during the tip locating routine.
+The points themselves are kept in the data store of TLParameters, the routines append to it directly.
 '''
 
 ## Imports
@@ -20,5 +21,5 @@ class TLData():
         self.pointType = pointType
         self.time = time
 
-        # Adds the instance to the global list of the instances
-        TLParameters.updateDataStorageInstances(self)
\ No newline at end of file
+        # Adds the point to the global data store
+        TLParameters.kHNSCTL_dataStore.append(x,y,z,pixelTriggerValue,pointType,time)
\ No newline at end of file
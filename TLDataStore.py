@@ -0,0 +1,95 @@
+'''
+Data store for the tip locator application.
+Keeps the data points collected during the routines in one NumPy structured array, a column for each field of the
+points, that doubles its capacity when it is full. The positions of the points, of a pass or of a range of points
+are returned as (N, 3) views of the array so the fitters and the CSV writer use them without copies.
+Views are only valid until the store grows or is cleared.
+'''
+
+## Imports
+# Built in modules
+import csv
+import datetime
+import numpy as np
+# Custom modules
+
+# Fields of a data point, the x, y and z coordinates come first so the positions can be viewed as an (N, 3) array
+dataPointType = np.dtype([('x','f8'),('y','f8'),('z','f8'),('pixelTriggerValue','i8'),('pointType','i4'),('passId','i4'),('time','M8[us]')])
+
+# Columnar data point store
+class DataStore():
+    def __init__(self,initialCapacity=64):
+        self._data = np.zeros(initialCapacity,dtype=dataPointType)
+        self._size = 0
+        # Pass the points appended belong to, incremented by startPass
+        self.currentPassId = 0
+
+    def __len__(self):
+        return self._size
+
+    # Method to remove all the points (new routine)
+    def clear(self):
+        self._size = 0
+        self.currentPassId = 0
+
+    # Method to start a new pass, returns its id
+    def startPass(self):
+        self.currentPassId += 1
+        return self.currentPassId
+
+    # Method to add a data point to the current pass (the time is now when not given, a time of day is taken as today)
+    def append(self,x,y,z,pixelTriggerValue,pointType,time=None):
+        if self._size == len(self._data):
+            self._grow()
+        if time is None:
+            time = datetime.datetime.now()
+        elif isinstance(time,datetime.time):
+            time = datetime.datetime.combine(datetime.date.today(),time)
+        self._data[self._size] = (x,y,z,pixelTriggerValue,pointType,self.currentPassId,time)
+        self._size += 1
+        return self._size - 1
+
+    # Method that doubles the capacity of the store
+    def _grow(self):
+        data = np.zeros(max(2 * len(self._data),1),dtype=dataPointType)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    # Method that returns the structured array of the points (a view)
+    def records(self):
+        return self._data[:self._size]
+
+    # Method that returns a column of the points by field name (a view)
+    def column(self,fieldName):
+        return self._data[fieldName][:self._size]
+
+    # Method that returns the (N, 3) positions of the points from the start index to the stop index (a view)
+    def positions(self,start=0,stop=None):
+        allPositions = np.ndarray((self._size,3),dtype='f8',buffer=self._data,strides=(dataPointType.itemsize,8))
+        return allPositions[start:stop]
+
+    # Method that returns the (N, 3) positions of the points of a pass (a view, the passes are appended one after the other)
+    def passPositions(self,passId):
+        passIds = self.column('passId')
+        return self.positions(np.searchsorted(passIds,passId,'left'),np.searchsorted(passIds,passId,'right'))
+
+    # Method that writes the points to a CSV file with the six columns of the data files
+    # The pass of each point is added as a seventh 'Pass' column only when includePass is True
+    def writeCSV(self,fileName,includePass=False):
+        dataFile = open(fileName,'wt')
+        dataWriter = csv.writer(dataFile)
+
+        # Writes the headers
+        headers = ['x','y','z','Pixel Trigger Value','Point Type','Time']
+        if includePass:
+            headers.append('Pass')
+        dataWriter.writerow(headers)
+
+        records = self.records()
+        times = [str(time.time()) for time in records['time'].astype(datetime.datetime)]
+        columns = [records['x'],records['y'],records['z'],records['pixelTriggerValue'],records['pointType'],times]
+        if includePass:
+            columns.append(records['passId'])
+        dataWriter.writerows(zip(*columns))
+
+        dataFile.close()
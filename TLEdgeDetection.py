@@ -0,0 +1,153 @@
+'''
+Edge detection module for the tip locator application.
+Finds the scattering edges (pixel count crossing the threshold) in the (time, pixel count) samples
+streamed during a sweep of the stages, and looks up the stage position at the crossing time from the
+trajectory of the sweep.
+The crossing time is found below the frame interval by fitting a sigmoid (or a line) to the rising or falling
+pixel count profile around the threshold, so the stages can sweep faster for the same precision.
+'''
+
+## Imports
+# Built in modules
+import warnings
+import numpy as np
+from scipy import optimize
+# Custom modules
+
+# Pixel count profile of an edge, going from levelBefore to levelAfter around centerTime over about four times the width
+def sigmoidProfile(sampleTimes,levelBefore,levelAfter,centerTime,width):
+    return levelBefore + (levelAfter - levelBefore) / (1 + np.exp(-(sampleTimes - centerTime) / width))
+
+# Scattering edge detector
+class EdgeDetector():
+    def __init__(self,thresholdPixelCount,edgeFit='sigmoid',fitHalfWindow=6):
+        # Number of pixels that separates scattering from no scattering
+        self.thresholdPixelCount = thresholdPixelCount
+
+        # Model fitted to the edge profile to find the crossing: 'sigmoid', 'linear' or 'interpolate' (between the two samples around it)
+        # A sigmoid fit that fails falls back to the linear fit, and the linear fit to the interpolation
+        self.edgeFit = edgeFit
+        # Number of samples used on each side of the crossing for the fits
+        self.fitHalfWindow = fitHalfWindow
+
+    # Method that finds the edges of the types given ('begin' or 'end') one after the other in the samples of a sweep
+    # Returns a list with the (crossingTime, crossingIndex) of each edge, None for the edges that were not crossed
+    def findEdges(self,sampleTimes,pixelCounts,edgeTypes):
+        sampleTimes = np.asarray(sampleTimes,dtype=float)
+        pixelCounts = np.asarray(pixelCounts,dtype=float)
+
+        edges = []
+        searchIndex = 1
+        for edgeType in edgeTypes:
+            edge = self.findEdge(sampleTimes,pixelCounts,edgeType,searchIndex)
+            edges.append(edge)
+            if edge is not None:
+                # The next edge is searched for after this one
+                searchIndex = edge[1] + 1
+        return edges
+
+    # Method that finds the first edge of a type from the search index on
+    # The crossingIndex is the index of the first sample past the threshold
+    def findEdge(self,sampleTimes,pixelCounts,edgeType,searchIndex=1):
+        # Samples that are past the threshold for the type of edge
+        if edgeType == 'begin':
+            pastThreshold = pixelCounts > self.thresholdPixelCount
+        elif edgeType == 'end':
+            pastThreshold = pixelCounts <= self.thresholdPixelCount
+        else:
+            raise ValueError('Unknown edge type: {}'.format(edgeType))
+
+        # Indices of the samples past the threshold whose previous sample was not
+        crossingIndices = np.flatnonzero(pastThreshold[1:] & ~pastThreshold[:-1]) + 1
+        crossingIndices = crossingIndices[crossingIndices >= max(searchIndex,1)]
+        if len(crossingIndices) == 0:
+            return None
+        crossingIndex = int(crossingIndices[0])
+
+        return self.estimateCrossing(sampleTimes,pixelCounts,crossingIndex), crossingIndex
+
+    # Method that returns the time of the crossing just before a sample, using the edge fit of the detector
+    def estimateCrossing(self,sampleTimes,pixelCounts,crossingIndex):
+        crossingTime = None
+        if self.edgeFit == 'sigmoid':
+            crossingTime = self.fitSigmoidCrossing(sampleTimes,pixelCounts,crossingIndex)
+        if crossingTime is None and self.edgeFit in ('sigmoid','linear'):
+            crossingTime = self.fitLinearCrossing(sampleTimes,pixelCounts,crossingIndex)
+        if crossingTime is None:
+            crossingTime = self.interpolateCrossing(sampleTimes,pixelCounts,crossingIndex)
+        return crossingTime
+
+    # Method that returns the samples in the fit window around a crossing, their times relative to the sample before the crossing
+    # and the index of the crossing in the window
+    def _fitWindow(self,sampleTimes,pixelCounts,crossingIndex):
+        firstIndex = max(crossingIndex - self.fitHalfWindow,0)
+        lastIndex = min(crossingIndex + self.fitHalfWindow,len(sampleTimes))
+        referenceTime = sampleTimes[crossingIndex-1]
+        return sampleTimes[firstIndex:lastIndex] - referenceTime, pixelCounts[firstIndex:lastIndex], referenceTime, crossingIndex - firstIndex
+
+    # Method that fits a sigmoid to the samples around a crossing and returns the time it crosses the threshold (None if the fit fails)
+    def fitSigmoidCrossing(self,sampleTimes,pixelCounts,crossingIndex):
+        (windowTimes, windowCounts, referenceTime, windowCrossingIndex) = self._fitWindow(sampleTimes,pixelCounts,crossingIndex)
+        if len(windowTimes) < 5:
+            return None
+
+        # Starts from the levels at the ends of the window and a center between the two samples around the crossing
+        sampleInterval = sampleTimes[crossingIndex] - sampleTimes[crossingIndex-1]
+        initialGuess = [windowCounts[0],windowCounts[-1],sampleInterval / 2,sampleInterval]
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                (parameters, covariance) = optimize.curve_fit(sigmoidProfile,windowTimes,windowCounts,p0=initialGuess,maxfev=2000)
+        except (RuntimeError, ValueError, optimize.OptimizeWarning):
+            return None
+        (levelBefore, levelAfter, centerTime, width) = parameters
+
+        # Solves the sigmoid for the threshold, which has to lie between the two levels
+        levelRatio = (self.thresholdPixelCount - levelBefore) / (levelAfter - self.thresholdPixelCount)
+        if not np.isfinite(levelRatio) or levelRatio <= 0 or width == 0:
+            return None
+        crossingTime = centerTime + width * np.log(levelRatio)
+
+        # Rejects crossings outside the window, the fit did not follow the edge
+        if not windowTimes[0] <= crossingTime <= windowTimes[-1]:
+            return None
+        return float(referenceTime + crossingTime)
+
+    # Method that fits a line to the samples on the edge around a crossing and returns the time it crosses the threshold (None if the fit fails)
+    def fitLinearCrossing(self,sampleTimes,pixelCounts,crossingIndex):
+        (windowTimes, windowCounts, referenceTime, windowCrossingIndex) = self._fitWindow(sampleTimes,pixelCounts,crossingIndex)
+
+        # Keeps the run of samples between the levels on each side of the edge around the two samples of the crossing
+        (lowLevel, highLevel) = (windowCounts.min(), windowCounts.max())
+        onEdge = (windowCounts > lowLevel + 0.1 * (highLevel - lowLevel)) & (windowCounts < highLevel - 0.1 * (highLevel - lowLevel))
+        (firstIndex, lastIndex) = (windowCrossingIndex - 1, windowCrossingIndex)
+        while firstIndex > 0 and onEdge[firstIndex-1]:
+            firstIndex -= 1
+        while lastIndex < len(onEdge) - 1 and onEdge[lastIndex+1]:
+            lastIndex += 1
+        if lastIndex - firstIndex < 2:
+            return None
+
+        (slope, intercept) = np.polyfit(windowTimes[firstIndex:lastIndex+1],windowCounts[firstIndex:lastIndex+1],1)
+        if slope == 0:
+            return None
+        crossingTime = (self.thresholdPixelCount - intercept) / slope
+        if not windowTimes[firstIndex] <= crossingTime <= windowTimes[lastIndex]:
+            return None
+        return float(referenceTime + crossingTime)
+
+    # Method that returns the time the pixel count crossed the threshold between a sample and the one before it
+    def interpolateCrossing(self,sampleTimes,pixelCounts,crossingIndex):
+        (timeBefore, timeAfter) = sampleTimes[crossingIndex-1:crossingIndex+1]
+        (countBefore, countAfter) = pixelCounts[crossingIndex-1:crossingIndex+1]
+        crossingFraction = (self.thresholdPixelCount - countBefore) / (countAfter - countBefore)
+        return float(timeBefore + crossingFraction * (timeAfter - timeBefore))
+
+# Function that returns the [x, y, z] position at a time from the (times, positions) trajectory of a sweep
+def interpolatePosition(trajectoryTimes,trajectoryPositions,positionTime):
+    return [float(axisPosition) for axisPosition in interpolatePositions(trajectoryTimes,trajectoryPositions,[positionTime])[0]]
+
+# Function that returns the positions (one [x, y, z] row per time) at several times from the trajectory of a sweep
+def interpolatePositions(trajectoryTimes,trajectoryPositions,positionTimes):
+    trajectoryPositions = np.asarray(trajectoryPositions,dtype=float)
+    return np.column_stack([np.interp(positionTimes,trajectoryTimes,trajectoryPositions[:,axis]) for axis in range(trajectoryPositions.shape[1])])
@@ -0,0 +1,105 @@
+'''
+Edge prediction module for the tip locator application.
+Keeps a running fit of the laser cone from the edges found on the previous passes of a routine and predicts
+where the edges of the next pass will be, so each pass can start next to the cone and sweep only across it.
+The cross section of the cone in the x-z plane is a circle whose center and radius change linearly along y.
+'''
+
+## Imports
+# Built in modules
+import math
+import numpy as np
+# Custom modules
+import TLCircleFit # Method for fitting the cross sections of the cone to circles
+
+# Edge predictor of a routine
+class EdgePredictor():
+    def __init__(self,laserSlope,minimumUncertainty=0.002):
+        # Change of the cone radius along y, used until passes at two y positions have been fitted
+        self.laserSlope = laserSlope
+        # Smallest uncertainty given to a predicted edge [mm]
+        self.minimumUncertainty = minimumUncertainty
+
+        # [x, y, z] of the edges found so far
+        self._edgePoints = []
+        # Cone fitted to the edges as linear (slope, intercept) coefficients along y of the center x, center z and radius
+        # and the RMS residual of the edges, None until a cross section can be fitted
+        self._cone = None
+        self._coneResidual = None
+
+    # Method to forget the edges of the previous routine
+    def clear(self):
+        self._edgePoints = []
+        self._cone = None
+        self._coneResidual = None
+
+    # Method to add the [x, y, z] edges found by a pass and update the cone fit
+    def addEdges(self,edgePoints):
+        self._edgePoints.extend([[float(coordinate) for coordinate in edgePoint] for edgePoint in edgePoints])
+        self.fitCone()
+
+    # Method to fit the cross section circles at each y position and the cone through them
+    def fitCone(self):
+        edgePoints = np.array(self._edgePoints,dtype=float).reshape(-1,3)
+
+        # Fits a circle to the (x, z) edges of each y position with at least three edges, all in one batch
+        levelPoints = []
+        crossSectionY = []
+        for y in np.unique(np.round(edgePoints[:,1],4)):
+            levelEdges = edgePoints[np.abs(edgePoints[:,1] - y) < 5e-5][:,[0,2]]
+            if len(levelEdges) >= 3:
+                crossSectionY.append(y)
+                levelPoints.append(levelEdges)
+        if len(levelPoints) == 0:
+            return None
+        paddedPoints = np.full((len(levelPoints),max(len(levelEdges) for levelEdges in levelPoints),2),np.nan)
+        for (level, levelEdges) in enumerate(levelPoints):
+            paddedPoints[level,:len(levelEdges)] = levelEdges
+        (centers, radii, residuals, conditionNumbers) = TLCircleFit.fitCircles(paddedPoints)
+
+        # Drops the cross sections that could not be fitted (edges on a line)
+        fitted = np.isfinite(radii)
+        crossSectionY = np.array(crossSectionY)[fitted]
+        crossSections = np.column_stack((centers,radii))[fitted]
+        residuals = residuals[fitted]
+        residuals = residuals[np.isfinite(residuals)]
+        if len(crossSections) == 0:
+            return None
+
+        # The center and radius change linearly along y, a single cross section uses a fixed center and the laser slope
+        # (the radius grows as y decreases)
+        if len(crossSections) == 1:
+            self._cone = [(0.0,crossSections[0,0]),(0.0,crossSections[0,1]),(-self.laserSlope,crossSections[0,2] + self.laserSlope * crossSectionY[0])]
+        else:
+            self._cone = [tuple(np.polyfit(crossSectionY,crossSections[:,column],1)) for column in range(3)]
+        self._coneResidual = math.sqrt(np.mean(np.square(residuals)))
+        return self._cone
+
+    # Method that returns the (center x, center z, radius) of the cross section of the fitted cone at a y position
+    def predictCrossSection(self,y):
+        if self._cone is None:
+            return None
+        return tuple(slope * y + intercept for (slope, intercept) in self._cone)
+
+    # Method that predicts the edges of a pass at the y and z position given (sides along x, top along z from the midpoint)
+    # Returns a dictionary of edge name to (location, uncertainty), empty when there is no prediction
+    def predictEdges(self,y,z):
+        crossSection = self.predictCrossSection(y)
+        if crossSection is None:
+            return {}
+        (center_X, center_Z, radius) = crossSection
+
+        # The pass sweeps along the chord of the circle at the height of the pass
+        if radius <= 0 or abs(z - center_Z) >= radius:
+            return {}
+        halfChord = math.sqrt(radius**2 - (z - center_Z)**2)
+
+        # Three times the residual of the fit, and never less than the minimum uncertainty
+        uncertainty = max(3 * self._coneResidual,self.minimumUncertainty)
+
+        # The top is found by raising the stages (moving z down) from the midpoint of the two sides
+        return {
+            'side 1' : (center_X - halfChord,uncertainty),
+            'side 2' : (center_X + halfChord,uncertainty),
+            'top' : (center_Z - radius,uncertainty),
+        }
@@ -0,0 +1,132 @@
+'''
+Detection latency module for the tip locator application.
+Measures, for every scattering detection, the time from the capture of the frame that crossed the pixel count
+threshold to the XPS system acknowledging the abort of the stages, split into the stages of the detection:
+the count of the frame, the pixel counter decision, the delivery to the system controller, the controller decision,
+the sending of the abort and its acknowledgement.
+Each stage keeps a running histogram with logarithmic bins, the p50, p95 and p99 latencies are read from the
+histograms and written with them to a CSV file next to the data of the routine.
+The latency over the sweep velocity is how far the stages overshoot the edge, so it gives the fastest safe sweep.
+'''
+
+## Imports
+# Built in modules
+import csv
+import math
+import numpy as np
+# Custom modules
+
+# Stages of a detection in order, each timed from the end of the previous stage, with their descriptions
+latencyStages = ['count','pixelCounter','delivery','decision','abortSend','abortAck']
+latencyStageDescriptions = {
+    'count': 'Frame captured to pixel count published',
+    'pixelCounter': 'Pixel count published to pixel counter detection',
+    'delivery': 'Pixel counter detection to system controller',
+    'decision': 'System controller reception to decision',
+    'abortSend': 'Decision to abort sent',
+    'abortAck': 'Abort sent to abort acknowledged',
+    'total': 'Frame captured to abort acknowledged',
+}
+# Percentiles reported for each stage
+reportedPercentiles = [50,95,99]
+
+# Running histogram of latencies with logarithmic bins (and a bin below and above the range)
+class LatencyHistogram():
+    def __init__(self,minimumLatency=1e-5,maximumLatency=10.0,binsPerDecade=20):
+        numberOfBins = int(round(binsPerDecade * math.log10(maximumLatency / minimumLatency)))
+        # Edges of the bins [s]
+        self.binEdges = np.logspace(math.log10(minimumLatency),math.log10(maximumLatency),numberOfBins + 1)
+        # Counts of the bins, the first bin is below minimumLatency and the last above maximumLatency
+        self.binCounts = np.zeros(numberOfBins + 2,dtype=int)
+        self.clear()
+
+    # Method to remove all the latencies
+    def clear(self):
+        self.binCounts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    # Method to add a latency [s]
+    def add(self,latency):
+        self.binCounts[np.searchsorted(self.binEdges,latency,'right')] += 1
+        self.count += 1
+        self.total += latency
+        self.maximum = max(self.maximum,latency)
+
+    # Method that returns the mean latency, None without latencies
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    # Method that returns the latency below which the percent of the latencies given falls, None without latencies
+    # The latency is interpolated inside the bin it falls in (bins below and above the range end at 0 and the maximum)
+    def percentile(self,percent):
+        if self.count == 0:
+            return None
+        rank = percent / 100.0 * self.count
+        cumulativeCounts = np.cumsum(self.binCounts)
+        binIndex = min(int(np.searchsorted(cumulativeCounts,rank,'left')),len(self.binCounts) - 1)
+        binStart = 0.0 if binIndex == 0 else self.binEdges[binIndex - 1]
+        binEnd = self.maximum if binIndex == len(self.binCounts) - 1 else self.binEdges[binIndex]
+        countBefore = cumulativeCounts[binIndex] - self.binCounts[binIndex]
+        fraction = (rank - countBefore) / self.binCounts[binIndex] if self.binCounts[binIndex] else 1.0
+        return min(binStart + fraction * (binEnd - binStart),self.maximum)
+
+# Latencies of the detections of a routine, one histogram for each stage of the detections and one for their total
+class DetectionLatencies():
+    def __init__(self):
+        self.histograms = dict((stageName, LatencyHistogram()) for stageName in latencyStages + ['total'])
+        self.routineName = None
+        # Times of the detection waiting for its abort
+        self._detectionTimes = None
+
+    # Method to remove the latencies of the previous routine
+    def clear(self,routineName=None):
+        for histogram in self.histograms.values():
+            histogram.clear()
+        self.routineName = routineName
+        self._detectionTimes = None
+
+    # Method to record the times of a detection, from the capture of its frame to the system controller decision
+    def recordDetection(self,captureTime,publishTime,detectionTime,receptionTime,decisionTime):
+        self._detectionTimes = [captureTime,publishTime,detectionTime,receptionTime,decisionTime]
+
+    # Method to record the times the abort that follows a detection was sent and acknowledged, completes the detection
+    def recordAbort(self,sendTime,acknowledgeTime):
+        # An abort that does not follow a detection is not measured
+        if self._detectionTimes is None:
+            return
+        stageTimes = self._detectionTimes + [sendTime,acknowledgeTime]
+        self._detectionTimes = None
+        for (stageName, startTime, endTime) in zip(latencyStages,stageTimes[:-1],stageTimes[1:]):
+            self.histograms[stageName].add(endTime - startTime)
+        self.histograms['total'].add(stageTimes[-1] - stageTimes[0])
+
+    # Method that returns the number of detections measured
+    def count(self):
+        return self.histograms['total'].count
+
+    # Method that writes the percentiles and the histograms of the stages to a CSV file (latencies in ms)
+    def writeCSV(self,fileName):
+        stageNames = latencyStages + ['total']
+        latencyFile = open(fileName,'wt')
+        latencyWriter = csv.writer(latencyFile)
+
+        # Writes the percentiles of each stage
+        latencyWriter.writerow(['Routine',self.routineName])
+        latencyWriter.writerow(['Stage','Description','Detections','Mean [ms]'] + ['p{} [ms]'.format(percent) for percent in reportedPercentiles] + ['Max [ms]'])
+        for stageName in stageNames:
+            histogram = self.histograms[stageName]
+            latencies = [histogram.mean()] + [histogram.percentile(percent) for percent in reportedPercentiles] + [histogram.maximum if histogram.count else None]
+            latencyWriter.writerow([stageName,latencyStageDescriptions[stageName],histogram.count] + ['' if latency is None else round(1000 * latency,4) for latency in latencies])
+
+        # Writes the counts of the bins of each stage
+        latencyWriter.writerow([])
+        latencyWriter.writerow(['Bin start [ms]','Bin end [ms]'] + stageNames)
+        binEdges = np.round(1000 * self.histograms['total'].binEdges,6)
+        binStarts = [0.0] + list(binEdges)
+        binEnds = list(binEdges) + [float('inf')]
+        for binIndex in range(len(binStarts)):
+            latencyWriter.writerow([binStarts[binIndex],binEnds[binIndex]] + [self.histograms[stageName].binCounts[binIndex] for stageName in stageNames])
+
+        latencyFile.close()
@@ -2,16 +2,19 @@
 Optimization function of the tip locator application.
 This will take the data points collected and fit them to the cone made by the laser.
 The returned values will be the offset that the first point is from focal point of the cone.
+The points are kept as one (N, 3) array and the residuals of the cost and their Jacobian are computed for all the
+points at once, so the solver can be given the analytic gradient. The fit can use optimize.minimize on the cost
+or optimize.least_squares on the residuals.
 '''
 
 ## Imports
 # Built in modules
+import numpy as np
 from numpy import array, sqrt
 from scipy import optimize
 import time
 # Custom modules
 import TLParameters
-import TLDataClass
 
 # Optimization class
 class Optimization():
@@ -26,52 +29,82 @@ class Optimization():
         self.initialGuess = array([0.0,0.0,0.0])
 
     # Main method that will be fun
-    def optimize(self):
+    # The solver is 'minimize' (minimizes the cost with its gradient) or 'least_squares' (fits the residuals with their Jacobian)
+    def optimize(self,solver='minimize'):
         print('optimize method accessed')
         # Retrieves the data points to optimize
         sourceData = self.readData()
 
         # print('sourceData:')
         # print(sourceData)
-        # Creates the function to be optimized
-        costFunction = self.costFunction(sourceData)
-
-        result = optimize.minimize(costFunction,self.initialGuess)
+        result = self.solve(sourceData,solver)
 
         print(result)
+        return result
+
+    # Method that fits the (N, 3) data points to the cone from the initial guess with a solver
+    def solve(self,data,solver='minimize',initialGuess=None):
+        data = np.asarray(data,dtype=float).reshape(-1,3)
+        if initialGuess is None:
+            initialGuess = self.initialGuess
+
+        if solver == 'minimize':
+            # Creates the function to be optimized and its gradient
+            return optimize.minimize(self.costFunction(data),initialGuess,jac=self.costGradient(data))
+        elif solver == 'least_squares':
+            return optimize.least_squares(lambda startingPoint: self.residuals(data,startingPoint),initialGuess,jac=lambda startingPoint: self.jacobian(data,startingPoint),xtol=1e-12,ftol=1e-12)
+        raise ValueError('Unknown solver: {}'.format(solver))
 
     # Method to read the data points
     def readData(self):
         print('readData accessed')
-        # Returns the point data collected
-        # Creates a blank point object
-        point = []
-
-        # Cycles through the collected data and appends the coordinates to the point object
-        for i in range(len(TLParameters.kHNSCTL_dataStorageInstances)):
-            pointArray = array([TLParameters.kHNSCTL_dataStorageInstances[i].x,TLParameters.kHNSCTL_dataStorageInstances[i].y,TLParameters.kHNSCTL_dataStorageInstances[i].z])
-            point.append(pointArray)
+        # Returns the point data collected as an (N, 3) view of the positions in the data store
+        point = TLParameters.kHNSCTL_dataStore.positions()
 
         # print(point)
         return point
-    # Method to determine the distance to the cone
+    # Method to determine the squared distance to the cone of a point, or of each point of an (N, 3) array
     def distanceToCone(self,point):
         # print('distanceToCone accessed')
+        point = np.asarray(point,dtype=float)
 
-        # print(point[0])
-        # print(type(point[0]))
-        ap = sqrt(point[0]**2 + point[2]**2)
-        b = -abs(point[1])
+        # Distance from the axis of the cone and position along it
+        ap = sqrt(point[...,0]**2 + point[...,2]**2)
+        b = -abs(point[...,1])
 
         return (ap - (ap - self.focalLength/self.radius*b)/(1 + self.focalLength**2/self.radius**2))**2 + (b- (-self.radius/self.focalLength*ap + b)/(1+self.radius**2/self.focalLength**2))**2
 
+    # Method that returns the signed distance to the cone of each point shifted by the starting point
+    # The squared distance of distanceToCone reduces to (k*ap + b)**2 / (1 + k**2) with k the focal length over the radius
+    def residuals(self,data,startingPoint):
+        slope = self.focalLength/self.radius
+        shiftedPoints = data + startingPoint
+        ap = sqrt(shiftedPoints[:,0]**2 + shiftedPoints[:,2]**2)
+        return (slope*ap - abs(shiftedPoints[:,1]))/sqrt(1 + slope**2)
+
+    # Method that returns the (N, 3) Jacobian of the residuals against the starting point
+    def jacobian(self,data,startingPoint):
+        slope = self.focalLength/self.radius
+        shiftedPoints = data + startingPoint
+        # Points on the axis of the cone are given a zero gradient across it
+        ap = np.maximum(sqrt(shiftedPoints[:,0]**2 + shiftedPoints[:,2]**2),1e-12)
+        return np.column_stack((slope*shiftedPoints[:,0]/ap,-np.sign(shiftedPoints[:,1]),slope*shiftedPoints[:,2]/ap))/sqrt(1 + slope**2)
+
     # Method to setup the cost function (objective function)
     def costFunction(self,data):
         print('costFunction accessed')
+        data = np.asarray(data,dtype=float).reshape(-1,3)
         def cost(startingPoint):
-            return sum([self.distanceToCone(point + startingPoint) for point in data])
+            return np.sum(self.residuals(data,startingPoint)**2)
         return cost
 
+    # Method to setup the gradient of the cost function
+    def costGradient(self,data):
+        data = np.asarray(data,dtype=float).reshape(-1,3)
+        def gradient(startingPoint):
+            return 2*self.jacobian(data,startingPoint).T.dot(self.residuals(data,startingPoint))
+        return gradient
+
     # Method to record history
     def recordHistory(self):
         print('recordHistory accessed')
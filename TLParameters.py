@@ -9,11 +9,12 @@ system loops
 import SimpleCV
 import cv2
 # Custom modules
+import TLDataStore
 
 ## Key variables (kHNSCTL aka: key Hildreth Nano System Controller Tip Locator)
 kHNSCTL_mainControlLoopRunning = 'kHNSCTL_mainControlLoopRunning'
-# Data storage instance ID list
-kHNSCTL_dataStorageInstances = []
+# Data point store of the routines
+kHNSCTL_dataStore = TLDataStore.DataStore()
 
 # Function that initializes the global parameters
 def init():
@@ -42,9 +43,4 @@ def retrieveParameter(key):
 
 # Function that prints all paramter keys
 def listParameters():
-    print (_globalParameters.keys())
-
-# Function to update the list of data storage instances
-def updateDataStorageInstances(updatedInstanceID):
-    global _kHNSCTL_dataStorageInstances
-    kHNSCTL_dataStorageInstances.append(updatedInstanceID)
\ No newline at end of file
+    print (_globalParameters.keys())
\ No newline at end of file
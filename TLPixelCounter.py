@@ -1,20 +1,21 @@
 '''
 Module for the tip locator application that processes a video feed and returns the number of red pixels
 currently in the frame.
+The pixel counter is created once when the equipment is initialized and is armed by the system controller
+for each scattering detection.
 '''
 
 ## Imports
 # Built in modules
-import SimpleCV # computer vision handler
-import cv2 # Another computer vision handler
 import time
-import random
 # Custom modules
+import TLClock # Monotonic time of the detection decision
 import TLEquipment
 import TLParameters
+import TLTrace # Spans of the detections
 
 class PixelCounter(TLEquipment.Equipment):
-    def __init__(self,queue_SCtoPixelCounter,pipe_UItoPixel2,pixelThresholdValue,detectionType):
+    def __init__(self,queue_SCtoPixelCounter,queue_pixelCounterCommands,sampleRing,event_scatteringDetected):
         # print('Pixel Counter init accessed')
         # Initializes the inherited class
         TLEquipment.Equipment.__init__(self)
@@ -22,7 +23,12 @@ class PixelCounter(TLEquipment.Equipment):
         # Sets up the queue that will be used to communicate between the system controller and pixel counter
         # print('Created queue in pixel counter')
         self.queue_SCtoPixelCounter = queue_SCtoPixelCounter
-        self.pipe_UItoPixel2 = pipe_UItoPixel2
+        # Sets up the queue the system controller uses to arm the pixel counter
+        self.queue_pixelCounterCommands = queue_pixelCounterCommands
+        # Shared ring buffer the capture engine publishes the pixel counts into
+        self.sampleRing = sampleRing
+        # Event that signals that a scattering event was detected
+        self.event_scatteringDetected = event_scatteringDetected
 
         # Color of pixel program will be searching for
         # print('Set color in pixel counter')
@@ -32,53 +38,67 @@ class PixelCounter(TLEquipment.Equipment):
         # # print('Set threshold value in pixel counter')
         # self.thresholdValue = 0.56
 
-        # Value that will be classified as a triggering event
-        self.pixelTriggerValue = pixelThresholdValue
+        # Value that will be classified as a triggering event (set when the pixel counter is armed)
+        self.pixelTriggerValue = None
 
-        # Type of pixel counter that is needed, scattering beginning or ending
-        self.detectionType = detectionType
+        # Type of pixel counter that is needed, scattering beginning or ending (set when the pixel counter is armed)
+        self.detectionType = None
 
-
-    # Method for counting the number of red pixels on the screen
+    # Method that keeps the pixel counter running and waits for commands from the system controller
+    # Commands are tuples: ('arm', detectionType, pixelTriggerValue), ('flushTrace',) or ('shutDown',)
     def run(self):
         # print('pixel counter run accessed')
-        self.pipe_UItoPixel2.send('stillRunning')
-        pixelSum = self.pipe_UItoPixel2.recv()
+        # Drops the trace records inherited from the process that started the pixel counter
+        TLTrace.startProcess('pixelCounter')
+        while True:
+            # Waits for the next command from the system controller
+            command = self.queue_pixelCounterCommands.get()
+
+            if command[0] == 'arm':
+                # Arms the pixel counter for the requested detection and runs it
+                (self.detectionType, self.pixelTriggerValue) = command[1:]
+                with TLTrace.span('detectScattering','pixelCounter',detectionType=self.detectionType):
+                    self.detectScattering()
+            elif command[0] == 'flushTrace':
+                # Writes the trace of the routine to the trace file of the pixel counter
+                TLTrace.flush()
+            elif command[0] == 'shutDown':
+                TLTrace.flush()
+                break
 
+    # Method to check if a pixel count is a scattering event for the armed detection type
+    def isScatteringEvent(self,pixelSum):
         if self.detectionType == 'begin':
-            while pixelSum <= self.pixelTriggerValue:
-                pixelSum = self.pipe_UItoPixel2.recv()
-                self.pipe_UItoPixel2.send('stillRunning')
-                # print ('There are {} pixels in the frame, looking for {} or greater.'.format(pixelSum,self.pixelTriggerValue))
+            return pixelSum > self.pixelTriggerValue
         elif self.detectionType == 'end':
-            while pixelSum > self.pixelTriggerValue:
-                pixelSum = self.pipe_UItoPixel2.recv()
-                self.pipe_UItoPixel2.send('stillRunning')
-                # print ('There are {} pixels in the frame, looking for {} or greater.'.format(pixelSum,self.pixelTriggerValue))
-            else:
-                print('No Detection Type specified')
+            return pixelSum <= self.pixelTriggerValue
+        else:
+            print('No Detection Type specified')
+            return True
 
-        # Informs the UI that a scattering event was detected
-        # print('Scattering event detected at {} pixels'.format(pixelSum))
-        self.pipe_UItoPixel2.send('scatteringEventDetected')
-
-        self.queue_SCtoPixelCounter.put(pixelSum)
+    # Method for counting the number of red pixels on the screen until a scattering event is detected
+    def detectScattering(self):
+        # Clears the scattering event from the previous detection
+        self.event_scatteringDetected.clear()
+        # Only the samples published after the pixel counter was armed are checked
+        ringPosition = self.sampleRing.currentPosition()
 
-        # Calls a method to clear the pixel pipe of any values that were stored before the stop command was processed
-        self.clearPixelQueue()
+        scatteringDetected = False
+        while not scatteringDetected:
+            # Waits for the next samples from the capture engine
+            (samples, ringPosition) = self.sampleRing.readSince(ringPosition,publishTimes=True,reader='pixelCounter')
+            for (timestamp, pixelSum, publishTime) in samples:
+                # print ('There are {} pixels in the frame, looking for {} or greater.'.format(pixelSum,self.pixelTriggerValue))
+                if self.isScatteringEvent(pixelSum):
+                    scatteringDetected = True
+                    detectionTime = TLClock.monotonicTime()
+                    break
 
-        # print('PIXEL COUNTER FINISHED CLEARING THE QUEUE')
-        self.queue_SCtoPixelCounter.put('Pixel counter finished')
+        # Signals that a scattering event was detected
+        # print('Scattering event detected at {} pixels'.format(pixelSum))
+        self.event_scatteringDetected.set()
+        TLTrace.event('scatteringDetected','pixelCounter',captureTime=timestamp,pixelCount=pixelSum)
 
-     # Method to remove all entries from the pixel queue
-    def clearPixelQueue(self):
-        # print('Starting to empty pixel count pipe')
-        # Sets a continue emptying queue to true
-        continueEmptyingQueue = True
-        # Runs a loop until the queue is empty
-        while continueEmptyingQueue:
-            nextPipeValue = self.pipe_UItoPixel2.recv()
-            if nextPipeValue == 'End of pixel count':
-                # print('Pixel count pipe is empty')
-                break
-            # print('Current pixel count pipe value: {}'.format(nextPipeValue))
+        # Returns the capture time of the frame that triggered the event with its pixel count, the time its count was
+        # published and the time the pixel counter detected the event
+        self.queue_SCtoPixelCounter.put((timestamp,pixelSum,publishTime,detectionTime))
@@ -0,0 +1,71 @@
+'''
+Position latching module for the tip locator application.
+The XPS system gathers the stage position continuously while the stages sweep, and the position at the
+capture time of the frame that detected the scattering is looked up afterwards, so the recorded position
+does not lag by the camera, the processes, the abort deceleration and a network round trip.
+'''
+
+## Imports
+# Built in modules
+import numpy as np
+# Custom modules
+import TLClock # Monotonic time shared with the capture engine
+
+# Position latch for one sweep of the stages
+class PositionLatch():
+    def __init__(self,stages,divisor=10,dataNumber=100000,servoPeriod=1e-4,cameraLatency=0.0):
+        # Stages that gather their position
+        self.stages = stages
+
+        # A position is gathered every divisor servo cycles (1 kHz with the 10 kHz servo loop of the XPS-Q8)
+        self.divisor = divisor
+        self.servoPeriod = servoPeriod
+        self.samplePeriod = divisor * servoPeriod
+        # Number of positions gathered before the gathering stops (100 s at 1 kHz)
+        self.dataNumber = dataNumber
+
+        # Time between the exposure of a frame and its capture time stamp [s]
+        self.cameraLatency = cameraLatency
+
+        # Monotonic time of the first gathered position and the positions gathered for the last sweep
+        self._startTime = None
+        self._sampleTimes = np.zeros(0)
+        self._positions = np.zeros((0,3))
+
+        # True while the XPS system is gathering positions
+        self.latching = False
+
+    # Method to start gathering the positions, called just before the sweep starts
+    def start(self):
+        # The gathering starts while the command is being handled, so the middle of the round trip is used as the time of the first position
+        commandTime = TLClock.monotonicTime()
+        [_gatheringError, _gatheringString] = self.stages.startPositionGathering(self.dataNumber,self.divisor)
+        replyTime = TLClock.monotonicTime()
+
+        self._startTime = (commandTime + replyTime) / 2
+        self.latching = (_gatheringError == 0)
+        if not self.latching:
+            print('Position gathering could not be started, error {}'.format(_gatheringError))
+        return self.latching
+
+    # Method to stop the gathering and retrieve the positions gathered during the sweep
+    def stop(self):
+        if not self.latching:
+            return
+        self.latching = False
+
+        self._positions = np.array(self.stages.retrievePositionGathering(),dtype=float).reshape(-1,3)
+        self._sampleTimes = self._startTime + self.samplePeriod * np.arange(len(self._positions))
+
+    # Method that returns the [x, y, z] stage position at a capture time, or None if no position covers the time
+    def positionAt(self,captureTime):
+        exposureTime = captureTime - self.cameraLatency
+        if len(self._sampleTimes) == 0 or exposureTime < self._sampleTimes[0] or exposureTime > self._sampleTimes[-1]:
+            return None
+
+        # Interpolates between the two positions gathered around the time
+        return [float(np.interp(exposureTime,self._sampleTimes,self._positions[:,axis])) for axis in range(3)]
+
+    # Method that returns the times and [x, y, z] positions gathered during the last sweep
+    def retrieveTrajectory(self):
+        return self._sampleTimes, self._positions
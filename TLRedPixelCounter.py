@@ -0,0 +1,102 @@
+'''
+Red pixel counting engine for the tip locator application.
+Counts the number of pixels in a camera frame whose red value is above the threshold value
+by working directly on the frame's buffer, so no intermediate images are created for each frame.
+Counting can be limited to a region of interest (rectangle or mask) around the pipette tip, which can be
+set by hand or learned automatically from the first scattering blob that is detected.
+'''
+
+## Imports
+# Built in modules
+import numpy as np
+# Custom modules
+
+# Red pixel counting engine
+class RedPixelCounter():
+    def __init__(self,thresholdValue,colorChannel=2,regionOfInterest=None,autoRegionOfInterest=False,autoRegionTriggerValue=10,autoRegionMargin=20):
+        # Desired threshold value for processing the video (fraction of full scale, same as the UI threshold value)
+        self.thresholdValue = thresholdValue
+        # Index of the red channel in the frame buffer (2 for BGR buffers from OpenCV, 0 for RGB buffers)
+        self.colorChannel = colorChannel
+
+        # Region of interest as (top, bottom, left, right) in pixels and optional mask inside of it (None counts the whole frame)
+        self._regionOfInterest = None
+        self._regionOfInterestMask = None
+        if regionOfInterest is not None:
+            self.setRegionOfInterest(*regionOfInterest)
+
+        # Automatic mode, the region of interest is learned from the first frame with more than autoRegionTriggerValue pixels
+        self.autoRegionOfInterest = autoRegionOfInterest
+        self.autoRegionTriggerValue = autoRegionTriggerValue
+        # Number of pixels added around the learned scattering blob
+        self.autoRegionMargin = autoRegionMargin
+
+        # Preallocated mask that the threshold is written into, resized when the region size changes
+        self._thresholdMask = None
+
+    # Method to limit the counting to a rectangle of the frame
+    def setRegionOfInterest(self,top,bottom,left,right):
+        self._regionOfInterest = (int(top),int(bottom),int(left),int(right))
+        self._regionOfInterestMask = None
+
+    # Method to limit the counting to the pixels of a boolean mask the size of the frame
+    def setRegionOfInterestMask(self,mask):
+        mask = np.asarray(mask,dtype=np.bool_)
+        # Crops the mask to its bounding box so only that part of the frame is thresholded
+        rows = np.flatnonzero(mask.any(axis=1))
+        columns = np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0:
+            raise ValueError('Region of interest mask is empty')
+        regionOfInterest = (int(rows[0]),int(rows[-1]) + 1,int(columns[0]),int(columns[-1]) + 1)
+        self._regionOfInterestMask = mask[regionOfInterest[0]:regionOfInterest[1],regionOfInterest[2]:regionOfInterest[3]].copy()
+        self._regionOfInterest = regionOfInterest
+
+    # Method to go back to counting the whole frame (also restarts the automatic mode learning)
+    def clearRegionOfInterest(self):
+        self._regionOfInterest = None
+        self._regionOfInterestMask = None
+
+    # Method that returns the current region of interest as (top, bottom, left, right) or None
+    def retrieveRegionOfInterest(self):
+        return self._regionOfInterest
+
+    # Method for counting the red pixels above the threshold value in a frame buffer (height x width x channels array)
+    def countRedPixels(self,frame):
+        regionOfInterest = self._regionOfInterest
+        regionOfInterestMask = self._regionOfInterestMask
+
+        # Pulls a view of the red plane (inside the region of interest) out of the frame buffer, no copy is made
+        if regionOfInterest is None:
+            redPlane = frame[:,:,self.colorChannel]
+        else:
+            (top, bottom, left, right) = regionOfInterest
+            redPlane = frame[top:bottom,left:right,self.colorChannel]
+
+        # Creates the threshold mask the first time through or when the region size changes
+        if self._thresholdMask is None or self._thresholdMask.shape != redPlane.shape:
+            self._thresholdMask = np.empty(redPlane.shape,dtype=np.bool_)
+        thresholdMask = self._thresholdMask
+
+        # Thresholds the red plane into the preallocated mask
+        np.greater(redPlane,255 * self.thresholdValue,out=thresholdMask)
+        if regionOfInterestMask is not None and regionOfInterestMask.shape == thresholdMask.shape:
+            np.logical_and(thresholdMask,regionOfInterestMask,out=thresholdMask)
+        pixelSum = int(np.count_nonzero(thresholdMask))
+
+        # Learns the region of interest from the first scattering blob when in automatic mode
+        if self.autoRegionOfInterest and regionOfInterest is None and pixelSum > self.autoRegionTriggerValue:
+            self.learnRegionOfInterest(thresholdMask,frame.shape)
+
+        return pixelSum
+
+    # Method to set the region of interest around the pixels of a threshold mask of the whole frame
+    def learnRegionOfInterest(self,thresholdMask,frameShape):
+        rows = np.flatnonzero(thresholdMask.any(axis=1))
+        columns = np.flatnonzero(thresholdMask.any(axis=0))
+        # Pads the bounding box of the blob by the margin and keeps it inside the frame
+        top = max(rows[0] - self.autoRegionMargin,0)
+        bottom = min(rows[-1] + 1 + self.autoRegionMargin,frameShape[0])
+        left = max(columns[0] - self.autoRegionMargin,0)
+        right = min(columns[-1] + 1 + self.autoRegionMargin,frameShape[1])
+        print('Region of interest learned: rows {} to {}, columns {} to {}'.format(top,bottom,left,right))
+        self.setRegionOfInterest(top,bottom,left,right)
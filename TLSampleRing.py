@@ -0,0 +1,76 @@
+'''
+Shared memory ring buffer for the tip locator application.
+The capture engine publishes (timestamp, pixel count) samples into the ring, and the readers (pixel counter,
+system controller) read the samples they have not seen yet. Each reader waits on its own event, set by every publish
+and only cleared by that reader, so several readers can wait at once without taking the wakeups of each other.
+Each sample is also stamped with the time it was published, so the time from the capture of a frame to its
+count being available can be measured.
+Old samples are simply overwritten once the ring is full.
+'''
+
+## Imports
+# Built in modules
+import multiprocessing
+# Custom modules
+import TLClock # Monotonic time the samples are published at
+
+# Ring buffer of (timestamp, pixel count) samples shared between processes
+class SampleRing():
+    def __init__(self,capacity=4096,readerNames=('pixelCounter','systemController')):
+        # Number of samples the ring holds before old samples are overwritten
+        self.capacity = capacity
+
+        # Shared memory holding the samples as [timestamp0, count0, publishTime0, timestamp1, count1, publishTime1, ...]
+        self._samples = multiprocessing.Array('d', 3 * capacity, lock=False)
+        # Total number of samples ever published (the write position of the ring)
+        self._writeCount = multiprocessing.Value('l', 0, lock=False)
+
+        # Event of each reader set whenever a sample is published so that the readers do not have to poll the ring
+        self._readerEvents = dict((readerName, multiprocessing.Event()) for readerName in readerNames)
+
+    # Method to publish a sample into the ring (only one process should publish)
+    def publish(self,timestamp,pixelCount):
+        writeCount = self._writeCount.value
+        index = 3 * (writeCount % self.capacity)
+        self._samples[index] = timestamp
+        self._samples[index + 1] = pixelCount
+        self._samples[index + 2] = TLClock.monotonicTime()
+        # Moves the write position after the sample is written so readers never see a partial sample
+        self._writeCount.value = writeCount + 1
+        for readerEvent in self._readerEvents.values():
+            readerEvent.set()
+
+    # Method that returns the current write position, samples published afterwards are read with readSince
+    def currentPosition(self):
+        return self._writeCount.value
+
+    # Method to read the samples published since the position given, reader is the name of the event the reader waits on
+    # Waits up to timeout seconds for a new sample (forever if timeout is None) and returns (samples, newPosition)
+    # The samples are (timestamp, pixel count), or (timestamp, pixel count, publish time) with publishTimes
+    def readSince(self,position,timeout=None,publishTimes=False,reader='systemController'):
+        readerEvent = self._readerEvents[reader]
+        if timeout is not None:
+            deadline = TLClock.monotonicTime() + timeout
+        while True:
+            # The event is cleared before the write position is read, so a sample published after the check sets it again
+            readerEvent.clear()
+            writeCount = self._writeCount.value
+            if writeCount > position or timeout == 0:
+                break
+            remainingTime = None if timeout is None else deadline - TLClock.monotonicTime()
+            if remainingTime is not None and remainingTime <= 0:
+                return [], position
+            readerEvent.wait(remainingTime)
+
+        # Skips the samples that were already overwritten if the reader fell more than a ring behind
+        position = max(position, writeCount - self.capacity)
+
+        samples = []
+        for sampleNumber in range(position, writeCount):
+            index = 3 * (sampleNumber % self.capacity)
+            if publishTimes:
+                samples.append((self._samples[index], int(self._samples[index + 1]), self._samples[index + 2]))
+            else:
+                samples.append((self._samples[index], int(self._samples[index + 1])))
+
+        return samples, writeCount
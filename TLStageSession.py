@@ -0,0 +1,67 @@
+'''
+Stage session manager for the tip locator application.
+Holds one connected set of XYZ stages for the life of the system controller and hands the same
+stages out to the routines and the manual moves, reconnecting only when the connection is lost.
+'''
+
+## Imports
+# Built in modules
+import threading
+# Custom modules
+import TLXYZStages # Specific XPS stages
+
+# Stage session manager
+class StageSession():
+    def __init__(self,XPSAddress=None,XPSPort=None):
+        # Address of the XPS system (the TLXYZStages address by default)
+        self._XPSAddress = XPSAddress
+        self._XPSPort = XPSPort
+        # Connected stages shared by the system controller (created on the first request)
+        self._stages = None
+        # Lock so that only one connection is made when the stages are requested from several threads
+        self._sessionLock = threading.Lock()
+
+    # Method that returns the connected stages, connecting to the XPS system the first time
+    # Raises TLXYZStages.StageConnectionError when the stages are not connected and can not be
+    def acquireStages(self):
+        with self._sessionLock:
+            if self._stages is None and not self._connect():
+                raise TLXYZStages.StageConnectionError('Stages are not connected')
+            return self._stages
+
+    # Method to check the connection (one round trip on socket 2) and reconnect if it was lost
+    # A failed reconnection keeps the previous stages (None if they never connected) for the next check to try again
+    def checkConnection(self):
+        with self._sessionLock:
+            if self._stages is None:
+                self._connect()
+            elif not self._stages.checkConnection():
+                print('Stage connection lost, reconnecting')
+                self._connect()
+            return self._stages
+
+    # Method to close the old connection and connect again, the old connection is kept if the new one fails
+    def reconnect(self):
+        with self._sessionLock:
+            self._connect()
+            return self._stages
+
+    # Method to close the connection to the stages
+    def close(self):
+        with self._sessionLock:
+            if self._stages is not None:
+                self._stages.closeStages()
+                self._stages = None
+
+    # Method that opens a new connection to the stages and closes the old sockets once it works, returns True if it connected
+    def _connect(self):
+        stages = TLXYZStages.XYZStages(self._XPSAddress,self._XPSPort)
+        try:
+            stages.initializeStages()
+        except TLXYZStages.StageConnectionError as connectionError:
+            print(connectionError)
+            return False
+        if self._stages is not None:
+            self._stages.closeStages()
+        self._stages = stages
+        return True
@@ -0,0 +1,114 @@
+'''
+Synthetic camera for the tip locator application.
+Stands in for SimpleCV.Camera so the detection can be run and measured without the laser: each frame is rendered
+from the pipette tip position (the stage position given by a position source, for example the positions of a
+TLXPSSimulator or the retrieveStagePosition method of connected stages) and a laser cone set by its focal point,
+axis, focal length and radius of the light entering the lens.
+The scattering spot is a Gaussian blob in the red plane that brightens as the tip enters the light, on a background
+with Gaussian noise, and the frames are paced to the frame rate like a camera.
+'''
+
+## Imports
+# Built in modules
+import math
+import threading
+import time
+import numpy as np
+# Custom modules
+import TLClock # Monotonic time the frames are paced with
+
+# Frame returned by the synthetic camera, answers the SimpleCV image methods used by the application
+class SyntheticImage():
+    def __init__(self,frame,captureTime,position):
+        self._frame = frame
+        # Time the frame was rendered at and the stage position it was rendered from
+        self.captureTime = captureTime
+        self.position = position
+
+    # Method that returns the BGR frame buffer (height x width x 3)
+    def getNumpyCv2(self):
+        return self._frame
+
+# Camera that renders the scattering of the laser cone on the pipette tip
+class SyntheticCamera():
+    def __init__(self,positionSource,focalPoint=(0.0,0.0,0.0),axis=(0.0,1.0,0.0),focalLength=10.0,radius=0.5,tipRadius=0.002,frameRate=30.0,frameSize=(480,640),spotCenter=None,spotRadius=6.0,spotBrightness=255.0,backgroundLevel=10.0,noiseLevel=4.0,noiseFrames=8,randomState=None):
+        # Function that returns the current (x, y, z) stage position, the tip is at the focal point when the stages are at focalPoint
+        self.positionSource = positionSource
+        # Laser cone, the apex at the focal point and the half angle from the radius of the light over the focal length
+        self.focalPoint = np.asarray(focalPoint,dtype=float)
+        self.axis = np.asarray(axis,dtype=float) / np.linalg.norm(axis)
+        self.halfAngle = math.atan2(radius,focalLength)
+        # Radius of the pipette tip [mm], the width of the transition from dark to fully lit
+        self.tipRadius = tipRadius
+
+        # Frames per second and size of the frames as (height, width)
+        self.frameRate = frameRate
+        self.frameSize = tuple(frameSize)
+        # Spot where the tip scatters the light in the frame as (row, column) and its Gaussian radius [pixels]
+        self.spotCenter = (frameSize[0] / 2.0, frameSize[1] / 2.0) if spotCenter is None else spotCenter
+        self.spotRadius = spotRadius
+        # Red level of the spot center with the tip fully in the light, of the background and of the noise
+        self.spotBrightness = spotBrightness
+        self.backgroundLevel = backgroundLevel
+        self.noiseLevel = noiseLevel
+        self._randomState = np.random.RandomState() if randomState is None else randomState
+        # Background red planes with noise, rendered once and picked at random for each frame (the noise of a full frame takes longer than a frame)
+        self._backgroundPlanes = np.clip(np.round(self._randomState.normal(backgroundLevel,noiseLevel,(max(noiseFrames,1),) + self.frameSize)),0,255).astype(np.uint8)
+
+        # Spot profile, rendered once in a square patch around the spot center
+        patchRadius = int(math.ceil(3 * spotRadius))
+        (rows, columns) = np.mgrid[-patchRadius:patchRadius + 1,-patchRadius:patchRadius + 1]
+        self._spotProfile = np.exp(-(rows**2 + columns**2) / (2.0 * spotRadius**2))
+        self._patchRadius = patchRadius
+
+        # Capture time of the last frame and number of frames rendered
+        self._frameLock = threading.Lock()
+        self.lastFrameTime = None
+        self.frameCount = 0
+
+    # Method that returns the signed distance of the tip to the surface of the (double) cone, negative inside the light
+    def distanceToCone(self,position):
+        offset = np.asarray(position,dtype=float) - self.focalPoint
+        height = offset.dot(self.axis)
+        radialDistance = math.sqrt(max(offset.dot(offset) - height**2,0.0))
+        return radialDistance * math.cos(self.halfAngle) - abs(height) * math.sin(self.halfAngle)
+
+    # Method that returns the fraction of the tip in the light (0 outside of the cone, 1 a tip radius inside)
+    def illumination(self,position):
+        return min(max(0.5 - self.distanceToCone(position) / (2 * self.tipRadius),0.0),1.0)
+
+    # Method that renders the BGR frame of a stage position
+    def renderFrame(self,position):
+        (height, width) = self.frameSize
+        frame = np.zeros((height,width,3),dtype=np.uint8)
+        frame[:,:,2] = self._backgroundPlanes[self._randomState.randint(len(self._backgroundPlanes))]
+
+        # Adds the spot in the part of its patch that is inside the frame
+        brightness = self.spotBrightness * self.illumination(position)
+        if brightness > 0:
+            (centerRow, centerColumn) = (int(round(self.spotCenter[0])), int(round(self.spotCenter[1])))
+            (top, left) = (centerRow - self._patchRadius, centerColumn - self._patchRadius)
+            (bottom, right) = (top + len(self._spotProfile), left + len(self._spotProfile))
+            (clippedTop, clippedLeft, clippedBottom, clippedRight) = (max(top,0), max(left,0), min(bottom,height), min(right,width))
+            if clippedTop < clippedBottom and clippedLeft < clippedRight:
+                patch = frame[clippedTop:clippedBottom,clippedLeft:clippedRight,2]
+                patch[...] = np.clip(patch + brightness * self._spotProfile[clippedTop - top:clippedBottom - top,clippedLeft - left:clippedRight - left],0,255)
+        return frame
+
+    # Method that waits for the next frame and returns it rendered from the stage position at its capture time
+    def getImage(self):
+        with self._frameLock:
+            if self.lastFrameTime is not None:
+                waitTime = self.lastFrameTime + 1.0 / self.frameRate - TLClock.monotonicTime()
+                if waitTime > 0:
+                    time.sleep(waitTime)
+            captureTime = TLClock.monotonicTime()
+            # Frames are paced from the previous frame time so a late frame does not shift the ones after it
+            if self.lastFrameTime is not None and captureTime - self.lastFrameTime < 2.0 / self.frameRate:
+                self.lastFrameTime += 1.0 / self.frameRate
+            else:
+                self.lastFrameTime = captureTime
+            self.frameCount += 1
+
+        position = tuple(self.positionSource())
+        return SyntheticImage(self.renderFrame(position),captureTime,position)
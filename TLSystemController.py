@@ -7,28 +7,38 @@ into the UI.
 ## Imports
 # Built in modules
 import multiprocessing # Allows us to access process controls
+import Queue # Allows the command queue to be read with a timeout
 import threading # Allows for the usage of threads (TESTING)
 import time # TEMPT FOR TESTING
 import datetime
 import datetime
-import csv
 import numpy as np
 import math
 # Custom modules
-import TLXYZStages # Specific XPS stages
+import TLStageSession # Connection to the XPS stages shared by the routines
+import TLXYZStages # Connection error of the stages
 import TLPixelCounter # Method to counter number of pixels on screen
 import TLParameters # Global parameters shared between the processes
-import TLDataClass # Method holding the data class for the application
 import TLCircleFit # Method for fitting the collected data to a circle
+import TLPositionLatch # Position gathered by the XPS system during the sweeps
+import TLEdgeDetection # Scattering edges found in the samples of a sweep
+import TLClock # Monotonic time shared with the capture engine
+import TLVelocityScheduler # Plans the velocities of the routine passes
+import TLEdgePrediction # Predicts the edges of the routine passes from a cone fit
+import TLConeFit # Fits the apex, axis and half angle of the laser cone
+import TLTrace # Spans of the detections, the fits and the stage calls
+import TLLatency # Histograms of the latency from the detecting frame to the abort of the stages
 
 # System controller class that inherits threading
 class SystemController():
-    def __init__(self,thresholdPixelCount,queue_SCtoUI,queue_routineLoop,pipe_UItoPixel2):
+    def __init__(self,thresholdPixelCount,queue_SCtoUI,queue_routineLoop,sampleRing,event_scatteringDetected):
         # print('System Controller Initialized')
         # Creates the instance's queue connection with the UI
         self.queue_SCtoUI = queue_SCtoUI
         self.queue_routineLoop = queue_routineLoop
-        self.pipe_UItoPixel2 = pipe_UItoPixel2
+        # Shared ring buffer of pixel counts and the scattering detected event shared with the UI
+        self.sampleRing = sampleRing
+        self.event_scatteringDetected = event_scatteringDetected
 
         # Creates the dictionary of commands
         self._commandList = {
@@ -59,46 +69,121 @@ class SystemController():
         # Sets the initial routine movement velocity
         self.velocityRoutineInitial = 0.005
 
-        # Sets the precise routine movement velocity
-        self.velocityRoutinePrecise = 0.001
-
-        # Sets the "backup" distance for the precise movement
-        self.routineBackupDistance = .025 #[mm]
+        # Velocity scheduler that plans the coarse and precise velocities and the backup distance of each pass in collectDataPoint
+        self.velocityScheduler = TLVelocityScheduler.VelocityScheduler(maximumVelocity=self.velocityMovement)
+        # Sets the single sweep velocity
+        self.velocityRoutineSweep = TLVelocityScheduler.singleSweepVelocity
+
+        # Position latching mode, the XPS system gathers the stage position during the precise sweeps and the position
+        # at the capture time of the detecting frame is recorded instead of the position the stages stop at
+        self.positionLatching = False
+        # Position latch of the sweep in progress and the capture time of the frame of the last scattering detection
+        self.positionLatch = None
+        self.lastScatteringTime = None
+
+        # Latency measurement mode, every detection is timed from the capture of its frame to the acknowledgement of the
+        # abort that follows it and the latency histograms of the routine are written next to its data file
+        self.latencyMeasurement = False
+        self.detectionLatencies = TLLatency.DetectionLatencies()
+
+        # Single sweep mode, both sides of the cone are found in one continuous sweep (and the top in a second one) and the
+        # edges are extracted from the samples streamed during the sweep, instead of stopping and restarting for each edge
+        self.singleSweepCapture = False
+        # Time the stages keep sweeping after the last edge so that the edge fit has samples on both sides of it
+        self.sweepOvershootTime = 0.25 #[s]
+        # Edge detector for the samples of the sweeps
+        self.edgeDetector = TLEdgeDetection.EdgeDetector(thresholdPixelCount)
+        # (time, x, y, z, pixel count) samples streamed during the last sweep
+        self.lastSweepSamples = np.zeros((0,5))
 
         # Sets the slope of the laser beam
         self.laserSlope = 25e-3
+        # Edge predictor that seeds the start point and sweep length of each pass from a cone fit of the previous edges
+        self.edgePredictor = TLEdgePrediction.EdgePredictor(self.laserSlope)
         # Sets the target radius of the laser cone
         self.targetRadius = 0.06 #[mm]
+        # Circle fit method ('algebraic', 'taubin' or 'geometric') and outlier rejection (None, 'huber' or 'ransac') of the cone cross sections
+        # The algebraic fit without rejection has the smallest radius error on clean cross sections (benchmarkCircleFitBias.py)
+        self.circleFitMethod = 'algebraic'
+        self.circleOutlierRejection = None
+        # Cone fitter for the apex, axis and half angle of the laser cone, the routine stops collecting cross sections once
+        # its fit has converged
+        self.coneFit = TLConeFit.ConeFit(self.laserSlope)
+        # Largest number of cross sections (three passes each) collected by the routine
+        self.maximumRoutineLevels = 4
+
+        # Time to wait for a command before running the heartbeat
+        self.heartbeatInterval = 1.0 #[s]
+        # Thread of the jog in progress (moveStagesRelative), joined before the next command uses socket 1
+        # The abort commands are not held back by the jog as they send on socket 2 and stop it
+        self._jogThread = None
+        self._abortCommands = ['stopTipLocatorRoutine','abortRoutine']
+        # Keeps the system controller loop running until it is shut down
+        self.systemControllerRunning = True
 
     ## Method to run the system controller loop
-    # The loop is always running and responds based on the commands received from the pipe
+    # The loop blocks until a command is received from the queue and dispatches it
+    # Commands are tuples of the command name and a dictionary of the keyword arguments for the command
     def run(self):
         # print('System Controller Run')
 
         # Initializes the equipment
         # print('Initializing Equipment')
         self.initializeEquipment()
-        # Primary system controller loop that is always running
-        while True:
-            # Checks to see if there queue is empty, if not gets the command
-            # print('Checking for items in queue')
-
-            if not self.queue_SCtoUI.empty():
-                print('Attempting to retrieve command from queue')
-                # Gets the next command from the queue
-                _command = self.queue_SCtoUI.get()
-                print('Received command {}'.format(_command))
-                self._commandList[_command]()
+        # Primary system controller loop that runs until the system controller is shut down
+        while self.systemControllerRunning:
+            # Waits for the next command, running the heartbeat if none arrives in time
+            try:
+                (_command, _payload) = self.queue_SCtoUI.get(timeout=self.heartbeatInterval)
+            except Queue.Empty:
+                self.heartbeat()
+                continue
+            print('Received command {}'.format(_command))
+            # Waits for the jog in progress, its move is waiting for its reply on socket 1 and the driver has no lock per socket
+            if _command not in self._abortCommands:
+                self.finishJog()
+            # A command that needs the stages while they can not connect is dropped, the heartbeat keeps trying to reconnect
+            try:
+                self._commandList[_command](**_payload)
+            except TLXYZStages.StageConnectionError as connectionError:
+                print('{} not run: {}'.format(_command,connectionError))
+
+    # Method run when no command has been received for the heartbeat interval
+    def heartbeat(self):
+        # Checks the connection to the stages and reconnects if it was lost
+        self.substrateStages = self.stageSession.checkConnection()
+        # Restarts the pixel counter if its process has stopped
+        if not self.routinePixelCounterProcess.is_alive():
+            print('Pixel counter process stopped, restarting it')
+            self.startPixelCounter()
 
     ## Initialization methods
     # Initializes the equipment
     def initializeEquipment(self):
-        # Creates the stages
-        self.substrateStages = TLXYZStages.XYZStages()
-        # Initializes the stages
-        self.substrateStages.initializeStages()
-
-        pass
+        # Creates the stage session that keeps one connection to the stages for the life of the system controller
+        self.stageSession = TLStageSession.StageSession()
+        # Connects and initializes the stages, the heartbeat tries again if they can not connect
+        self.substrateStages = self.stageSession.checkConnection()
+
+        # Starts the pixel counter
+        self.startPixelCounter()
+
+    # Method that returns the connected stages of the stage session, raises TLXYZStages.StageConnectionError if they can not connect
+    def acquireStages(self):
+        self.substrateStages = self.stageSession.acquireStages()
+        return self.substrateStages
+
+    # Method to start the pixel counter process that is armed for each scattering detection
+    def startPixelCounter(self):
+        # Creates the queues for communication with the pixel counter
+        self.queue_SCtoPixelCounter = multiprocessing.Queue()
+        self.queue_pixelCounterCommands = multiprocessing.Queue()
+        # Creates the pixel counter that is armed for each scattering detection
+        routinePixelCounter = TLPixelCounter.PixelCounter(self.queue_SCtoPixelCounter,self.queue_pixelCounterCommands,self.sampleRing,self.event_scatteringDetected)
+        # Starts the pixel counter process once so that it is ready before the first detection
+        self.routinePixelCounterProcess = multiprocessing.Process(target=routinePixelCounter.run, args=())
+        self.routinePixelCounterProcess.daemon = True
+        self.routinePixelCounterProcess.start()
 
     ## Routine method
     # Method to execute the tip locator routine
@@ -106,11 +191,18 @@ class SystemController():
     # def tipLocatorRoutine(self):
         print('Tip locator Routine started')
         # Clears the data storage object
-        TLParameters.kHNSCTL_dataStorageInstances = []
-
-        # Creates an instance of the stages for the routine
-        routineStages = TLXYZStages.XYZStages()
-        routineStages.initializeStages()
+        TLParameters.kHNSCTL_dataStore.clear()
+        # Clears the detection latencies of the previous routine
+        self.detectionLatencies.clear('tipLocatorRoutine')
+        # Clears the edges of the previous routine from the velocity scheduler
+        self.velocityScheduler.clearEdges()
+        self.edgePredictor.clear()
+        self.coneFit.clear()
+
+        # Uses the connected stages of the stage session for the routine
+        routineStages = self.acquireStages()
+        # Number of round trips to the XPS system before the routine starts
+        roundTripCountStart = routineStages.retrieveRoundTripCount()
 
         # Creates an instance of the circle fitter
         circleFit = TLCircleFit.CircleFit()
@@ -125,152 +217,57 @@ class SystemController():
         x_start = 73.7
         y_start = 35
         z_start = -1
-        routineStartingLocations = [x_start, y_start, z_start]
-
-        ## Routine to collect the data points
-        # Collects three data points from the stating point
-        print("Collecting Data Point 1")
-        dataMatrix1 = self.collectDataPoint(routineStartingLocations,routineMovementDirections,routineMovementDistances)
-
-        # Collects three more data points at the same length down the cone
-        print("Collecting Data Point 2")
-        # dataMatrix2 = self.collectDataPoint(routineStartingLocations+[0,0,-0.005],routineMovementDirections,routineMovementDistances)
-        dataMatrix2 = self.collectDataPoint([x_start, y_start, z_start-0.005],routineMovementDirections,routineMovementDistances)
-
-
-        # Collects three more data points at the same length down the cone
-        print("Collecting Data Point 3")
-        dataMatrix3 = self.collectDataPoint([x_start, y_start, z_start-0.008],routineMovementDirections,routineMovementDistances)
-
-        # Combines the three collected data sets
-        data_x = np.concatenate([dataMatrix1[0][:,0],dataMatrix2[0][:,0],dataMatrix3[0][:,0]])
-        data_y = np.concatenate([dataMatrix1[0][:,1],dataMatrix2[0][:,1],dataMatrix3[0][:,1]])
-        data_z = np.concatenate([dataMatrix1[0][:,2],dataMatrix2[0][:,2],dataMatrix3[0][:,2]])
-
-        print(data_x)
-        print(data_y)
-        print(data_z)
-
-        # Determines the diameter of the cone at for the combined data sets
-        circleResults = circleFit.fitCircle(data_x[:,0],data_z[:,0])
-
-        # print(circleResults)
-        print('Radius: {}'.format(circleResults[2]))
 
-        # Estimates the location for desired radius by passing prediction method the current radius
-        length_shift1 = self.prediction(circleResults[2])
+        # Offsets along z of the three passes of each cross section
+        routinePassOffsets = [0, -0.005, -0.008]
 
-        print(length_shift1)
-
-        ## Finds the radius again at the predicted length shift down the cone
         ## Routine to collect the data points
-        # Collects three data points from the stating point
-        print("Collecting Data Point 1")
-        dataMatrixp11 = self.collectDataPoint([x_start, y_start-length_shift1, z_start],routineMovementDirections,routineMovementDistances)
-
-        # Collects three more data points at the same length down the cone
-        print("Collecting Data Point 2")
-        dataMatrixp12 = self.collectDataPoint([x_start, y_start-length_shift1, z_start-0.005],routineMovementDirections,routineMovementDistances)
-
-
-        # Collects three more data points at the same length down the cone
-        print("Collecting Data Point 3")
-        dataMatrixp13 = self.collectDataPoint([x_start, y_start-length_shift1, z_start-0.008],routineMovementDirections,routineMovementDistances)
-
-        # Combines the three collected data sets
-        data_p1x = np.concatenate([dataMatrixp11[0][:,0],dataMatrixp12[0][:,0],dataMatrixp13[0][:,0]])
-        data_p1y = np.concatenate([dataMatrixp11[0][:,1],dataMatrixp12[0][:,1],dataMatrixp13[0][:,1]])
-        data_p1z = np.concatenate([dataMatrixp11[0][:,2],dataMatrixp12[0][:,2],dataMatrixp13[0][:,2]])
-
-        print(data_p1x)
-        print(data_p1y)
-        print(data_p1z)
-
-        # Determines the diameter of the cone at for the combined data sets
-        circleResults1P = circleFit.fitCircle(data_p1x[:,0],data_p1z[:,0])
-
-        # print(circleResults)
-        print('Radius: {}'.format(circleResults[2]))
-        print('Radius1P: {}'.format(circleResults1P[2]))
-
-        # Estimates the location for desired radius by passing prediction method the current radius
-        length_shift2 = self.prediction(circleResults1P[2])
-
-        print(length_shift2)
-
-        # ## After finding the diameter it checks the radius again
-        # # Finds the radius again at the predicted length shift down the cone
-        # ## Routine to collect the data points
-        # # Collects three data points from the stating point
-        # print("Collecting Data Point 1")
-        # dataMatrixp21 = self.collectDataPoint([x_start, y_start-length_shift2, z_start],routineMovementDirections,routineMovementDistances)
-        #
-        # # Collects three more data points at the same length down the cone
-        # print("Collecting Data Point 2")
-        # dataMatrixp22 = self.collectDataPoint([x_start, y_start-length_shift2, z_start-0.005],routineMovementDirections,routineMovementDistances)
-        #
-        #
-        # # Collects three more data points at the same length down the cone
-        # print("Collecting Data Point 3")
-        # dataMatrixp23 = self.collectDataPoint([x_start, y_start-length_shift2, z_start-0.008],routineMovementDirections,routineMovementDistances)
-        #
-        # # Combines the three collected data sets
-        # data_p2x = np.concatenate([dataMatrixp21[0][:,0],dataMatrixp22[0][:,0],dataMatrixp23[0][:,0]])
-        # data_p2y = np.concatenate([dataMatrixp21[0][:,1],dataMatrixp22[0][:,1],dataMatrixp23[0][:,1]])
-        # data_p2z = np.concatenate([dataMatrixp21[0][:,2],dataMatrixp22[0][:,2],dataMatrixp23[0][:,2]])
-        #
-        # print(data_p2x)
-        # print(data_p2y)
-        # print(data_p2z)
-        #
-        # # Determines the diameter of the cone at for the combined data sets
-        # circleResults2P = circleFit.fitCircle(data_p2x[:,0],data_p2z[:,0])
-        #
-        # # print(circleResults)
-        # print('Radius: {}'.format(circleResults[2]))
-        # print('Radius1P: {}'.format(circleResults1P[2]))
-        # print('Radius2P: {}'.format(circleResults2P[2]))
-
-        # # Estimates the location for desired radius by passing prediction method the current radius
-        # length_shift3 = self.prediction(circleResults2P[2])
-        #
-        # print(length_shift3)
-        #
-        # ## After finding the diameter it checks the radius again
-        # # Finds the radius again at the predicted length shift down the cone
-        # ## Routine to collect the data points
-        # # Collects three data points from the stating point
-        # print("Collecting Data Point 1")
-        # dataMatrixp31 = self.collectDataPoint([x_start, y_start-length_shift3, z_start],routineMovementDirections,routineMovementDistances)
-        #
-        # # Collects three more data points at the same length down the cone
-        # print("Collecting Data Point 2")
-        # dataMatrixp32 = self.collectDataPoint([x_start, y_start-length_shift3, z_start-0.005],routineMovementDirections,routineMovementDistances)
-        #
-        #
-        # # Collects three more data points at the same length down the cone
-        # print("Collecting Data Point 3")
-        # dataMatrixp33 = self.collectDataPoint([x_start, y_start-length_shift3, z_start-0.008],routineMovementDirections,routineMovementDistances)
-        #
-        # # Combines the three collected data sets
-        # data_p3x = np.concatenate([dataMatrixp31[0][:,0],dataMatrixp32[0][:,0],dataMatrixp33[0][:,0]])
-        # data_p3y = np.concatenate([dataMatrixp31[0][:,1],dataMatrixp32[0][:,1],dataMatrixp33[0][:,1]])
-        # data_p3z = np.concatenate([dataMatrixp31[0][:,2],dataMatrixp32[0][:,2],dataMatrixp33[0][:,2]])
-        #
-        # print(data_p3x)
-        # print(data_p3y)
-        # print(data_p3z)
-        #
-        # # Determines the diameter of the cone at for the combined data sets
-        # circleResults3P = circleFit.fitCircle(data_p3x[:,0],data_p3z[:,0])
-        #
-        # # print(circleResults)
-        # print('Radius: {}'.format(circleResults[2]))
-        # print('Radius1P: {}'.format(circleResults1P[2]))
-        # print('Radius2P: {}'.format(circleResults2P[2]))
-        # print('Radius3P: {}'.format(circleResults3P[2]))
-
-        # Repeat process as needed (Maybe loop that runs while diameter isn't within a certain range)
+        # Collects a cross section at the starting point, then at the length shift predicted for the target radius, until the
+        # cone fit of all the points collected has converged (or the maximum number of cross sections is reached)
+        y_level = y_start
+        for routineLevel in range(self.maximumRoutineLevels):
+            # Index of the first data point of the cross section in the data store
+            levelStart = len(TLParameters.kHNSCTL_dataStore)
+            for (passIndex, z_offset) in enumerate(routinePassOffsets):
+                print("Collecting Data Point {}".format(passIndex + 1))
+                self.collectDataPoint([x_start, y_level, z_start + z_offset],routineMovementDirections,routineMovementDistances)
+
+            # Views of the points of the three passes and of all the points of the routine
+            levelPoints = TLParameters.kHNSCTL_dataStore.positions(levelStart)
+            routinePoints = TLParameters.kHNSCTL_dataStore.positions()
+
+            print(levelPoints[:,0])
+            print(levelPoints[:,1])
+            print(levelPoints[:,2])
+
+            # Determines the diameter of the cone at for the combined data sets
+            with TLTrace.span('fitCircle','fitting'):
+                circleResults = circleFit.fitCircle(levelPoints[:,0],levelPoints[:,2],self.circleFitMethod,self.circleOutlierRejection)
+            print('Radius: {}'.format(circleResults[2]))
+            # Edges on a line give no circle (a nan radius), the routine stops there rather than move the stages to a nan level
+            if not np.isfinite(circleResults[2]):
+                print('Cross section could not be fitted, its edges are on a line. Stopping the routine')
+                break
+
+            # Fits the cone to all the points collected once there are two cross sections, and stops when it has converged
+            if routineLevel > 0:
+                with TLTrace.span('coneFit','fitting',numberOfPoints=len(routinePoints)):
+                    self.coneFit.fit(routinePoints)
+                print('Cone apex: {} +/- {}'.format(self.coneFit.apex,self.coneFit.apexError))
+                print('Cone axis: {} +/- {}'.format(self.coneFit.axis,self.coneFit.axisError))
+                print('Cone half angle: {} +/- {}'.format(self.coneFit.halfAngle,self.coneFit.halfAngleError))
+                if self.coneFit.converged():
+                    print('Cone fit converged after {} cross sections'.format(routineLevel + 1))
+                    break
+
+            # Estimates the location for desired radius by passing prediction method the current radius
+            length_shift = self.prediction(circleResults[2])
+            print(length_shift)
+
+            ## Finds the radius again at the predicted length shift down the cone
+            y_level = y_level - length_shift
+
+        print('XPS round trips for the routine: {}'.format(routineStages.retrieveRoundTripCount() - roundTripCountStart))
 
         # Signals the end of the routine loop
         self.queue_routineLoop.put('End routine loop')
@@ -290,9 +287,18 @@ class SystemController():
     # Method for collecting a single pass
     def collectDataPoint(self,startingLocation,movementDirection,movementDistance):
         # print('collectDataPoint accessed')
-        # Creates an instance of the stages for the routine
-        routineStages = TLXYZStages.XYZStages()
-        routineStages.initializeStages()
+        # Starts next to the cone and only sweeps across it when the edges of the previous passes predict where it is
+        (coldStartingLocation, coldMovementDistance) = (startingLocation, movementDistance)
+        (startingLocation, movementDistance) = self.seedPass(startingLocation,movementDirection,movementDistance)
+        # The data points of the pass are stored together under a new pass id
+        TLParameters.kHNSCTL_dataStore.startPass()
+
+        # Finds the edges with continuous sweeps in single sweep mode
+        if self.singleSweepCapture:
+            return self.collectDataPointSingleSweep(startingLocation,movementDirection,movementDistance)
+
+        # Uses the connected stages of the stage session for the routine
+        routineStages = self.acquireStages()
 
         ## Data point collection
         # Updates the stages velocity so that they move to the start position faster
@@ -302,186 +308,274 @@ class SystemController():
         # print('Moving to starting position')
         routineStages.moveStageAbsolute(self.substrateStages.macroGroup,startingLocation)
 
-        # Updates the stages velocity to the initial routine velocity
-        routineStages.updateStageVelocity(self.velocityRoutineInitial)
-
-        # Creates the thread for the stages that will be moving in the routine
-        # print('Starting first inital routine stage movement')
-        routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(movementDirection,movementDistance))
-        routineStagesThread.start()
+        # Falls back to the starting position without the prediction if the seeded start is already inside the cone
+        if startingLocation != coldStartingLocation and self.isPastEdge('begin'):
+            print('Seeded start is past side 1, starting from {} instead'.format(coldStartingLocation))
+            (startingLocation, movementDistance) = (coldStartingLocation, coldMovementDistance)
+            routineStages.moveStageAbsolute(self.substrateStages.macroGroup,startingLocation)
 
         ### First step of the routine, find side 1
         print('STARTING STEP 1')
-        # time.sleep(5)
-        ## Begins scattering event detection
-        # Informs the UI to start processing the video feed
-        self.queue_routineLoop.put('Start video processing')
-        # Starting the scattering detection
-        # print('Starting scattering detection begin')
-        pixelTriggerValue1Initial = self.detectScatteringBegin()
+        [x1,y1,z1,pixelTriggerValue1] = self.findEdgeStopAndRestart(routineStages,movementDirection,movementDistance,'begin','side 1')
+        print('Stage position: {},{},{}'.format(x1,y1,z1))
 
-        # Stops the stage movement when scattering is detected
-        # print('Aborting Stage Movement')
-        routineStages.moveStageAbort()
-        time.sleep(.1)
+        # Creates a data point with the stage position, pixel count, and point type
+        TLParameters.kHNSCTL_dataStore.append(x1,y1,z1,pixelTriggerValue1,1)
 
-        ## Moves the stages back and starts detection again at precise velocity
-        # Sets the stage velocity to initial velocity
-        routineStages.updateStageVelocity(self.velocityRoutineInitial)
-        # Gets the current stage location
-        [x1b,y1b,z1b] = routineStages.retrieveStagePosition()
-        # Moves the stages in the x direction by the backup distance
-        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[x1b-self.routineBackupDistance,y1b,z1b])
+        ### Second step of the routine, find side 2
+        print('STARTING STEP 2')
+        [x2,y2,z2,pixelTriggerValue2] = self.findEdgeStopAndRestart(routineStages,movementDirection,movementDistance,'end','side 2')
+        # print('Stage position: {},{},{}'.format(x2,y2,z2))
 
-        ## Starts the stage movement again
-        # Creates the thread for the stages that will be moving in the routine
-        # print('Starting first precise routine stage movement')
-        routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(movementDirection,movementDistance))
-        routineStagesThread.start()
+        # Creates a data point with the stage position, pixel count, and point type
+        TLParameters.kHNSCTL_dataStore.append(x2,y2,z2,pixelTriggerValue2,2)
 
-        ## Begins scattering event detection for precise pass
-        # Informs the UI to start processing the video feed
-        self.queue_routineLoop.put('Start video processing')
-        # Starting the scattering detection
-        # print('Starting scattering detection begin')
-        pixelTriggerValue1 = self.detectScatteringBegin()
+        ### Third step of the rountine, split the two sides and find the top
+        print('STARTING STEP 3')
+        # Determines the midpoint for each of the coordinates of the first two data points
+        x_mid = (x2 + x1)/2
+        y_mid = (y2 + y1)/2
+        z_mid = (z2 + z1)/2
 
-        # Stops the stage movement when scattering is detected
-        routineStages.moveStageAbort()
-        time.sleep(.1)
+        # Updates the stages velocity so that they move to the start position faster
+        routineStages.updateStageVelocity(self.velocityMovement)
 
-        # Retrieving stage position after precise detection
-        # print('Retrieving stage position')
-        [x1,y1,z1] = routineStages.retrieveStagePosition()
-        print('Stage position: {},{},{}'.format(x1,y1,z1))
+        # Moves the stages to the midpoint
+        # print('Moving to mid position: {},{},{}'.format(x_mid,y_mid,z_mid))
+        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[x_mid,y_mid,z_mid])
+
+        # Raises the stages until the scattering ends
+        [x3,y3,z3,pixelTriggerValue3] = self.findEdgeStopAndRestart(routineStages,self.substrateStages.positioner_Z,[-0.5],'end','top')
+        # print('Stage position: {},{},{}'.format(x3,y3,z3))
 
         # Creates a data point with the stage position, pixel count, and point type
-        TLDataClass.TLData(x1,y1,z1,pixelTriggerValue1,1,datetime.datetime.now().time())
+        TLParameters.kHNSCTL_dataStore.append(x3,y3,z3,pixelTriggerValue3,3)
 
-        ### Second step of the routine, find side 2
-        print('STARTING STEP 2')
-        # time.sleep(5)
+        # Positions of the three data points of the pass
+        dataMatrix = TLParameters.kHNSCTL_dataStore.passPositions(TLParameters.kHNSCTL_dataStore.currentPassId)
 
-        # Updates the stages velocity to the initial routine velocity
-        routineStages.updateStageVelocity(self.velocityRoutineInitial)
+        # Adds the edges to the cone fit for the predictions of the next passes
+        with TLTrace.span('addEdges','fitting'):
+            self.edgePredictor.addEdges(dataMatrix)
 
+        return[dataMatrix]
+
+    # Method that seeds a pass from the edges predicted by the cone fit of the previous passes
+    # The velocity scheduler is given the predicted edges, the start point is moved up to the window before side 1 and the
+    # sweep length is cut to the window after side 2
+    # Returns the (startingLocation, movementDistance) of the pass, unchanged when there is no prediction
+    def seedPass(self,startingLocation,movementDirection,movementDistance):
+        predictedEdges = self.edgePredictor.predictEdges(startingLocation[1],startingLocation[2])
+        if len(predictedEdges) == 0 or movementDirection != self.substrateStages.positioner_X:
+            return startingLocation, movementDistance
+        for (edgeName, (edgeLocation, edgeUncertainty)) in predictedEdges.items():
+            self.velocityScheduler.setEdgePrediction(edgeName,edgeLocation,edgeUncertainty)
+
+        # Side 1 is the first side crossed in the direction of the movement
+        motionSign = 1 if movementDistance[0] > 0 else -1
+        ((side1, side1Uncertainty), (side2, side2Uncertainty)) = (predictedEdges['side 1'], predictedEdges['side 2'])
+        if motionSign < 0:
+            ((side1, side1Uncertainty), (side2, side2Uncertainty)) = ((side2, side2Uncertainty), (side1, side1Uncertainty))
+            self.velocityScheduler.setEdgePrediction('side 1',side1,side1Uncertainty)
+            self.velocityScheduler.setEdgePrediction('side 2',side2,side2Uncertainty)
+
+        # Window kept around the predicted sides
+        side1Window = self.velocityScheduler.safetyFactor * max(side1Uncertainty,self.velocityScheduler.minimumWindow)
+        side2Window = self.velocityScheduler.safetyFactor * max(side2Uncertainty,self.velocityScheduler.minimumWindow)
+
+        # Never starts further than the original start point, or sweeps further than the original distance
+        seededStart = list(startingLocation)
+        if (side1 - motionSign * side1Window - startingLocation[0]) * motionSign > 0:
+            seededStart[0] = side1 - motionSign * side1Window
+        sweepLength = min(abs(movementDistance[0]),(side2 + motionSign * side2Window - seededStart[0]) * motionSign)
+        seededDistance = [motionSign * sweepLength]
+
+        print('Seeded pass: start x {:.4f} mm (was {:.4f} mm), sweep {:.4f} mm (was {:.4f} mm)'.format(seededStart[0],startingLocation[0],sweepLength,abs(movementDistance[0])))
+        return seededStart, seededDistance
+
+    # Method that finds an edge ('begin' or 'end') with a coarse pass, backs up and finds it again with a precise pass
+    # The approach, velocities and backup distance are planned by the velocity scheduler for the edge name
+    # Returns the [x, y, z, pixelCount] of the edge found by the precise pass
+    def findEdgeStopAndRestart(self,routineStages,movementDirection,movementDistance,edgeType,edgeName):
+        # Axis and sign of the movement
+        movementAxis = [routineStages.positioner_X,routineStages.positioner_Y,routineStages.positioner_Z].index(movementDirection)
+        motionSign = 1 if movementDistance[0] > 0 else -1
+
+        # Plans the passes from the current stage position
+        self.updateMeasuredFrameRate()
+        passStart = list(routineStages.retrieveStagePosition())
+        (approachDistance, coarseVelocity, backupDistance, preciseVelocity) = self.velocityScheduler.planPass(edgeName,passStart[movementAxis],motionSign)
+        print('Pass plan for {}: approach {:.4f} mm, coarse {:.4f} mm/s, backup {:.4f} mm, precise {:.4f} mm/s'.format(edgeName,approachDistance,coarseVelocity,backupDistance,preciseVelocity))
+
+        # Moves quickly up to the window around the predicted edge
+        if approachDistance > 0:
+            routineStages.updateStageVelocity(self.velocityMovement,[movementDirection])
+            routineStages.moveStageRelative(movementDirection,[motionSign * approachDistance])
+
+            # A misprediction can put the stages past the edge, where the detection would fire at once at the wrong
+            # position, the coarse pass then starts from the pass start without the approach
+            if self.isPastEdge(edgeType):
+                print('Approach went past {}, sweeping from the pass start'.format(edgeName))
+                routineStages.moveStageAbsolute(self.substrateStages.macroGroup,passStart)
+
+        ## Coarse pass
         # Creates the thread for the stages that will be moving in the routine
-        # print('Starting second initial routine stage movement')
+        routineStages.updateStageVelocity(coarseVelocity,[movementDirection])
         routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(movementDirection,movementDistance))
         routineStagesThread.start()
 
-        ## Begins scattering event ending detection
-        # Informs the UI to start processing the video feed
-        self.queue_routineLoop.put('Start video processing')
-        # print('Starting scattering detection end')
-        pixelTriggerValue2Initial = self.detectScatteringEnding()
-
-        # Stops the stage movement
-        routineStages.moveStageAbort()
+        # Stops the stage movement when scattering is detected
+        self.detectScatteringEdge(edgeType)
+        self.abortDetectionMove(routineStages,routineStagesThread)
         time.sleep(.1)
 
-        ## Moves the stages back and starts detection again at precise velocity
-        # Sets the stage velocity to initial velocity
-        routineStages.updateStageVelocity(self.velocityRoutineInitial)
-        # Gets the current stage location
-        [x2b,y2b,z2b] = routineStages.retrieveStagePosition()
-        # Moves the stages in the x direction by the backup distance
-        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[x2b-self.routineBackupDistance,y2b,z2b])
+        ## Moves the stages back by the backup distance
+        backupPosition = list(routineStages.retrieveStagePosition())
+        backupPosition[movementAxis] -= motionSign * backupDistance
+        routineStages.updateStageVelocity(self.velocityMovement,[movementDirection])
+        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,backupPosition)
 
-        ## Starts the stage movement again
+        ## Precise pass
+        # Starts latching the stage position for the precise pass
+        self.startPositionLatch(routineStages)
         # Creates the thread for the stages that will be moving in the routine
-        # print('Starting second precise routine stage movement')
+        routineStages.updateStageVelocity(preciseVelocity,[movementDirection])
         routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(movementDirection,movementDistance))
         routineStagesThread.start()
 
-        ## Begins scattering event detection for precise pass
-        # Informs the UI to start processing the video feed
-        self.queue_routineLoop.put('Start video processing')
-        # Starting the scattering detection
-        # print('Starting scattering detection begin')
-        pixelTriggerValue2 = self.detectScatteringEnding()
+        # Stops the stage movement when scattering is detected and retrieves the stage position of the detection
+        pixelTriggerValue = self.detectScatteringEdge(edgeType)
+        edgePosition = list(self.retrieveDetectionPosition(routineStages,routineStagesThread))
 
-        # Stops the stage movement when scattering is detected
-        routineStages.moveStageAbort()
-        time.sleep(.1)
-
-        # Retrieving stage position
-        # print('Retrieving stage position')
-        [x2,y2,z2] = routineStages.retrieveStagePosition()
-        # print('Stage position: {},{},{}'.format(x2,y2,z2))
+        # Keeps the edge location for the plans of the next passes
+        self.velocityScheduler.recordEdge(edgeName,edgePosition[movementAxis])
 
-        # Creates a data point with the stage position, pixel count, and point type
-        TLDataClass.TLData(x2,y2,z2,pixelTriggerValue2,2,datetime.datetime.now().time())
+        return edgePosition + [pixelTriggerValue]
 
-        ### Third step of the rountine, split the two sides and find the top
-        print('STARTING STEP 3')
-        # time.sleep(5)
-        # Determines the midpoint for each of the coordinates of the first two data points
-        x_mid = (x2 + x1)/2
-        y_mid = (y2 + y1)/2
-        z_mid = (z2 + z1)/2
+    # Method that returns True if the stages are already past an edge ('begin' or 'end'), from the pixel count of a frame
+    # captured once the stages have stopped (False if no frame arrives within the timeout)
+    # The count is compared with the threshold like TLPixelCounter.isScatteringEvent, so the stages are past an edge exactly
+    # when a detection of that edge would trigger
+    def isPastEdge(self,edgeType,timeout=1.0):
+        # Skips the frame that may have been exposed while the stages were still moving
+        stopTime = TLClock.monotonicTime() + self.velocityScheduler.frameInterval
+        ringPosition = self.sampleRing.currentPosition()
+        while True:
+            (samples, ringPosition) = self.sampleRing.readSince(ringPosition,timeout)
+            if len(samples) == 0:
+                print('No frame to check the side of the {} edge'.format(edgeType))
+                return False
+            for (timestamp, pixelCount) in samples:
+                if timestamp >= stopTime:
+                    if edgeType == 'begin':
+                        return pixelCount > self.thresholdPixelCount
+                    return pixelCount <= self.thresholdPixelCount
+
+    # Method to update the frame rate of the velocity scheduler from the capture times of the latest samples
+    def updateMeasuredFrameRate(self):
+        (samples, ringPosition) = self.sampleRing.readSince(max(self.sampleRing.currentPosition() - 30,0),timeout=0)
+        self.velocityScheduler.updateFrameRate([sample[0] for sample in samples])
+
+    # Method for collecting a single pass in single sweep mode
+    def collectDataPointSingleSweep(self,startingLocation,movementDirection,movementDistance):
+        # Uses the connected stages of the stage session for the routine
+        routineStages = self.acquireStages()
 
-        # Updates the stages velocity so that they move to the start position faster
+        # Moves the stages to the starting position for the scan
         routineStages.updateStageVelocity(self.velocityMovement)
+        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,startingLocation)
 
-        # Moves the stages to the midpoint
-        # print('Moving to mid position: {},{},{}'.format(x_mid,y_mid,z_mid))
-        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[x_mid,y_mid,z_mid])
+        ### First and second steps of the routine, sweeps through side 1 and side 2
+        print('STARTING STEPS 1 AND 2')
+        routineStages.updateStageVelocity(self.velocityRoutineSweep,[movementDirection])
+        [[x1,y1,z1,pixelTriggerValue1],[x2,y2,z2,pixelTriggerValue2]] = self.sweepEdges(routineStages,movementDirection,movementDistance,['begin','end'])
+        print('Stage position: {},{},{}'.format(x1,y1,z1))
 
-        # Updates the stages velocity so that they move to the start position faster
-        routineStages.updateStageVelocity(self.velocityRoutineInitial)
+        # Creates the data points with the stage position, pixel count, and point type
+        TLParameters.kHNSCTL_dataStore.append(x1,y1,z1,pixelTriggerValue1,1)
+        TLParameters.kHNSCTL_dataStore.append(x2,y2,z2,pixelTriggerValue2,2)
 
-        # Begin raising the stages
-        # print('Starting third initial routine stage movement')
-        routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(self.substrateStages.positioner_Z,[-0.5]))
-        routineStagesThread.start()
+        ### Third step of the rountine, split the two sides and find the top
+        print('STARTING STEP 3')
+        # Moves the stages to the midpoint of the first two data points
+        routineStages.updateStageVelocity(self.velocityMovement)
+        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[(x2 + x1)/2,(y2 + y1)/2,(z2 + z1)/2])
 
-        ## Begins scattering event ending detection
-        # Informs the UI to start processing the video feed
-        self.queue_routineLoop.put('Start video processing')
-        # print('Starting scattering detection end')
-        pixelTriggerValue3Initial = self.detectScatteringEnding()
+        # Raises the stages until the scattering ends
+        routineStages.updateStageVelocity(self.velocityRoutineSweep,[self.substrateStages.positioner_Z])
+        [[x3,y3,z3,pixelTriggerValue3]] = self.sweepEdges(routineStages,self.substrateStages.positioner_Z,[-0.5],['end'])
 
-        # Stops the stage movement
-        routineStages.moveStageAbort()
-        time.sleep(.1)
+        # Creates a data point with the stage position, pixel count, and point type
+        TLParameters.kHNSCTL_dataStore.append(x3,y3,z3,pixelTriggerValue3,3)
 
-        ## Moves the stages back and starts detection again at precise velocity
-        # Sets the stage velocity to initial velocity
-        routineStages.updateStageVelocity(self.velocityRoutineInitial)
-        # Gets the current stage location
-        [x3b,y3b,z3b] = routineStages.retrieveStagePosition()
-        # Moves the stages in the x direction by the backup distance
-        routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[x3b,y3b,z3b+self.routineBackupDistance])
-
-        ## Starts the stage movement again
-        # Begin raising the stages
-        # print('Starting third precise routine stage movement')
-        routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(self.substrateStages.positioner_Z,[-0.5]))
-        routineStagesThread.start()
+        # Positions of the three data points of the pass
+        dataMatrix = TLParameters.kHNSCTL_dataStore.passPositions(TLParameters.kHNSCTL_dataStore.currentPassId)
 
-        ## Begins scattering event detection for precise pass
-        # Informs the UI to start processing the video feed
-        self.queue_routineLoop.put('Start video processing')
-        # Starting the scattering detection
-        # print('Starting scattering detection begin')
-        pixelTriggerValue3 = self.detectScatteringEnding()
+        # Adds the edges to the cone fit for the predictions of the next passes
+        with TLTrace.span('addEdges','fitting'):
+            self.edgePredictor.addEdges(dataMatrix)
 
-        # Stops the stage movement when scattering is detected
-        routineStages.moveStageAbort()
-        time.sleep(.1)
+        return[dataMatrix]
 
-        # Retrieving stage position
-        # print('Retrieving stage position')
-        [x3,y3,z3] = routineStages.retrieveStagePosition()
-        # print('Stage position: {},{},{}'.format(x3,y3,z3))
+    # Method that sweeps the stages until the edges of the types given ('begin' or 'end') have been detected one after the other
+    # Returns the [x, y, z, pixelCount] of each edge, interpolated from the samples streamed during the sweep
+    def sweepEdges(self,routineStages,movementDirection,movementDistance,edgeTypes):
+        # Samples published from now on belong to the sweep
+        ringPosition = self.sampleRing.currentPosition()
 
-        # Creates a data point with the stage position, pixel count, and point type
-        TLDataClass.TLData(x3,y3,z3,pixelTriggerValue3,3,datetime.datetime.now().time())
+        # Starts gathering the stage positions (position latching mode) and records where the sweep starts
+        self.startPositionLatch(routineStages)
+        sweepStartPosition = list(routineStages.retrieveStagePosition())
+        sweepStartTime = TLClock.monotonicTime()
 
-        dataMatrix = np.matrix(([x1,y1,z1],[x2,y2,z2],[x3,y3,z3]))
+        # Creates the thread for the stages that will be moving in the sweep
+        routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(movementDirection,movementDistance))
+        routineStagesThread.start()
 
-        return[dataMatrix]
+        # Watches for each edge in turn while the stages keep moving
+        detectionTimes = []
+        for edgeType in edgeTypes:
+            self.detectScatteringEdge(edgeType)
+            detectionTimes.append(self.lastScatteringTime)
+
+        # Stops the stages once the last edge is passed
+        time.sleep(self.sweepOvershootTime)
+        routineStages.moveStageAbort()
+        sweepStopTime = TLClock.monotonicTime()
+        routineStagesThread.join()
+
+        # Trajectory of the stages during the sweep, from the gathered positions
+        (trajectoryTimes, trajectoryPositions) = ([], [])
+        if self.positionLatch is not None:
+            (positionLatch, self.positionLatch) = (self.positionLatch, None)
+            positionLatch.stop()
+            (trajectoryTimes, trajectoryPositions) = positionLatch.retrieveTrajectory()
+        if len(trajectoryTimes) < 2:
+            # Without gathered positions the stages are taken to move at a constant velocity from the start to the stop position
+            time.sleep(.1)
+            trajectoryTimes = [sweepStartTime,sweepStopTime]
+            trajectoryPositions = [sweepStartPosition,list(routineStages.retrieveStagePosition())]
+
+        # Streams the samples of the sweep with the stage position of each sample
+        (samples, ringPosition) = self.sampleRing.readSince(ringPosition,timeout=0)
+        sampleTimes = np.array([sample[0] for sample in samples],dtype=float)
+        pixelCounts = np.array([sample[1] for sample in samples],dtype=float)
+        samplePositions = TLEdgeDetection.interpolatePositions(trajectoryTimes,trajectoryPositions,sampleTimes).reshape(-1,3)
+        self.lastSweepSamples = np.column_stack((sampleTimes,samplePositions,pixelCounts))
+
+        # Extracts the edges from the samples
+        edgePoints = []
+        for (edge, detectionTime) in zip(self.edgeDetector.findEdges(sampleTimes,pixelCounts,edgeTypes),detectionTimes):
+            if edge is None:
+                # Uses the frame that triggered the detection if the crossing is not in the samples (ring overwritten)
+                print('Edge not found in the sweep samples, using the detection frame')
+                (crossingTime, pixelTriggerValue) = (detectionTime, self.thresholdPixelCount)
+            else:
+                (crossingTime, crossingIndex) = edge
+                pixelTriggerValue = int(pixelCounts[crossingIndex])
+            edgePoints.append(TLEdgeDetection.interpolatePosition(trajectoryTimes,trajectoryPositions,crossingTime) + [pixelTriggerValue])
+
+        return edgePoints
 
     ## Routine methods to test the precision of the device vs stage speed
     # Method to start the testing routine
@@ -489,7 +583,9 @@ class SystemController():
     # def tipLocatorRoutine(self):
         # print('Tip locator routine started')
         # Clears the data storage object
-        TLParameters.kHNSCTL_dataStorageInstances = []
+        TLParameters.kHNSCTL_dataStore.clear()
+        # Clears the detection latencies of the previous routine
+        self.detectionLatencies.clear('tipLocatorRoutine_PrecisionTest')
 
         # Dictionary of the max movement distance for each routine pass
         routineMovementDistances = {
@@ -507,9 +603,10 @@ class SystemController():
         # dataPoints = len(routineStartingLocations)
         dataPoints = 30
 
-        # Creates an instance of the stages for the routine
-        routineStages = TLXYZStages.XYZStages()
-        routineStages.initializeStages()
+        # Uses the connected stages of the stage session for the routine
+        routineStages = self.acquireStages()
+        # Number of round trips to the XPS system before the routine starts
+        roundTripCountStart = routineStages.retrieveRoundTripCount()
 
         ## Data point collection
         # Loop that runs to collect the data points
@@ -522,8 +619,10 @@ class SystemController():
             routineStages.moveStageAbsolute(self.substrateStages.macroGroup,routineStartingLocations[str(1)])
 
             # Updates the stages velocity so that the routine is run slower
-            routineStages.updateStageVelocity(self.velocityRoutineInitial)
+            routineStages.updateStageVelocity(self.velocityRoutineInitial,[routineMovementDirections[str(1)]])
 
+            # Starts latching the stage position for the pass
+            self.startPositionLatch(routineStages)
             # Creates the thread for the stages that will be moving in the routine
             # print('Starting routine stage movement')
             routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(routineMovementDirections[str(1)],routineMovementDistances[str(1)]))
@@ -533,21 +632,18 @@ class SystemController():
             print('STARTING PRECISION TEST')
 
             ## Begins scattering event detection
-            # Informs the UI to start processing the video feed
-            self.queue_routineLoop.put('Start video processing')
             print('Starting scattering detection begin')
             pixelTriggerValue = self.detectScatteringBegin()
 
-            # Stops the stage movement
-            routineStages.moveStageAbort()
-
-            # Retrieving stage position
+            # Stops the stage movement and retrieves the stage position of the detection
             # print('Retrieving stage position')
-            [x1,y1,z1] = routineStages.retrieveStagePosition()
+            [x1,y1,z1] = self.retrieveDetectionPosition(routineStages,routineStagesThread,0)
             print('Stage position: {},{},{}'.format(x1,y1,z1))
 
             # Creates a data point with the stage position, pixel count, and point type
-            TLDataClass.TLData(x1,y1,z1,pixelTriggerValue,1,datetime.datetime.now().time())
+            TLParameters.kHNSCTL_dataStore.append(x1,y1,z1,pixelTriggerValue,1)
+
+        print('XPS round trips for the routine: {}'.format(routineStages.retrieveRoundTripCount() - roundTripCountStart))
 
         # Signals the end of the routine loop
         self.queue_routineLoop.put('End routine loop')
@@ -559,7 +655,9 @@ class SystemController():
     def tipLocatorRoutine_FocalPoint(self):
         # print('Tip locator routine started')
         # Clears the data storage object
-        TLParameters.kHNSCTL_dataStorageInstances = []
+        TLParameters.kHNSCTL_dataStore.clear()
+        # Clears the detection latencies of the previous routine
+        self.detectionLatencies.clear('tipLocatorRoutine_FocalPoint')
 
         # Dictionary of the max movement distance for each routine pass
         routineMovementDistances = {
@@ -682,9 +780,10 @@ class SystemController():
         dataPoints = len(routineStartingLocations)
         # dataPoints = 1
 
-        # Creates an instance of the stages for the routine
-        routineStages = TLXYZStages.XYZStages()
-        routineStages.initializeStages()
+        # Uses the connected stages of the stage session for the routine
+        routineStages = self.acquireStages()
+        # Number of round trips to the XPS system before the routine starts
+        roundTripCountStart = routineStages.retrieveRoundTripCount()
 
         ## Data point collection
         # Loop that runs to collect the data points
@@ -697,8 +796,10 @@ class SystemController():
             routineStages.moveStageAbsolute(self.substrateStages.macroGroup,routineStartingLocations[str(i+1)])
 
             # Updates the stages velocity so that the routine is run slower
-            routineStages.updateStageVelocity(0.001)
+            routineStages.updateStageVelocity(0.001,[routineMovementDirections[str(i+1)]])
 
+            # Starts latching the stage position for the pass
+            self.startPositionLatch(routineStages)
             # Creates the thread for the stages that will be moving in the routine
             # print('Starting routine stage movement')
             routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(routineMovementDirections[str(i+1)],routineMovementDistances[str(i+1)]))
@@ -722,21 +823,16 @@ class SystemController():
             # time.sleep(2)
 
             ## Begins scattering event detection
-            # Informs the UI to start processing the video feed
-            self.queue_routineLoop.put('Start video processing')
             print('Starting scattering detection begin')
             pixelTriggerValue = self.detectScatteringBegin()
 
-            # Stops the stage movement
-            routineStages.moveStageAbort()
-
-            # Retrieving stage position
+            # Stops the stage movement and retrieves the stage position of the detection
             # print('Retrieving stage position')
-            [x1,y1,z1] = routineStages.retrieveStagePosition()
+            [x1,y1,z1] = self.retrieveDetectionPosition(routineStages,routineStagesThread,0)
             print('Stage position: {},{},{}'.format(x1,y1,z1))
 
             # Creates a data point with the stage position, pixel count, and point type
-            TLDataClass.TLData(x1,y1,z1,pixelTriggerValue,1,datetime.datetime.now().time())
+            TLParameters.kHNSCTL_dataStore.append(x1,y1,z1,pixelTriggerValue,1)
 
             '''
             #######
@@ -765,8 +861,6 @@ class SystemController():
             routineStagesThread.start()
 
             ## Begins scattering event detection
-            # Informs the UI to start processing the video feed
-            self.queue_routineLoop.put('Start video processing')
             # print('Starting scattering detection')
             pixelTriggerValue = self.detectScatteringBegin()
 
@@ -780,33 +874,30 @@ class SystemController():
             print('Stage position: {},{},{}'.format(x,y,z))
 
             # Creates a data point with the stage position, pixel count, and point type
-            TLDataClass.TLData(x,y,z,pixelTriggerValue,2,datetime.datetime.now().time())
+            TLParameters.kHNSCTL_dataStore.append(x,y,z,pixelTriggerValue,2)
             '''
 
             ### Second step of the routine, find side 2
             print('STARTING STEP 2')
             # time.sleep(2)
+            # Starts latching the stage position for the pass
+            self.startPositionLatch(routineStages)
             # Creates the thread for the stages that will be moving in the routine
             print('Starting second routine stage movement')
             routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(routineMovementDirections[str(i+1)],routineMovementDistances[str(i+1)]))
             routineStagesThread.start()
 
             ## Begins scattering event ending detection
-            # Informs the UI to start processing the video feed
-            self.queue_routineLoop.put('Start video processing')
             print('Starting scattering detection end')
             pixelTriggerValue = self.detectScatteringEnding()
 
-            # Stops the stage movement
-            routineStages.moveStageAbort()
-
-            # Retrieving stage position
+            # Stops the stage movement and retrieves the stage position of the detection
             # print('Retrieving stage position')
-            [x2,y2,z2] = routineStages.retrieveStagePosition()
+            [x2,y2,z2] = self.retrieveDetectionPosition(routineStages,routineStagesThread,0)
             print('Stage position: {},{},{}'.format(x2,y2,z2))
 
             # Creates a data point with the stage position, pixel count, and point type
-            TLDataClass.TLData(x2,y2,z2,pixelTriggerValue,2,datetime.datetime.now().time())
+            TLParameters.kHNSCTL_dataStore.append(x2,y2,z2,pixelTriggerValue,2)
 
             ### Third step of the rountine, split the two sides and find the top
             print('STARTING STEP 3')
@@ -824,31 +915,30 @@ class SystemController():
             routineStages.moveStageAbsolute(self.substrateStages.macroGroup,[x_mid,y_mid,z_mid])
 
             # Updates the stages velocity so that they move to the start position faster
-            routineStages.updateStageVelocity(0.001)
+            routineStages.updateStageVelocity(0.001,[self.substrateStages.positioner_Z])
 
+            # Starts latching the stage position for the pass
+            self.startPositionLatch(routineStages)
             # Begin raising the stages
             print('Starting third routine stage movement')
             routineStagesThread = threading.Thread(target=routineStages.moveStageRelative, args=(self.substrateStages.positioner_Z,[-0.5]))
             routineStagesThread.start()
 
             ## Begins scattering event ending detection
-            # Informs the UI to start processing the video feed
-            self.queue_routineLoop.put('Start video processing')
             print('Starting scattering detection end')
             pixelTriggerValue = self.detectScatteringEnding()
 
-            # Stops the stage movement
-            routineStages.moveStageAbort()
-
-            # Retrieving stage position
+            # Stops the stage movement and retrieves the stage position of the detection
             # print('Retrieving stage position')
-            [x3,y3,z3] = routineStages.retrieveStagePosition()
+            [x3,y3,z3] = self.retrieveDetectionPosition(routineStages,routineStagesThread,0)
             print('Stage position: {},{},{}'.format(x3,y3,z3))
 
             # Creates a data point with the stage position, pixel count, and point type
-            TLDataClass.TLData(x3,y3,z3,pixelTriggerValue,3,datetime.datetime.now().time())
+            TLParameters.kHNSCTL_dataStore.append(x3,y3,z3,pixelTriggerValue,3)
 
 
+        print('XPS round trips for the routine: {}'.format(routineStages.retrieveRoundTripCount() - roundTripCountStart))
+
         # Signals the end of the routine loop
         self.queue_routineLoop.put('End routine loop')
         # Retrieves all of the data points collected
@@ -857,36 +947,75 @@ class SystemController():
         # optimization = TLOptimization.Optimization()
         # optimization.optimize()
 
+    # Method to start latching the stage position for the sweep that is about to start (position latching mode only)
+    def startPositionLatch(self,routineStages):
+        if self.positionLatching:
+            self.positionLatch = TLPositionLatch.PositionLatch(routineStages)
+            self.positionLatch.start()
+
+    # Method that stops the stages after a scattering detection and returns the stage position of the detection
+    # In position latching mode this is the position gathered at the capture time of the detecting frame,
+    # otherwise it is the position the stages stopped at once they have settled
+    # The thread of the aborted move is joined so its abort reply is read before the next command on socket 1
+    def retrieveDetectionPosition(self,routineStages,routineStagesThread,settleTime=.1):
+        self.abortDetectionMove(routineStages,routineStagesThread)
+
+        if self.positionLatch is not None:
+            (positionLatch, self.positionLatch) = (self.positionLatch, None)
+            positionLatch.stop()
+            detectionPosition = positionLatch.positionAt(self.lastScatteringTime)
+            if detectionPosition is not None:
+                return detectionPosition
+            print('No latched position at the detection time, reading the stage position')
+
+        time.sleep(settleTime)
+        return routineStages.retrieveStagePosition()
+
+    # Method that aborts the stage movement after a scattering detection, timing the abort in latency measurement mode
+    # Waits for the thread of the move to read the reply of the aborted move, as the thread and the next command share socket 1
+    def abortDetectionMove(self,routineStages,routineStagesThread):
+        abortSendTime = TLClock.monotonicTime()
+        routineStages.moveStageAbort()
+        if self.latencyMeasurement:
+            self.detectionLatencies.recordAbort(abortSendTime,TLClock.monotonicTime())
+        routineStagesThread.join()
+
+    # Method to watch for a scattering edge of a type ('begin' or 'end'), returns the pixel count that triggered the event
+    def detectScatteringEdge(self,edgeType):
+        if edgeType == 'begin':
+            return self.detectScatteringBegin()
+        else:
+            return self.detectScatteringEnding()
+
     # Method to watch for scattering event beginning
     def detectScatteringBegin(self):
         print('detectScatteringBegin accessed')
-        # Creates the queues for communication with pixel counter
-        queue_SCtoPixelCounter = multiprocessing.Queue()
-        # Creates the pixel counter that will be used for the routine
-        routinePixelCounter = TLPixelCounter.PixelCounter(queue_SCtoPixelCounter,self.pipe_UItoPixel2,self.thresholdPixelCount,'begin')
-        # print('Creating video process')
-        self.routinePixelCounterProcess = multiprocessing.Process(target=routinePixelCounter.run, args=())
-        self.routinePixelCounterProcess.daemon = True
-        # print('Starting pixel counter process')
-        self.routinePixelCounterProcess.start()
-
-        # Control loop for the tip locator routine. Runs until red pixels get above a certain number
-        # print('Starting location routine')
-        continueScanning = True
-        while continueScanning:
-            print('In routine')
-            # Gets the current red pixel counter
-            currentPixelCount = queue_SCtoPixelCounter.get()
-            print('SC pixel count - {}'.format(currentPixelCount))
-            # Checks to see what the current pixel count is and ends the loop once threashold is reached
-            if currentPixelCount >= self.thresholdPixelCount:
-                #Threshold met, stop scanning by setting continueScanning to False
-                continueScanning = False
-        print('End of loop Count:{}'.format(currentPixelCount))
-        print('Location found')
-        if queue_SCtoPixelCounter.get() == 'Pixel counter finished':
-            print('Received confirmation that pixel counter is finished')
-            self.routinePixelCounterProcess.terminate()
+        # Span from arming the pixel counter to the detection reaching the system controller
+        with TLTrace.span('detectScatteringBegin','controller') as detectionSpan:
+            # Arms the pixel counter to detect the scattering beginning
+            self.queue_pixelCounterCommands.put(('arm','begin',self.thresholdPixelCount))
+
+            # Control loop for the tip locator routine. Runs until red pixels get above a certain number
+            # print('Starting location routine')
+            continueScanning = True
+            while continueScanning:
+                print('In routine')
+                # Gets the current red pixel counter and the capture time of its frame
+                (self.lastScatteringTime, currentPixelCount, publishTime, detectionTime) = self.queue_SCtoPixelCounter.get()
+                receptionTime = TLClock.monotonicTime()
+                print('SC pixel count - {}'.format(currentPixelCount))
+                # Checks to see what the current pixel count is and ends the loop once threashold is reached
+                if currentPixelCount >= self.thresholdPixelCount:
+                    #Threshold met, stop scanning by setting continueScanning to False
+                    continueScanning = False
+            # Times the detection until the decision, the abort that follows completes it
+            if self.latencyMeasurement:
+                self.detectionLatencies.recordDetection(self.lastScatteringTime,publishTime,detectionTime,receptionTime,TLClock.monotonicTime())
+            print('End of loop Count:{}'.format(currentPixelCount))
+            print('Location found')
+            detectionSpan.annotate(pixelCount=currentPixelCount,captureTime=self.lastScatteringTime)
+        # Measures the time the detection took to reach the system controller from the capture of the frame
+        self.velocityScheduler.updateDetectionLatency(TLClock.monotonicTime() - self.lastScatteringTime)
 
         # Returns the number of pixels that triggered the event
         return currentPixelCount
@@ -894,81 +1023,71 @@ class SystemController():
     # Method to watch for scattering event ending
     def detectScatteringEnding(self):
         print('detectScatteringEnding accessed')
-        # Creates the queues for communication with pixel counter
-        queue_SCtoPixelCounter = multiprocessing.Queue()
-        # Creates the pixel counter that will be used for the routine
-        routinePixelCounter = TLPixelCounter.PixelCounter(queue_SCtoPixelCounter,self.pipe_UItoPixel2,self.thresholdPixelCount,'end')
-        # print('Creating video process')
-        self.routinePixelCounterProcess = multiprocessing.Process(target=routinePixelCounter.run, args=())
-        self.routinePixelCounterProcess.daemon = True
-        # print('Starting pixel counter process')
-        self.routinePixelCounterProcess.start()
-
-        # Control loop for the tip locator routine. Runs until red pixels go below a certain number
-        # print('Starting location routine')
-        continueScanning = True
-        while continueScanning:
-            # print('In routine')
-            # Gets the current red pixel counter
-            currentPixelCount = queue_SCtoPixelCounter.get()
-            print(currentPixelCount)
-            print(self.thresholdPixelCount)
-            # Checks to see what the current pixel count is and ends the loop once threashold is reached
-            if currentPixelCount <= self.thresholdPixelCount:
-                #Threshold met, stop scanning by setting continueScanning to False
-                print('Stopping because {} <= {}'.format(currentPixelCount,self.thresholdPixelCount))
-                continueScanning = False
-        print('End of loop Count:{}'.format(currentPixelCount))
-        print('Location found')
-        if queue_SCtoPixelCounter.get() == 'Pixel counter finished':
-            print('Received confirmation that pixel counter is finished')
-            self.routinePixelCounterProcess.terminate()
+        # Span from arming the pixel counter to the detection reaching the system controller
+        with TLTrace.span('detectScatteringEnding','controller') as detectionSpan:
+            # Arms the pixel counter to detect the scattering ending
+            self.queue_pixelCounterCommands.put(('arm','end',self.thresholdPixelCount))
+
+            # Control loop for the tip locator routine. Runs until red pixels go below a certain number
+            # print('Starting location routine')
+            continueScanning = True
+            while continueScanning:
+                # print('In routine')
+                # Gets the current red pixel counter and the capture time of its frame
+                (self.lastScatteringTime, currentPixelCount, publishTime, detectionTime) = self.queue_SCtoPixelCounter.get()
+                receptionTime = TLClock.monotonicTime()
+                print(currentPixelCount)
+                print(self.thresholdPixelCount)
+                # Checks to see what the current pixel count is and ends the loop once threashold is reached
+                if currentPixelCount <= self.thresholdPixelCount:
+                    #Threshold met, stop scanning by setting continueScanning to False
+                    print('Stopping because {} <= {}'.format(currentPixelCount,self.thresholdPixelCount))
+                    continueScanning = False
+            # Times the detection until the decision, the abort that follows completes it
+            if self.latencyMeasurement:
+                self.detectionLatencies.recordDetection(self.lastScatteringTime,publishTime,detectionTime,receptionTime,TLClock.monotonicTime())
+            print('End of loop Count:{}'.format(currentPixelCount))
+            print('Location found')
+            detectionSpan.annotate(pixelCount=currentPixelCount,captureTime=self.lastScatteringTime)
+        # Measures the time the detection took to reach the system controller from the capture of the frame
+        self.velocityScheduler.updateDetectionLatency(TLClock.monotonicTime() - self.lastScatteringTime)
 
         # Returns the number of pixels that triggered the event
         return currentPixelCount
 
-    # Method to close pixel counter process once routine is finished
+    # Method called once the routine is finished (the pixel counter stays running for the next routine)
     def tipLocatorRoutineFinished(self):
         print('tipLocatorRoutineFinished accessed')
-        self.routinePixelCounterProcess.terminate()
 
     # Method to abory the routine
     def abortRoutine(self):
         print('abortRoutine accessed')
         print('retrieveStagePosition accessed - SC')
-        self.substrateStages.moveStageAbort()
+        self.acquireStages().moveStageAbort()
 
     ## Movement commands
     # Method to move the stages to the start position (not determined yet so (0,0,-5)
     def moveStageToInitialPosition(self):
         print('moveStagesToOrigin accessed')
         # Sends absolute movement command to stages
-        self.substrateStages.moveStageAbsolute(self.substrateStages.macroGroup,[0.0,0.0,-5.0])
+        stageInstance = self.acquireStages()
+        stageInstance.moveStageAbsolute(stageInstance.macroGroup,[0.0,0.0,-5.0])
 
     # Method to retreive the stage position
     def retrieveStagePosition(self):
         print('retrieveStagePosition accessed - SC')
         # Sends request for stage position to stages
-        [x,y,z] = self.substrateStages.retrieveStagePosition()
+        [x,y,z] = self.acquireStages().retrieveStagePosition()
         print(x,y,z)
         return(x,y,z)
 
-    # Method to move the stages to a relative location
-    def moveStagesRelative(self):
+    # Method to move the stages to a relative location in a direction ('+X', '-X', '+Y', '-Y', '+Z' or '-Z')
+    def moveStagesRelative(self,direction,distance):
         print('moveStagesRelative accessed')
-        # Pulls the movement direction from the UI / system controller queue
-        direction = self.queue_SCtoUI.get()
-        # Pulls the movement distance from the UI / system controller queue
-        distance = self.queue_SCtoUI.get()
-
         print('Moving stages in {} by {}'.format(direction,distance))
 
-        # Creates an instance of the stages to use for relative movement
-        stageInstance = TLXYZStages.XYZStages()
-        stageInstance.initializeStages()
-
-        # Changes the stage velocity
-        stageInstance.updateStageVelocity(1)
+        # Uses the connected stages of the stage session for relative movement
+        stageInstance = self.acquireStages()
 
         # Determines the direction multiplier based on the direction sent
         directionMultiplier = self._movementDirectionDictionary[direction]
@@ -981,35 +1100,61 @@ class SystemController():
         elif (direction == '-Z') or (direction == '+Z'):
             direction = stageInstance.positioner_Z
 
+        # Changes the stage velocity of the positioner that moves before the move starts
+        stageInstance.updateStageVelocity(1,[direction])
 
-        # Sends relative movement command to stages on a new process
+        # Sends relative movement command to stages on a new thread, joined before the next command that uses socket 1
         # print('Creating movement process')
-        movementProcess = threading.Thread(target=stageInstance.moveStageRelative,args=(direction,[distance * directionMultiplier]))
+        self._jogThread = threading.Thread(target=self._jog,args=(stageInstance,direction,distance * directionMultiplier))
         # print('Starting movement process')
-        movementProcess.start()
+        self._jogThread.start()
         # print('Finished movement process')
 
-        # Changes the stage velocity
-        stageInstance.updateStageVelocity(0.1)
+    # Method run on the jog thread, moves the positioner and changes its velocity back once the move has replied
+    def _jog(self,stageInstance,positioner,displacement):
+        stageInstance.moveStageRelative(positioner,[displacement])
+        stageInstance.updateStageVelocity(0.1,[positioner])
+
+    # Method that waits for the jog in progress to end
+    def finishJog(self):
+        if self._jogThread is not None:
+            self._jogThread.join()
+            self._jogThread = None
 
     # Method to shut down the system controller
     def shutDown(self):
-        # Tries to close any processes that may be open
+        # Ends the system controller loop
+        self.systemControllerRunning = False
+        # Closes the connection to the stages and writes the trace records left
+        self.stageSession.close()
+        TLTrace.flush()
+        # Tells the pixel counter to stop and closes its process
+        self.queue_pixelCounterCommands.put(('shutDown',))
+        self.routinePixelCounterProcess.join(1)
         self.routinePixelCounterProcess.terminate()
 
     # Method to retrieve all of the data points
     def retrieveDataPoints(self):
 
-        # Opens the data file to be writen too
-        dataFile = open('data/testData - ' + str(datetime.datetime.now()) + '.csv','wt')
-        # Creates csv writer
-        dataWriter = csv.writer(dataFile)
+        # Name of the data file to be writen too
+        dataFileName = 'data/testData - ' + str(datetime.datetime.now()) + '.csv'
+
+        for dataSet in TLParameters.kHNSCTL_dataStore.records():
+            print ('Current coordinate points collected: {}, {}, {} with {} pixels triggering the event. Point type: {}'.format(dataSet['x'], dataSet['y'], dataSet['z'],dataSet['pixelTriggerValue'],dataSet['pointType']))
+
+        # Writes the data points with their headers
+        TLParameters.kHNSCTL_dataStore.writeCSV(dataFileName)
 
-        # Writes the headers
-        dataWriter.writerow(('x','y','z','Pixel Trigger Value','Point Type','Time'))
+        # Writes the detection latency histograms of the routine next to the data points
+        if self.latencyMeasurement:
+            print('Detection latencies measured for {} detections'.format(self.detectionLatencies.count()))
+            self.detectionLatencies.writeCSV(dataFileName[:-len('.csv')] + ' - latency.csv')
 
-        for dataSet in TLParameters.kHNSCTL_dataStorageInstances:
-            print ('Current coordinate points collected: {}, {}, {} with {} pixels triggering the event. Point type: {}'.format(dataSet.x, dataSet.y, dataSet.z,dataSet.pixelTriggerValue,dataSet.pointType))
-            dataWriter.writerow((dataSet.x,dataSet.y,dataSet.z,dataSet.pixelTriggerValue,dataSet.pointType,dataSet.time))
+        # Writes the trace of the routine
+        self.flushTrace()
 
-        dataFile.close()
\ No newline at end of file
+    # Method that writes the trace records to the trace files, the pixel counter writes its own when it is told to
+    def flushTrace(self):
+        if TLTrace.enabled:
+            self.queue_pixelCounterCommands.put(('flushTrace',))
+            TLTrace.flush()
@@ -0,0 +1,153 @@
+'''
+Trace module for the tip locator application.
+Records spans (a name, a start time and a duration) and instant events stamped with the monotonic time of TLClock,
+so the records of the UI process and of the pixel counter process share one time line.
+Each process appends its records to an in-memory buffer without taking a lock (deque appends are atomic) and writes
+them to its own file in the trace directory when the buffer is flushed. The files of all the processes are merged
+into a Chrome trace (chrome://tracing or Perfetto) with exportChromeTrace, or by running this module.
+Tracing is off unless enabled is set, a span or an event then costs a single check.
+'''
+
+## Imports
+# Built in modules
+import collections
+import glob
+import json
+import os
+import sys
+import thread
+import threading
+# Custom modules
+import TLClock # Monotonic time shared between the processes
+
+# Records the spans and events when True (set before the processes are started so the pixel counter inherits it)
+enabled = False
+# Directory the trace files of the processes are written to
+traceDirectory = 'data/trace'
+# Largest number of records kept in memory between flushes, the oldest records are dropped past it
+bufferSize = 200000
+
+# Buffer of the records of this process as (phase, name, category, timestamp, duration, thread id, arguments)
+_records = collections.deque(maxlen=bufferSize)
+# Names of the threads that recorded and name of this process
+_threadNames = {}
+_processName = 'tipLocator'
+
+# Span timed from the start to the end of a with block
+class Span():
+    def __init__(self,name,category,args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.startTime = None
+
+    def __enter__(self):
+        self.startTime = TLClock.monotonicTime()
+        return self
+
+    def __exit__(self,exceptionType,exceptionValue,traceback):
+        _record('X',self.name,self.category,self.startTime,TLClock.monotonicTime() - self.startTime,self.args)
+        return False
+
+    # Method to add arguments to the span once they are known (for example the result of the timed call)
+    def annotate(self,**args):
+        self.args.update(args)
+
+# Span returned while tracing is off, records nothing
+class _DisabledSpan():
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exceptionType,exceptionValue,traceback):
+        return False
+
+    def annotate(self,**args):
+        pass
+
+_disabledSpan = _DisabledSpan()
+
+# Function that appends a record to the buffer of the process
+def _record(phase,name,category,timestamp,duration,args):
+    threadId = thread.get_ident()
+    if threadId not in _threadNames:
+        _threadNames[threadId] = threading.current_thread().name
+    _records.append((phase,name,category,timestamp,duration,threadId,args))
+
+# Function that returns a span to time a with block
+def span(name,category='',**args):
+    if not enabled:
+        return _disabledSpan
+    return Span(name,category,args)
+
+# Function that records an instant event
+def event(name,category='',**args):
+    if enabled:
+        _record('i',name,category,TLClock.monotonicTime(),0.0,args)
+
+# Function that records the values of a counter (drawn as a graph over the time line)
+def counter(name,category='',**values):
+    if enabled:
+        _record('C',name,category,TLClock.monotonicTime(),0.0,values)
+
+# Function to call first in a new process, drops the records inherited from the parent process and names the process
+def startProcess(processName):
+    global _processName
+    _processName = processName
+    _records.clear()
+    _threadNames.clear()
+
+# Function that writes the records of the buffer to the trace file of the process and returns its name
+# The records are written as Chrome trace events, one per line, with times in microseconds
+def flush():
+    if not enabled and len(_records) == 0:
+        return None
+    if not os.path.isdir(traceDirectory):
+        os.makedirs(traceDirectory)
+    processId = os.getpid()
+    traceFileName = os.path.join(traceDirectory,'trace - {} {}.jsonl'.format(_processName,processId))
+
+    traceFile = open(traceFileName,'at')
+    # Names of the process and of its threads
+    traceFile.write(json.dumps({'ph':'M','name':'process_name','pid':processId,'tid':0,'args':{'name':_processName}}) + '\n')
+    for (threadId, threadName) in _threadNames.items():
+        traceFile.write(json.dumps({'ph':'M','name':'thread_name','pid':processId,'tid':threadId,'args':{'name':threadName}}) + '\n')
+    # Takes the records one by one so the records appended while writing are kept for the next flush
+    while True:
+        try:
+            (phase, name, category, timestamp, duration, threadId, args) = _records.popleft()
+        except IndexError:
+            break
+        traceEvent = {'ph':phase,'name':name,'cat':category,'ts':timestamp * 1e6,'pid':processId,'tid':threadId,'args':args}
+        if phase == 'X':
+            traceEvent['dur'] = duration * 1e6
+        elif phase == 'i':
+            traceEvent['s'] = 't'
+        traceFile.write(json.dumps(traceEvent) + '\n')
+    traceFile.close()
+    return traceFileName
+
+# Function that merges trace files (all the files of the trace directory by default) into a Chrome trace file
+def exportChromeTrace(chromeTraceFileName,traceFileNames=None):
+    if traceFileNames is None:
+        traceFileNames = sorted(glob.glob(os.path.join(traceDirectory,'trace - *.jsonl')))
+    traceEvents = []
+    for traceFileName in traceFileNames:
+        traceFile = open(traceFileName,'rt')
+        traceEvents.extend(json.loads(line) for line in traceFile if line.strip())
+        traceFile.close()
+
+    chromeTraceFile = open(chromeTraceFileName,'wt')
+    json.dump({'traceEvents':traceEvents,'displayTimeUnit':'ms'},chromeTraceFile)
+    chromeTraceFile.close()
+    return len(traceEvents)
+
+# Merges the trace files given (or all the files of the trace directory) into the Chrome trace file given first
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: python TLTrace.py chromeTrace.json [trace files]')
+        return
+    numberOfEvents = exportChromeTrace(sys.argv[1],sys.argv[2:] or None)
+    print('Wrote {} events to {}'.format(numberOfEvents,sys.argv[1]))
+
+if __name__ == '__main__':
+    main()
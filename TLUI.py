@@ -10,13 +10,15 @@ from PyQt4 import QtGui, QtCore # Allows for the use of PyQt functionality
 import sys # Allows interaction with system
 import multiprocessing # Allows access to processes and their commands
 import threading
-import SimpleCV
-import cv2
 import time
 # Custom modules
 import TLUIBase # Base UI that will be inherited
 import TLSystemController # System controller class
 import TLParameters
+import TLRedPixelCounter # Counting engine for the red pixels in the video feed
+import TLSampleRing # Shared ring buffer the pixel counts are published into
+import TLCaptureEngine # Capture engine that owns the camera
+import TLTrace # Trace of the capture, the detections and the stages
 
 # Primary UI class that inherits from the base UI
 class TLUI(TLUIBase.Ui_TipLocator):
@@ -31,7 +33,9 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Creates the queues for communicating between processes
         self.queue_SCtoUI = multiprocessing.Queue()
         self.queue_routineLoop = multiprocessing.Queue()
-        (self.pipe_UItoPixel1,self.pipe_UItoPixel2) = multiprocessing.Pipe()
+        # Creates the shared ring buffer the pixel counts are published into and the scattering detected event
+        self.sampleRing = TLSampleRing.SampleRing()
+        self.event_scatteringDetected = multiprocessing.Event()
 
         # Moves the UI to the top left corner of the screen
         self.move(0,0)
@@ -39,13 +43,33 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Sets the desired number of pixels threshold that will trigger the scattering event
         self.thresholdPixelCount = 10
 
+        # Records the trace of the capture, the detections and the stages in TLTrace.traceDirectory (set before the
+        # system controller starts the pixel counter process), merge the files with python TLTrace.py trace.json
+        TLTrace.enabled = False
+
         # Initializes the system controller
-        self.initializeSystemController(self.thresholdPixelCount,self.queue_SCtoUI,self.queue_routineLoop,self.pipe_UItoPixel2)
+        self.initializeSystemController(self.thresholdPixelCount,self.queue_SCtoUI,self.queue_routineLoop,self.sampleRing,self.event_scatteringDetected)
 
-        # Creates a camera that will be used for video processing
-        self.camera = SimpleCV.Camera(0)
         # Desired threshold value for processing the video
         self.thresholdValue = 0.15
+        # Region of interest around the pipette tip as (top, bottom, left, right), None counts the whole frame
+        self.regionOfInterest = None
+        # Learns the region of interest from the first scattering blob when True (off by default, the box is learned once and
+        # the scattering of the later passes can fall outside of it)
+        self.autoRegionOfInterest = False
+        # Creates the counting engine used to count the red pixels in each frame
+        self.redPixelCounter = TLRedPixelCounter.RedPixelCounter(self.thresholdValue,regionOfInterest=self.regionOfInterest,autoRegionOfInterest=self.autoRegionOfInterest,autoRegionTriggerValue=self.thresholdPixelCount)
+
+        # Frame source used instead of the camera (a TLSyntheticCamera.SyntheticCamera), None uses the camera
+        self.frameSource = None
+        # Creates the capture engine that owns the camera and publishes the pixel counts into the ring buffer
+        self.captureEngine = TLCaptureEngine.CaptureEngine(self.redPixelCounter,camera=self.frameSource)
+        self.captureEngine.subscribe(self.sampleRing.publish)
+        self.captureEngine.start()
+
+        # Timer used to check for messages from the routine without blocking the Qt event loop
+        self.routineLoopTimer = QtCore.QTimer(self)
+        self.routineLoopTimer.timeout.connect(self.checkRoutineLoop)
 
     # Method to add functionality to the UIs buttons
     def buttonFunctionality(self):
@@ -81,9 +105,9 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Attempts to close the application smoothly
         try:
             # Sends shut down command to system controller
-            self.queue_SCtoUI.put('shutDown')
-            # Ends the camera
-            self.camera = None
+            self.queue_SCtoUI.put(('shutDown',{}))
+            # Stops the capture engine and ends the camera
+            self.captureEngine.stop()
             # # Ends the system controller process
             # self.systemControllerProcess.terminate()
             # print('Processes terminated')
@@ -97,9 +121,7 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Attempts to write moveStagesRelative to system controller queue
         try:
             # print('Attempting to send move stages relative command')
-            self.queue_SCtoUI.put('moveStagesRelative')
-            self.queue_SCtoUI.put(_direction)
-            self.queue_SCtoUI.put(_value)
+            self.queue_SCtoUI.put(('moveStagesRelative',{'direction':_direction,'distance':_value}))
         except:
             print('Failed to move stages relative')
 
@@ -110,8 +132,8 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Attempts to write stopTipLocatorRoutine to system controller queue
         try:
             print('Ending main control loop')
-            self.queue_SCtoUI.put('abortRoutine')
-            self.queue_SCtoUI.put('stopTipLocatorRoutine')
+            self.queue_SCtoUI.put(('abortRoutine',{}))
+            self.queue_SCtoUI.put(('stopTipLocatorRoutine',{}))
         except:
             print('Failed to abort')
 
@@ -121,32 +143,22 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Attempts to write startTipLocatorRoutine to system controller queue
         try:
             print('Starting main routine')
-            self.queue_SCtoUI.put('startTipLocatorRoutine')
+            self.queue_SCtoUI.put(('startTipLocatorRoutine',{}))
         except:
             print('Main routine failed to start')
 
-        # Sets variable used to keep routine running until complete
-        routineRunning = True
-
-        # Pauses before beginning the routine loop
-        # Main tip locator routine
-        while routineRunning:
-            # print('Routine loop')
-            QtGui.QApplication.processEvents()
-            if not self.queue_routineLoop.empty():
-                command = self.queue_routineLoop.get()
-                # print('Command received by the UI: {}'.format(command))
-
-                if command == 'Start video processing':
-                    # print('Starting to process video feed')
-                    self.processVideo()
-                    # print('Finished processing video')
-
-                elif command == 'End routine loop':
-                    # print('Ending routine loop')
-                    routineRunning = False
-            # print('Sending movement command')
-            time.sleep(.5)
+        # Starts checking for messages from the routine
+        self.routineLoopTimer.start(100)
+
+    # Method that checks for messages from the routine, called by the routine loop timer
+    def checkRoutineLoop(self):
+        while not self.queue_routineLoop.empty():
+            command = self.queue_routineLoop.get()
+            # print('Command received by the UI: {}'.format(command))
+
+            if command == 'End routine loop':
+                # print('Ending routine loop')
+                self.routineLoopTimer.stop()
 
     # Method for when the initial position button is clicked
     def moveToInitialPosition(self):
@@ -154,17 +166,17 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # Attempts to write moveStagesToInitialPosition to system controller queue
         try:
             print('UI sending move to initial position command')
-            self.queue_SCtoUI.put('moveStagesToInitialPosition')
+            self.queue_SCtoUI.put(('moveStagesToInitialPosition',{}))
         except:
             print('Failed to move stages to initial position')
 
     # Method for starting the system controller
-    def initializeSystemController(self,thresholdPixelCount,queue_SCtoUI,queue_routineLoop,pipe_UItoPixel2):
+    def initializeSystemController(self,thresholdPixelCount,queue_SCtoUI,queue_routineLoop,sampleRing,event_scatteringDetected):
         # print('initializeSystemController accessed')
         ## Starting the system controller
         # Creates an instance of the system controller
         # print('Creating system controller')
-        self.systemController = TLSystemController.SystemController(thresholdPixelCount,queue_SCtoUI,queue_routineLoop,pipe_UItoPixel2)
+        self.systemController = TLSystemController.SystemController(thresholdPixelCount,queue_SCtoUI,queue_routineLoop,sampleRing,event_scatteringDetected)
         # Creates a thread from the system controller
         # print('Creating process for system controller')
         self.systemControllerProcess = threading.Thread(target=self.systemController.run, args=())
@@ -175,52 +187,6 @@ class TLUI(TLUIBase.Ui_TipLocator):
         # print('Starting the system controller process')
         self.systemControllerProcess.start()
 
-    # Method for processing the video feed
-    def processVideo(self):
-        # print('processVideo accessed')
-        # Sets the video processing loop variable to true
-        processVideoRunning = True
-        # Creates a camera that will be used to capture the video feed
-        # camera = SimpleCV.Camera()
-        # print('Starting processVideo loop')
-        # While loop for processing the video feed
-        while processVideoRunning:
-            # print('Inside processVideo loop')
-            # Command to manually process GUI events each iteration of the control loop
-            QtGui.QApplication.processEvents()
-            # Creates the video feed form the camera for processing
-            videoFeed = self.camera.getImage()
-            # Creates a blank video feed for merging desired channel into
-            videoFeedBlank = videoFeed * 0
-            # Splits the video into its three color channels
-            (redVideoChannel, greenVideoChannel, blueVideoChannel) = videoFeed.splitChannels()
-            # Merges the red video channel into all three color channels of blank video feed to create grayscale video
-            videoFeedConverted = videoFeedBlank.mergeChannels(redVideoChannel,redVideoChannel,redVideoChannel)
-            # Threasholds video based on the specified threshold value
-            videoFeedConverted = videoFeedConverted.binarize(255 * self.thresholdValue).invert()
-
-            # Creates a matrix of values for video feed
-            pixelSumMatrix = videoFeedConverted.getNumpy()
-            # Counts the number of elements in the matrix with a value greater than 0, this is the number of colored pixels
-            pixelSum = cv2.countNonZero(pixelSumMatrix[:,:,0])
-            # Sends the number of pixels counted down the UI to pixel pipe
-            # print(pixelSum)
-            self.pipe_UItoPixel1.send(pixelSum)
-            # Checks to see if a scattering event detected message has been received and ends video processing loop if it has
-
-            commandFromPixel = self.pipe_UItoPixel1.recv()
-            # print('Command received from pixel process: {}'.format(commandFromPixel))
-
-            if commandFromPixel == 'scatteringEventDetected':
-                # print('UI received command to stop processing video')
-                processVideoRunning = False
-
-
-        # Sends a final message down the pipe to show it is the end of the video processing (used to clear the pipe)
-        # print('Sending end of pixel count command')
-        self.pipe_UItoPixel1.send('End of pixel count')
-        # print('Done processing video')
-
 # Main function that loads and runs the UI for testing
 def tipLocatorApplicationMain():
     # print('tipLocatorApplicationMain accessed')
@@ -0,0 +1,106 @@
+'''
+Velocity scheduler for the tip locator application.
+Plans the approach distance, coarse velocity, backup distance and precise velocity of each pass that looks
+for a scattering edge, from the measured camera frame rate, the measured detection latency and the edge
+locations found on the previous passes. The stages move fast while they are far from the predicted edge
+and only slow down in a tight window around it.
+'''
+
+## Imports
+# Built in modules
+import math
+import numpy as np
+# Custom modules
+
+# Velocity of the single sweep passes [mm/s], the edge fit of TLEdgeDetection places the crossings below a frame so the
+# sweep does not have to slow down to the precise velocity (see benchmarkEdgeInterpolation.py)
+singleSweepVelocity = 0.01
+
+# Velocity scheduler shared by the passes of a routine
+class VelocityScheduler():
+    def __init__(self,targetResolution=0.00003,maximumVelocity=0.1,minimumVelocity=0.0005,safetyFactor=2.0,minimumWindow=0.005,defaultEdgeDistance=0.5):
+        # Distance the stages may move between two frames during the precise pass [mm]
+        self.targetResolution = targetResolution
+        # Fastest and slowest velocities the scheduler picks [mm/s]
+        self.maximumVelocity = maximumVelocity
+        self.minimumVelocity = minimumVelocity
+        # Factor applied to the coarse overshoot and the prediction uncertainty so the precise pass always starts before the edge
+        self.safetyFactor = safetyFactor
+        # Smallest window kept around a predicted edge [mm]
+        self.minimumWindow = minimumWindow
+        # Distance to the edge assumed when there is no prediction for it [mm]
+        self.defaultEdgeDistance = defaultEdgeDistance
+
+        # Measured time between two frames and time from the capture of a frame to its detection reaching the system controller [s]
+        self.frameInterval = 1 / 30.0
+        self.detectionLatency = 0.05
+
+        # Edge locations found on the previous passes, by edge name
+        self._edgeLocations = {}
+        # Predictions of the next location of an edge made from outside the scheduler (cone fit), by edge name
+        self._edgePredictions = {}
+
+    # Method to update the frame interval from the capture times of the latest samples
+    def updateFrameRate(self,sampleTimes):
+        if len(sampleTimes) > 1:
+            self.frameInterval = float(np.median(np.diff(sampleTimes)))
+
+    # Method to update the detection latency with a new measurement (running average that follows slow changes)
+    def updateDetectionLatency(self,detectionLatency):
+        self.detectionLatency = 0.8 * self.detectionLatency + 0.2 * detectionLatency
+
+    # Method to record the location along the axis of movement where an edge was found
+    def recordEdge(self,edgeName,edgeLocation):
+        self._edgeLocations.setdefault(edgeName,[]).append(edgeLocation)
+        # The prediction was used by this pass
+        self._edgePredictions.pop(edgeName,None)
+
+    # Method to set the predicted location of an edge and its uncertainty for the next pass, used before the previous passes
+    def setEdgePrediction(self,edgeName,edgeLocation,edgeUncertainty):
+        self._edgePredictions[edgeName] = (edgeLocation, max(edgeUncertainty,self.minimumWindow))
+
+    # Method to forget the edges of the previous passes (new routine)
+    def clearEdges(self):
+        self._edgeLocations = {}
+        self._edgePredictions = {}
+
+    # Method that returns the predicted location of an edge and its uncertainty, or (None, None) without previous passes
+    def predictEdge(self,edgeName):
+        if edgeName in self._edgePredictions:
+            return self._edgePredictions[edgeName]
+        edgeLocations = self._edgeLocations.get(edgeName,[])
+        if len(edgeLocations) == 0:
+            return None, None
+        # The uncertainty is the change between the last two passes (the minimum window for a single pass)
+        if len(edgeLocations) == 1:
+            return edgeLocations[-1], self.minimumWindow
+        return edgeLocations[-1], max(abs(edgeLocations[-1] - edgeLocations[-2]),self.minimumWindow)
+
+    # Method that plans a pass starting at startLocation along the axis and moving in the direction of motionSign (+1 or -1)
+    # Returns (approachDistance, coarseVelocity, backupDistance, preciseVelocity), the approach is made at the maximum velocity
+    def planPass(self,edgeName,startLocation,motionSign):
+        # Time from the stages crossing the edge to the system controller knowing about it (worst case)
+        detectionDelay = self.frameInterval + self.detectionLatency
+
+        # The precise pass moves the target resolution between frames
+        preciseVelocity = min(max(self.targetResolution / self.frameInterval,self.minimumVelocity),self.maximumVelocity)
+
+        # Distance left to the edge, the stages move quickly up to the window around the predicted edge
+        (edgeLocation, edgeUncertainty) = self.predictEdge(edgeName)
+        if edgeLocation is None:
+            (approachDistance, coarseDistance) = (0.0, self.defaultEdgeDistance)
+        else:
+            edgeDistance = (edgeLocation - startLocation) * motionSign
+            coarseDistance = self.safetyFactor * edgeUncertainty
+            approachDistance = max(edgeDistance - coarseDistance,0.0)
+            coarseDistance = max(edgeDistance - approachDistance,self.minimumWindow)
+
+        # The coarse velocity minimizes the coarse pass time (coarseDistance / v) plus the precise pass time over the backup
+        # distance, which grows with the coarse velocity (safetyFactor * v * detectionDelay / preciseVelocity)
+        coarseVelocity = math.sqrt(coarseDistance * preciseVelocity / (self.safetyFactor * detectionDelay))
+        coarseVelocity = min(max(coarseVelocity,preciseVelocity),self.maximumVelocity)
+
+        # The backup distance covers the overshoot of the coarse pass
+        backupDistance = self.safetyFactor * coarseVelocity * detectionDelay
+
+        return approachDistance, coarseVelocity, backupDistance, preciseVelocity
@@ -0,0 +1,393 @@
+'''
+XPS-Q8 simulator for the tip locator application.
+A local TCP server that speaks the text protocol of the XPS system (a command such as GroupMoveRelative(XYZ.X,0.1)
+answered by error,values,EndOfAPI) so the routines can be run and profiled without the stages.
+Each positioner of the XYZ group follows an SGamma profile (a trapezoidal velocity profile at the set velocity and
+acceleration, smoothed over the jerk time), the moves block their socket until they end or are aborted from another
+socket, and the positions, motion status and gathering are read from the profiles. Every reply waits the configured
+latency and the simulated time can run faster than the real time to shorten long routines.
+
+Run from the command line:  python TLXPSSimulator.py [port] [latency in s] [time scale]
+and connect the stages to it with TLXYZStages.XPSAddress = '127.0.0.1'.
+'''
+
+## Imports
+# Built in modules
+import math
+import re
+import sys
+import threading
+import time
+import SocketServer
+# Custom modules
+import TLClock # Monotonic time of the simulation
+
+# Error codes returned by the simulator (the codes of the XPS system)
+noError = 0
+unknownCommandError = -3
+wrongParameterError = -17
+moveAbortedError = -27
+
+# Group status of a group that is initialized and ready to move
+readyGroupStatus = 12
+# Servo period of the XPS system, the gathering takes a sample every divisor periods [s]
+servoPeriod = 1e-4
+
+# Command of the protocol, the name and the comma separated arguments
+commandPattern = re.compile(r'\s*(\w+)\((.*?)\)')
+
+# SGamma profile of a positioner move from a start position by a displacement
+class SGammaMove():
+    def __init__(self,startTime,startPosition,displacement,velocity,acceleration,minimumJerkTime,maximumJerkTime):
+        self.startTime = startTime
+        self.startPosition = startPosition
+        self.direction = 1.0 if displacement >= 0 else -1.0
+        self.distance = abs(displacement)
+        self.acceleration = acceleration
+
+        # Trapezoidal profile, triangular when the distance is too short to reach the velocity
+        self.accelerationTime = min(velocity / acceleration,math.sqrt(self.distance / acceleration))
+        self.peakVelocity = acceleration * self.accelerationTime
+        self.cruiseTime = self.distance / self.peakVelocity - self.accelerationTime if self.peakVelocity > 0 else 0.0
+        self.profileTime = 2 * self.accelerationTime + self.cruiseTime
+        # The jerk time smooths the profile (the position is the mean of the trapezoidal position over the jerk time)
+        self.jerkTime = min(max(self.accelerationTime,minimumJerkTime),maximumJerkTime)
+        self.endTime = startTime + self.profileTime + self.jerkTime
+
+    # Method that returns the distance travelled by the trapezoidal profile at the time from the start
+    def _trapezoidalDistance(self,t):
+        (a, ta, tc, T) = (self.acceleration, self.accelerationTime, self.cruiseTime, self.profileTime)
+        if t <= 0:
+            return 0.0
+        if t < ta:
+            return a * t**2 / 2
+        if t < ta + tc:
+            return a * ta**2 / 2 + self.peakVelocity * (t - ta)
+        if t < T:
+            return self.distance - a * (T - t)**2 / 2
+        return self.distance
+
+    # Method that returns the integral of the trapezoidal distance from the start to the time from the start
+    def _integratedDistance(self,t):
+        (a, ta, tc, T) = (self.acceleration, self.accelerationTime, self.cruiseTime, self.profileTime)
+        if t <= 0:
+            return 0.0
+        if t < ta:
+            return a * t**3 / 6
+        if t < ta + tc:
+            return a * ta**3 / 6 + a * ta**2 / 2 * (t - ta) + self.peakVelocity * (t - ta)**2 / 2
+        totalIntegral = a * ta**2 * tc / 2 + self.peakVelocity * tc**2 / 2 + self.distance * ta
+        if t < T:
+            return totalIntegral - self.distance * (T - t) + a * (T - t)**3 / 6
+        return totalIntegral + self.distance * (t - T)
+
+    # Method that returns the position at a time
+    def position(self,currentTime):
+        t = currentTime - self.startTime
+        if self.jerkTime <= 0:
+            return self.startPosition + self.direction * self._trapezoidalDistance(t)
+        return self.startPosition + self.direction * (self._integratedDistance(t) - self._integratedDistance(t - self.jerkTime)) / self.jerkTime
+
+    # Method that returns the velocity at a time
+    def velocity(self,currentTime):
+        t = currentTime - self.startTime
+        if self.jerkTime <= 0:
+            return self.direction * (self._trapezoidalDistance(t + 1e-9) - self._trapezoidalDistance(t)) / 1e-9
+        return self.direction * (self._trapezoidalDistance(t) - self._trapezoidalDistance(t - self.jerkTime)) / self.jerkTime
+
+# Constant deceleration of a positioner from its velocity to a stop (abort)
+class StopMove():
+    def __init__(self,startTime,startPosition,startVelocity,acceleration):
+        self.startTime = startTime
+        self.startPosition = startPosition
+        self.startVelocity = startVelocity
+        self.deceleration = math.copysign(acceleration,startVelocity)
+        self.endTime = startTime + abs(startVelocity) / acceleration
+
+    def position(self,currentTime):
+        t = min(currentTime,self.endTime) - self.startTime
+        return self.startPosition + self.startVelocity * t - self.deceleration * t**2 / 2
+
+    def velocity(self,currentTime):
+        return self.startVelocity - self.deceleration * (min(currentTime,self.endTime) - self.startTime)
+
+# Simulated positioner, the moves it made since the start of the gathering and its SGamma parameters
+class SimulatedPositioner():
+    def __init__(self,position,velocity,acceleration,minimumJerkTime,maximumJerkTime):
+        self.sGammaParameters = [velocity,acceleration,minimumJerkTime,maximumJerkTime]
+        # Moves in the order they started, the position before the first move is the initial position
+        self.initialPosition = position
+        self.moves = []
+        # Set when the current move is aborted, so the command that started it returns
+        self.moveEnded = threading.Event()
+        self.moveEnded.set()
+
+    # Method that returns the move at a time, None before the first move
+    def _moveAt(self,currentTime):
+        for move in reversed(self.moves):
+            if move.startTime <= currentTime:
+                return move
+        return None
+
+    def position(self,currentTime):
+        move = self._moveAt(currentTime)
+        return self.initialPosition if move is None else move.position(currentTime)
+
+    def velocity(self,currentTime):
+        move = self._moveAt(currentTime)
+        return 0.0 if move is None else move.velocity(currentTime)
+
+    def isMoving(self,currentTime):
+        return bool(self.moves) and currentTime < self.moves[-1].endTime
+
+    # Method to start a move, the moves older than the history start are forgotten
+    def addMove(self,move,historyStart):
+        while self.moves and self.moves[0].endTime < historyStart:
+            oldMove = self.moves.pop(0)
+            self.initialPosition = oldMove.position(oldMove.endTime)
+        self.moves.append(move)
+
+# XPS system simulator, a threaded TCP server with one handler thread per socket
+class XPSSimulator(SocketServer.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self,host='127.0.0.1',port=5001,latency=0.0,timeScale=1.0,initialPosition=(0.0,0.0,0.0),velocity=0.01,acceleration=5.0,minimumJerkTime=0.005,maximumJerkTime=0.05):
+        SocketServer.ThreadingTCPServer.__init__(self,(host,port),XPSRequestHandler)
+        # Delay before each reply [s] and speed of the simulated time against the real time
+        self.latency = latency
+        self.timeScale = timeScale
+        self._startTime = TLClock.monotonicTime()
+
+        # Positioners of the XYZ group, starting at the initial position
+        self.groupName = 'XYZ'
+        self.positionerNames = [self.groupName + '.X', self.groupName + '.Y', self.groupName + '.Z']
+        self.positioners = dict((name, SimulatedPositioner(position,velocity,acceleration,minimumJerkTime,maximumJerkTime)) for (name, position) in zip(self.positionerNames,initialPosition))
+        # Lock of the positioner states, shared by the handler threads
+        self.stateLock = threading.Lock()
+
+        # Gathering configuration and the simulated times it was started and stopped at
+        self.gatheringTypes = []
+        self.gatheringNumber = 0
+        self.gatheringDivisor = 1
+        self.gatheringStartTime = None
+        self.gatheringStopTime = None
+
+        # Number of commands and of round trips (sends of one or several commands) received
+        self.commandCount = 0
+        self.roundTripCount = 0
+
+    # Method that returns the simulated time [s]
+    def currentTime(self):
+        return (TLClock.monotonicTime() - self._startTime) * self.timeScale
+
+    # Method that waits for a simulated duration
+    def sleepFor(self,duration):
+        if duration > 0:
+            time.sleep(duration / self.timeScale)
+
+    # Method that returns the current (x, y, z) position of the group (the position source of TLSyntheticCamera)
+    def currentPositions(self):
+        with self.stateLock:
+            currentTime = self.currentTime()
+            return tuple(self.positioners[name].position(currentTime) for name in self.positionerNames)
+
+    # Method that starts the server in a daemon thread and returns the thread
+    def startInBackground(self):
+        serverThread = threading.Thread(target=self.serve_forever)
+        serverThread.daemon = True
+        serverThread.start()
+        return serverThread
+
+    # Method that returns the positioner names of a group or positioner name, None if it is unknown
+    def _positionerNames(self,name):
+        if name == self.groupName:
+            return self.positionerNames
+        if name in self.positioners:
+            return [name]
+        return None
+
+    # Method that runs a command and returns its reply without the EndOfAPI
+    def execute(self,name,arguments):
+        self.commandCount += 1
+        method = getattr(self,'_command' + name,None)
+        if method is None:
+            return '{}'.format(unknownCommandError)
+        try:
+            (error, values) = method(arguments)
+        except (ValueError, IndexError, KeyError, TypeError, ZeroDivisionError):
+            (error, values) = (wrongParameterError, [])
+        return ','.join([str(error)] + [str(value) for value in values])
+
+    ## Motion commands
+    # Method that starts moves of the positioners to targets (absolute) or by displacements and waits for their end
+    def _move(self,arguments,relative):
+        names = self._positionerNames(arguments[0])
+        targets = [float(value) for value in arguments[1:]]
+        if names is None or len(targets) != len(names):
+            return wrongParameterError, []
+
+        with self.stateLock:
+            currentTime = self.currentTime()
+            historyStart = currentTime if self.gatheringStartTime is None else self.gatheringStartTime
+            moves = []
+            for (name, target) in zip(names,targets):
+                positioner = self.positioners[name]
+                startPosition = positioner.position(currentTime)
+                displacement = target if relative else target - startPosition
+                move = SGammaMove(currentTime,startPosition,displacement,*positioner.sGammaParameters)
+                positioner.addMove(move,historyStart)
+                positioner.moveEnded = threading.Event()
+                moves.append((positioner, move))
+
+        # Waits until every positioner reaches its target, the move returns an error if one of them is aborted
+        # The wait has no timeout (a wait with a timeout polls on Python 2 and would notice the abort late), a timer ends it
+        for (positioner, move) in moves:
+            endTimer = threading.Timer(max(move.endTime - self.currentTime(),0.0) / self.timeScale,positioner.moveEnded.set)
+            endTimer.start()
+            positioner.moveEnded.wait()
+            endTimer.cancel()
+            if positioner.moves[-1] is not move:
+                return moveAbortedError, []
+        return noError, []
+
+    def _commandGroupMoveAbsolute(self,arguments):
+        return self._move(arguments,False)
+
+    def _commandGroupMoveRelative(self,arguments):
+        return self._move(arguments,True)
+
+    # Aborts the moves of a group or positioner, each positioner decelerates to a stop
+    # The abort returns once the positioners are stopped
+    def _commandGroupMoveAbort(self,arguments):
+        names = self._positionerNames(arguments[0])
+        if names is None:
+            return wrongParameterError, []
+        stopMoves = []
+        with self.stateLock:
+            currentTime = self.currentTime()
+            historyStart = currentTime if self.gatheringStartTime is None else self.gatheringStartTime
+            for name in names:
+                positioner = self.positioners[name]
+                if positioner.isMoving(currentTime):
+                    stopMove = StopMove(currentTime,positioner.position(currentTime),positioner.velocity(currentTime),positioner.sGammaParameters[1])
+                    positioner.addMove(stopMove,historyStart)
+                    positioner.moveEnded.set()
+                    stopMoves.append(stopMove)
+        for stopMove in stopMoves:
+            self.sleepFor(stopMove.endTime - self.currentTime())
+        return noError, []
+
+    ## State commands
+    def _commandGroupPositionCurrentGet(self,arguments):
+        with self.stateLock:
+            currentTime = self.currentTime()
+            return noError, [repr(self.positioners[name].position(currentTime)) for name in self._positionerNames(arguments[0])]
+
+    def _commandGroupMotionStatusGet(self,arguments):
+        with self.stateLock:
+            currentTime = self.currentTime()
+            return noError, [int(self.positioners[name].isMoving(currentTime)) for name in self._positionerNames(arguments[0])]
+
+    def _commandGroupStatusGet(self,arguments):
+        if self._positionerNames(arguments[0]) is None:
+            return wrongParameterError, []
+        return noError, [readyGroupStatus]
+
+    def _commandPositionerSGammaParametersGet(self,arguments):
+        return noError, self.positioners[arguments[0]].sGammaParameters
+
+    def _commandPositionerSGammaParametersSet(self,arguments):
+        parameters = [float(value) for value in arguments[1:5]]
+        if len(parameters) != 4 or min(parameters[:2]) <= 0 or parameters[2] > parameters[3]:
+            return wrongParameterError, []
+        self.positioners[arguments[0]].sGammaParameters = parameters
+        return noError, []
+
+    def _commandErrorStringGet(self,arguments):
+        return noError, ['Simulated XPS error ' + arguments[0]]
+
+    ## Gathering commands
+    # The gathering only supports the current positions of the positioners
+    def _commandGatheringConfigurationSet(self,arguments):
+        names = [argument.rsplit('.',1)[0] for argument in arguments]
+        if not all(name in self.positioners and argument.endswith('.CurrentPosition') for (name, argument) in zip(names,arguments)):
+            return wrongParameterError, []
+        self.gatheringTypes = names
+        return noError, []
+
+    def _commandGatheringRun(self,arguments):
+        with self.stateLock:
+            self.gatheringNumber = int(arguments[0])
+            self.gatheringDivisor = max(int(arguments[1]),1)
+            self.gatheringStartTime = self.currentTime()
+            self.gatheringStopTime = None
+        return noError, []
+
+    def _commandGatheringStop(self,arguments):
+        with self.stateLock:
+            if self.gatheringStartTime is not None and self.gatheringStopTime is None:
+                self.gatheringStopTime = self.currentTime()
+        return noError, []
+
+    # Method that returns the number of samples gathered up to now or to the stop of the gathering
+    def _gatheredNumber(self):
+        if self.gatheringStartTime is None:
+            return 0
+        stopTime = self.currentTime() if self.gatheringStopTime is None else self.gatheringStopTime
+        return min(int((stopTime - self.gatheringStartTime) / (servoPeriod * self.gatheringDivisor)) + 1,self.gatheringNumber)
+
+    def _commandGatheringCurrentNumberGet(self,arguments):
+        with self.stateLock:
+            return noError, [self._gatheredNumber(),self.gatheringNumber]
+
+    def _commandGatheringDataMultipleLinesGet(self,arguments):
+        (index, numberOfLines) = (int(arguments[0]), int(arguments[1]))
+        with self.stateLock:
+            if index < 0 or numberOfLines < 1 or index + numberOfLines > self._gatheredNumber():
+                return wrongParameterError, []
+            lines = []
+            for sample in range(index,index + numberOfLines):
+                sampleTime = self.gatheringStartTime + sample * servoPeriod * self.gatheringDivisor
+                lines.append(';'.join([repr(self.positioners[name].position(sampleTime)) for name in self.gatheringTypes]))
+        return noError, ['\n'.join(lines)]
+
+# Handler of one socket, runs the commands in the order they are received
+class XPSRequestHandler(SocketServer.BaseRequestHandler):
+    def handle(self):
+        received = ''
+        while True:
+            data = self.request.recv(4096)
+            if not data:
+                return
+            received += data
+            # Commands sent together (a batch) count as one round trip and are answered in one send
+            replies = []
+            while True:
+                match = commandPattern.match(received)
+                if match is None:
+                    break
+                received = received[match.end():]
+                arguments = [argument.strip() for argument in match.group(2).split(',') if argument.strip()]
+                # The output placeholders (double *, int *, char *) are not arguments
+                arguments = [argument for argument in arguments if not argument.endswith('*')]
+                replies.append(self.server.execute(match.group(1),arguments) + ',EndOfAPI')
+            if replies:
+                self.server.roundTripCount += 1
+                if self.server.latency > 0:
+                    time.sleep(self.server.latency)
+                self.request.sendall(''.join(replies))
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5001
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    timeScale = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    simulator = XPSSimulator('127.0.0.1',port,latency,timeScale)
+    print('XPS simulator on 127.0.0.1:{} (latency {} s, time scale {})'.format(port,latency,timeScale))
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        simulator.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,22 @@ Specific XYZ Stages that will send commands to the XPS system to control stage m
 
 ## Imports
 # Built in modules
-import sys
 # Custom modules
 import TLStages # Generic stages that will be inherited by XYZ Stages
 import XPS_Q8_drivers # Control module for the XPS system
+import TLTrace # Spans of the stage moves (the round trips to the XPS system are traced by the driver)
+
+# Address and port of the XPS system (127.0.0.1 for the TLXPSSimulator server)
+XPSAddress = '192.168.0.254'
+XPSPort = 5001
+
+# Error raised when the stages can not connect to the XPS system
+class StageConnectionError(Exception):
+    pass
 
 # Main XYZ Stages class
 class XYZStages(TLStages.Stages):
-    def __init__(self):
+    def __init__(self,XPSAddress=None,XPSPort=None):
         # print('XYZStages accessed')
         # Initializes the stages
         TLStages.Stages.__init__(self)
@@ -25,6 +33,14 @@ class XYZStages(TLStages.Stages):
         self.positioner_Y = None
         self.positioner_Z = None
         self.stageVelocity = 0.01
+        # Address of the XPS system the stages connect to (the module address by default)
+        self.XPSAddress = XPSAddress
+        self.XPSPort = XPSPort
+
+        # Cached acceleration and jerk times for each positioner, read from the XPS system the first time they are needed
+        self._sGammaParameters = {}
+        # Velocity currently set on the XPS system for each positioner
+        self._positionerVelocities = {}
 
     # TEMP metho for initializing the stages
     def initializeStagesTEST(self):
@@ -36,17 +52,40 @@ class XYZStages(TLStages.Stages):
         self.positioner_Z = self.macroGroup + '.Z'
 
     # Method to set the stage velocity
-    def updateStageVelocity(self,velocity):
-        # Retrieves the velocity, acceleration and jerk information from the XPS System
-        [_stage_X_parameterError, _stage_X_velocty, _stage_X_acceleration, _stage_X_minJerkTime, _stage_X_maxJerkTime] = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,self.positioner_X)
-        [_stage_Y_parameterError, _stage_Y_velocty, _stage_Y_acceleration, _stage_Y_minJerkTime, _stage_Y_maxJerkTime] = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,self.positioner_Y)
-        [_stage_Z_parameterError, _stage_Z_velocty, _stage_Z_acceleration, _stage_Z_minJerkTime, _stage_Z_maxJerkTime] = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,self.positioner_Z)
-
-        # Updates the velocty, acceleration and jerk parameters for the XPS system (currently we are only changing the velocity and keeping everything else the same)
-        self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, self.positioner_X, velocity, _stage_X_acceleration, _stage_X_minJerkTime, _stage_X_maxJerkTime)
-        self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, self.positioner_Y, velocity, _stage_Y_acceleration, _stage_Y_minJerkTime, _stage_Y_maxJerkTime)
-        self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, self.positioner_Z, velocity, _stage_Z_acceleration, _stage_Z_minJerkTime, _stage_Z_maxJerkTime)
-
+    # Only the positioners that move in the next command need to be passed in (all three are updated by default)
+    # and no command is sent for a positioner that is already at the velocity
+    def updateStageVelocity(self,velocity,positioners=None):
+        if positioners is None:
+            positioners = [self.positioner_X, self.positioner_Y, self.positioner_Z]
+
+        for positioner in positioners:
+            # Skips the positioner if the velocity is already in effect
+            if self._positionerVelocities.get(positioner) == velocity:
+                continue
+
+            # Retrieves the acceleration and jerk information from the XPS System the first time the positioner is updated
+            # (only a successful read is cached, a failed one is tried again on the next update)
+            if positioner not in self._sGammaParameters:
+                _parameters = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,positioner)
+                if _parameters is None or _parameters[0] != 0:
+                    print('Failed to read the SGamma parameters of {}: {}'.format(positioner,_parameters))
+                    continue
+                [_parameterError, _velocity, _acceleration, _minJerkTime, _maxJerkTime] = _parameters
+                self._sGammaParameters[positioner] = (_acceleration, _minJerkTime, _maxJerkTime)
+            (_acceleration, _minJerkTime, _maxJerkTime) = self._sGammaParameters[positioner]
+
+            # Updates the velocty, acceleration and jerk parameters for the XPS system (currently we are only changing the velocity and keeping everything else the same)
+            _setResult = self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, positioner, velocity, _acceleration, _minJerkTime, _maxJerkTime)
+            # The velocity is only cached once the XPS system has taken it, otherwise the next update sends it again
+            if _setResult is None or _setResult[0] != 0:
+                print('Failed to set the velocity of {}: {}'.format(positioner,_setResult))
+                self._positionerVelocities.pop(positioner,None)
+                continue
+            self._positionerVelocities[positioner] = velocity
+
+    # Method that returns the number of round trips made to the XPS system
+    def retrieveRoundTripCount(self):
+        return self._XPSSystem.RoundTripCountGet()
 
     # Method for initializing the stages
     def initializeStages(self):
@@ -73,19 +112,20 @@ class XYZStages(TLStages.Stages):
 
         ## Gets the socketIDs for the created system
         # print('Getting socketIDs for XPS')
+        _XPSAddress = XPSAddress if self.XPSAddress is None else self.XPSAddress
+        _XPSPort = XPSPort if self.XPSPort is None else self.XPSPort
         # SocketID1 is for initiating stage movements
-        self._socketID1 = self._XPSSystem.TCP_ConnectToServer('192.168.0.254',5001,20) # Returns -1 if connection error occurs
+        self._socketID1 = self._XPSSystem.TCP_ConnectToServer(_XPSAddress,_XPSPort,20) # Returns -1 if connection error occurs
         # SocketID2 is for interrupting stage movements
-        self._socketID2 = self._XPSSystem.TCP_ConnectToServer('192.168.0.254',5001,21) # Returns -1 if connection error occurs
+        self._socketID2 = self._XPSSystem.TCP_ConnectToServer(_XPSAddress,_XPSPort,21) # Returns -1 if connection error occurs
 
         # print('Checking XPS connection')
         # If statements to check to make sure that both sockets were created correctly
-        if (self._socketID1 == -1):
-            print('Connection to XPS failed, check IP and Port. SocketID1')
-            sys.exit()
-        if (self._socketID2 == -1):
-            print('Connection to XPS failed, check IP and Port. SocketID2')
-            sys.exit()
+        # The socket that did open is closed so a failed connection leaves nothing behind
+        if (self._socketID1 == -1) or (self._socketID2 == -1):
+            _failedSocket = 'SocketID1' if self._socketID1 == -1 else 'SocketID2'
+            self.closeStages()
+            raise StageConnectionError('Connection to XPS failed, check IP and Port. {}'.format(_failedSocket))
         # print('XPS check complete')
 
         # Sets up the macro group and the positioners
@@ -94,41 +134,82 @@ class XYZStages(TLStages.Stages):
         self.positioner_Y = self.macroGroup + '.Y'
         self.positioner_Z = self.macroGroup + '.Z'
 
-        # Retrieves the velocity, acceleration and jerk information from the XPS System
-        [_stage_X_parameterError, _stage_X_velocty, _stage_X_acceleration, _stage_X_minJerkTime, _stage_X_maxJerkTime] = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,self.positioner_X)
-        [_stage_Y_parameterError, _stage_Y_velocty, _stage_Y_acceleration, _stage_Y_minJerkTime, _stage_Y_maxJerkTime] = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,self.positioner_Y)
-        [_stage_Z_parameterError, _stage_Z_velocty, _stage_Z_acceleration, _stage_Z_minJerkTime, _stage_Z_maxJerkTime] = self._XPSSystem.PositionerSGammaParametersGet(self._socketID1,self.positioner_Z)
+        # Clears the cached parameters of any previous connection and sets the starting stage velocity
+        self._sGammaParameters = {}
+        self._positionerVelocities = {}
+        self.updateStageVelocity(self.stageVelocity)
+
+    # Method to check that the XPS system still answers on socket 2
+    # Socket 1 is not checked, a move thread can be waiting on it for the reply of its move and the driver has no lock
+    # per socket, so the status request could take the move reply (and wait for the whole move)
+    def checkConnection(self):
+        try:
+            _socket2Status = self._XPSSystem.GroupStatusGet(self._socketID2,self.macroGroup)
+        except Exception:
+            return False
+        # The status is [errorCode, groupStatus], or None if the socket is not open
+        return _socket2Status is not None and _socket2Status[0] == 0
+
+    # Method to close the sockets to the XPS system
+    def closeStages(self):
+        for _socketID in (self._socketID1, self._socketID2):
+            if _socketID is not None and _socketID != -1:
+                self._XPSSystem.TCP_CloseSocket(_socketID)
+        self._socketID1 = None
+        self._socketID2 = None
 
-        # Updates the velocty, acceleration and jerk parameters for the XPS system (currently we are only changing the velocity and keeping everything else the same)
-        self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, self.positioner_X, self.stageVelocity, _stage_X_acceleration, _stage_X_minJerkTime, _stage_X_maxJerkTime)
-        self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, self.positioner_Y, self.stageVelocity, _stage_Y_acceleration, _stage_Y_minJerkTime, _stage_Y_maxJerkTime)
-        self._XPSSystem.PositionerSGammaParametersSet(self._socketID1, self.positioner_Z, self.stageVelocity, _stage_Z_acceleration, _stage_Z_minJerkTime, _stage_Z_maxJerkTime)
+    # Method to start gathering the current position of the three positioners on the XPS system
+    # A sample is taken every divisor servo cycles until dataNumber samples are gathered (socket 2 is used as socket 1 is busy with the moves)
+    def startPositionGathering(self,dataNumber,divisor):
+        _gatheringTypes = [positioner + '.CurrentPosition' for positioner in (self.positioner_X,self.positioner_Y,self.positioner_Z)]
+        [_configurationError, _configurationString] = self._XPSSystem.GatheringConfigurationSet(self._socketID2,_gatheringTypes)
+        if _configurationError != 0:
+            return [_configurationError, _configurationString]
+        return self._XPSSystem.GatheringRun(self._socketID2,dataNumber,divisor)
+
+    # Method to stop the gathering and return the gathered positions as a list of [x, y, z] samples
+    def retrievePositionGathering(self,linesPerRead=500):
+        self._XPSSystem.GatheringStop(self._socketID2)
+        [_numberError, _currentNumber, _maximumNumber] = self._XPSSystem.GatheringCurrentNumberGet(self._socketID2)
+        if _numberError != 0:
+            return []
+
+        # Reads the gathered lines in blocks as the XPS system limits the size of a reply
+        _positions = []
+        for _index in range(0,_currentNumber,linesPerRead):
+            [_dataError, _data] = self._XPSSystem.GatheringDataMultipleLinesGet(self._socketID2,_index,min(linesPerRead,_currentNumber - _index))
+            if _dataError != 0:
+                break
+            for _line in _data.split('\n'):
+                _values = [float(_value) for _value in _line.split(';') if _value.strip()]
+                if len(_values) == 3:
+                    _positions.append(_values)
+        return _positions
 
     # Method for moving the stages to an aboslute position
     def moveStageAbsolute(self, direction, location):
         # print('moveStageAbsolute direction: {}, location: {}'.format(direction,location))
-        self._XPSSystem.GroupMoveAbsolute(self._socketID1,direction,location)
+        with TLTrace.span('moveStageAbsolute','stages',location=location):
+            self._XPSSystem.GroupMoveAbsolute(self._socketID1,direction,location)
 
     # Method for moving the stages a relative distance
     def moveStageRelative(self, direction, distance):
         # print('moveStageRelative direction: {}, distance: {}'.format(direction,distance))
-        self._XPSSystem.GroupMoveRelative(self._socketID1,direction,distance)
+        with TLTrace.span('moveStageRelative','stages',direction=direction,distance=distance):
+            self._XPSSystem.GroupMoveRelative(self._socketID1,direction,distance)
 
      # Method for aborting stage movement (aborts all directions)
     def moveStageAbort(self):
         # print('moveStageAbort')
-        self._XPSSystem.GroupMoveAbort(self._socketID2, self.positioner_X)
-        self._XPSSystem.GroupMoveAbort(self._socketID2, self.positioner_Y)
-        self._XPSSystem.GroupMoveAbort(self._socketID2, self.positioner_Z)
-        self._XPSSystem.GroupMoveAbort(self._socketID2, self.macroGroup)
+        # Sends the four aborts together so they cost a single network wait
+        with TLTrace.span('moveStageAbort','stages'):
+            self._XPSSystem.GroupMoveAbortBatch(self._socketID2, [self.positioner_X, self.positioner_Y, self.positioner_Z, self.macroGroup])
 
     # Method to get the current location of the stage
     def retrieveStagePosition(self):
         # print('retrieveStagePosition')
-        # Gets the current location of each axis of the stage
-        [_stagePositionXError, _stagePositionX] = self._XPSSystem.GroupPositionCurrentGet(self._socketID1,self.positioner_X,1)
-        [_stagePositionYError, _stagePositionY] = self._XPSSystem.GroupPositionCurrentGet(self._socketID1,self.positioner_Y,1)
-        [_stagePositionZError, _stagePositionZ] = self._XPSSystem.GroupPositionCurrentGet(self._socketID1,self.positioner_Z,1)
+        # Gets the current location of each axis of the stage in one batch
+        [[_stagePositionXError, _stagePositionX], [_stagePositionYError, _stagePositionY], [_stagePositionZError, _stagePositionZ]] = self._XPSSystem.GroupPositionCurrentGetBatch(self._socketID1,[self.positioner_X,self.positioner_Y,self.positioner_Z],1)
 
         # Retruns the locations
         # print('Stage position:{}, {}, {}'.format(_stagePositionX, _stagePositionY, _stagePositionZ))
@@ -145,11 +226,8 @@ class XYZStages(TLStages.Stages):
     # Method to check if the stages are moving
     def checkMotionStatus(self):
         # print('checkMotionStatus')
-        # Gets the current motion status of each positioner
-        [_stageMotionStatusXError, _stageMotionStatusX] = self._XPSSystem.GroupMotionStatusGet(self._socketID2,self.positioner_X,1)
-        [_stageMotionStatusYError, _stageMotionStatusY] = self._XPSSystem.GroupMotionStatusGet(self._socketID2,self.positioner_X,1)
-        [_stageMotionStatusZError, _stageMotionStatusZ] = self._XPSSystem.GroupMotionStatusGet(self._socketID2,self.positioner_X,1)
-        [_stageMotionStatusError, _stageMotionStatus] = self._XPSSystem.GroupMotionStatusGet(self._socketID2,self.macroGroup,1)
+        # Gets the current motion status of each positioner and of the group in one batch
+        [[_stageMotionStatusXError, _stageMotionStatusX], [_stageMotionStatusYError, _stageMotionStatusY], [_stageMotionStatusZError, _stageMotionStatusZ], [_stageMotionStatusError, _stageMotionStatus]] = self._XPSSystem.GroupMotionStatusGetBatch(self._socketID2,[self.positioner_X,self.positioner_Y,self.positioner_Z,self.macroGroup],1)
         if _stageMotionStatusX == 0 and _stageMotionStatusY == 0 and _stageMotionStatusZ == 0:
             return 0
         else:
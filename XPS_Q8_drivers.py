@@ -5,38 +5,217 @@
 #  See Programmer's manual for more information on XPS function calls
 
 import socket
+import threading
+import TLTrace # Spans of the round trips to the XPS
 
 class XPS:
 	# Defines
 	MAX_NB_SOCKETS = 100
+	RECEIVE_BUFFER_SIZE = 4096
+
+	# Types of the values returned by each getter, in order (getters that return a variable number of values repeat their types)
+	REPLY_TYPES = {
+		'ControllerMotionKernelMinMaxTimeLoadGet': ('double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'ControllerMotionKernelTimeLoadGet': ('double', 'double', 'double', 'double'),
+		'ControllerRTTimeGet': ('double', 'double'),
+		'ControllerSlaveStatusGet': ('int',),
+		'ControllerStatusGet': ('int',),
+		'ControllerStatusRead': ('int',),
+		'ElapsedTimeGet': ('double',),
+		'TimerGet': ('int',),
+		'EventExtendedStart': ('int',),
+		'GatheringCurrentNumberGet': ('int', 'int'),
+		'GatheringExternalCurrentNumberGet': ('int', 'int'),
+		'DoubleGlobalArrayGet': ('double',),
+		'GPIOAnalogGet': ('double',),
+		'GPIOAnalogGainGet': ('int',),
+		'GPIODigitalGet': ('unsigned short',),
+		'GroupAccelerationSetpointGet': ('double',),
+		'GroupCorrectorOutputGet': ('double',),
+		'GroupCurrentFollowingErrorGet': ('double',),
+		'GroupJogParametersGet': ('double', 'double'),
+		'GroupJogCurrentGet': ('double', 'double'),
+		'GroupMotionStatusGet': ('int',),
+		'GroupPositionCorrectedProfilerGet': ('double', 'double'),
+		'GroupPositionCurrentGet': ('double',),
+		'GroupPositionPCORawEncoderGet': ('double', 'double'),
+		'GroupPositionSetpointGet': ('double',),
+		'GroupPositionTargetGet': ('double',),
+		'GroupStatusGet': ('int',),
+		'GroupVelocityCurrentGet': ('double',),
+		'PositionerAnalogTrackingPositionParametersGet': ('char', 'double', 'double', 'double'),
+		'PositionerAnalogTrackingVelocityParametersGet': ('char', 'double', 'double', 'double', 'int', 'double'),
+		'PositionerBacklashGet': ('double', 'char'),
+		'PositionerCompensatedPCOCurrentStatusGet': ('int',),
+		'PositionerCompensationFrequencyNotchsGet': ('double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCompensationLowPassTwoFilterGet': ('double',),
+		'PositionerCompensationNotchModeFiltersGet': ('double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCompensationPhaseCorrectionFiltersGet': ('double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCompensationSpatialPeriodicNotchsGet': ('double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorNotchFiltersGet': ('double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorPIDBaseGet': ('double', 'double', 'double', 'double'),
+		'PositionerCorrectorPIDFFAccelerationGet': ('bool', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorP2IDFFAccelerationGet': ('bool', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorPIDFFVelocityGet': ('bool', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorPIDDualFFVoltageGet': ('bool', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorPIPositionGet': ('bool', 'double', 'double', 'double'),
+		'PositionerCorrectorSR1AccelerationGet': ('bool', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'PositionerCorrectorSR1ObserverAccelerationGet': ('double', 'double', 'double'),
+		'PositionerCorrectorSR1OffsetAccelerationGet': ('double',),
+		'PositionerCurrentVelocityAccelerationFiltersGet': ('double', 'double'),
+		'PositionerDriverFiltersGet': ('double', 'double', 'double', 'double', 'double'),
+		'PositionerDriverPositionOffsetsGet': ('double', 'double'),
+		'PositionerDriverStatusGet': ('int',),
+		'PositionerEncoderAmplitudeValuesGet': ('double', 'double', 'double', 'double'),
+		'PositionerEncoderCalibrationParametersGet': ('double', 'double', 'double', 'double'),
+		'PositionerErrorGet': ('int',),
+		'PositionerErrorRead': ('int',),
+		'PositionerExcitationSignalGet': ('int', 'double', 'double', 'double'),
+		'PositionerHardwareStatusGet': ('int',),
+		'PositionerHardInterpolatorFactorGet': ('int',),
+		'PositionerHardInterpolatorPositionGet': ('double',),
+		'PositionerMaximumVelocityAndAccelerationGet': ('double', 'double'),
+		'PositionerMotionDoneGet': ('double', 'double', 'double', 'double', 'double'),
+		'PositionerPositionCompareAquadBWindowedGet': ('double', 'double', 'bool'),
+		'PositionerPositionCompareGet': ('double', 'double', 'double', 'bool'),
+		'PositionerPositionComparePulseParametersGet': ('double', 'double'),
+		'PositionerPositionCompareScanAccelerationLimitGet': ('double',),
+		'PositionerPreCorrectorExcitationSignalGet': ('double', 'double', 'double'),
+		'PositionerRawEncoderPositionGet': ('double',),
+		'PositionersEncoderIndexDifferenceGet': ('double',),
+		'PositionerSGammaExactVelocityAjustedDisplacementGet': ('double',),
+		'PositionerSGammaParametersGet': ('double', 'double', 'double', 'double'),
+		'PositionerSGammaPreviousMotionTimesGet': ('double', 'double'),
+		'PositionerTimeFlasherGet': ('double', 'double', 'double', 'bool'),
+		'PositionerUserTravelLimitsGet': ('double', 'double'),
+		'PositionerWarningFollowingErrorGet': ('double',),
+		'PositionerCorrectorAutoTuning': ('double', 'double', 'double'),
+		'PositionerAccelerationAutoScaling': ('double',),
+		'MultipleAxesPVTVerificationResultGet': ('char', 'double', 'double', 'double'),
+		'MultipleAxesPVTParametersGet': ('char',),
+		'MultipleAxesPVTPulseOutputGet': ('int', 'int', 'double'),
+		'SingleAxisSlaveParametersGet': ('char',),
+		'SingleAxisThetaSlaveParametersGet': ('char',),
+		'SpindleSlaveParametersGet': ('char',),
+		'GroupSpinParametersGet': ('double', 'double'),
+		'GroupSpinCurrentGet': ('double', 'double'),
+		'XYLineArcVerificationResultGet': ('char', 'double', 'double', 'double'),
+		'XYLineArcParametersGet': ('char', 'double', 'double'),
+		'XYLineArcPulseOutputGet': ('double', 'double', 'double'),
+		'XYPVTVerificationResultGet': ('char', 'double', 'double', 'double'),
+		'XYPVTParametersGet': ('char',),
+		'XYPVTPulseOutputGet': ('int', 'int', 'double'),
+		'XYZGroupPositionCorrectedProfilerGet': ('double', 'double', 'double'),
+		'XYZGroupPositionPCORawEncoderGet': ('double', 'double', 'double'),
+		'XYZSplineVerificationResultGet': ('char', 'double', 'double', 'double'),
+		'XYZSplineParametersGet': ('char', 'double', 'double'),
+		'TZPVTVerificationResultGet': ('char', 'double', 'double', 'double'),
+		'TZPVTParametersGet': ('char',),
+		'TZPVTPulseOutputGet': ('int', 'int', 'double'),
+		'TZTrackingUserMaximumZZZTargetDifferenceGet': ('double',),
+		'PositionerMotorOutputOffsetGet': ('double', 'double', 'double', 'double'),
+		'SingleAxisThetaPositionRawGet': ('double', 'double', 'double'),
+		'CPUCoreAndBoardSupplyVoltagesGet': ('double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'CPUTemperatureAndFanSpeedGet': ('double', 'double'),
+		'GatheringUserDatasGet': ('double', 'double', 'double', 'double', 'double', 'double', 'double', 'double'),
+		'ControllerMotionKernelPeriodMinMaxGet': ('double', 'double', 'double', 'double', 'double', 'double'),
+	}
+	# Conversion of each returned type
+	REPLY_CONVERTERS = {'double': float, 'int': int, 'bool': int, 'unsigned short': int, 'char': str}
 
 	# Global variables
 	__sockets = {}
 	__usedSockets = {}
 	__nbSockets = 0
+	# Round trips (one send and its replies, for one or more commands) made by all the instances, counted under a lock
+	# as the move threads and the system controller thread send at the same time
+	__nbRoundTrips = 0
+	__roundTripLock = threading.Lock()
+	__replyParsers = {}
 
 	# Initialization Function
+	# The socket table is shared by all the instances, it is only set up by the first one so a new connection does not
+	# take over the sockets of a connection that is still open
 	def __init__ (self):
-		XPS.__nbSockets = 0
-		for socketId in range(self.MAX_NB_SOCKETS):
-			XPS.__usedSockets[socketId] = 0
+		if not XPS.__usedSockets:
+			XPS.__nbSockets = 0
+			for socketId in range(self.MAX_NB_SOCKETS):
+				XPS.__usedSockets[socketId] = 0
 
 	# Send command and get return
 	def __sendAndReceive (self, socketId, command):
+		return self.__sendAndReceiveMultiple(socketId, [command])[0]
+
+	# Send several commands at once and get their returns in the order the commands were sent
+	# (the commands are written in one send and the replies are split on ',EndOfAPI', so the batch costs one network wait)
+	def __sendAndReceiveMultiple (self, socketId, commands):
+		if (not TLTrace.enabled):
+			return self.__exchange(socketId, commands)
+		# Span of the round trip named after its first command
+		with TLTrace.span(commands[0].partition('(')[0], 'xps', socketId = socketId, nbCommands = len(commands)):
+			return self.__exchange(socketId, commands)
+
+	# Write the commands and read their replies
+	def __exchange (self, socketId, commands):
+		with XPS.__roundTripLock:
+			XPS.__nbRoundTrips += 1
+		received = bytearray(XPS.RECEIVE_BUFFER_SIZE)
+		receivedSize, replyStart, replies = 0, 0, []
 		try:
-			XPS.__sockets[socketId].send(command)
-			ret = XPS.__sockets[socketId].recv(1024)
-			while (ret.find(',EndOfAPI') == -1):
-				ret += XPS.__sockets[socketId].recv(1024)
+			XPS.__sockets[socketId].sendall(''.join(commands))
+			while (len(replies) < len(commands)):
+				replyEnd = received.find(',EndOfAPI', replyStart, receivedSize)
+				if (replyEnd != -1):
+					replies.append(str(received[replyStart:replyEnd]))
+					replyStart = replyEnd + 9
+					continue
+				if (receivedSize == len(received)):
+					received.extend(bytearray(len(received)))
+				nbBytes = XPS.__sockets[socketId].recv_into(memoryview(received)[receivedSize:])
+				if (nbBytes == 0):
+					return [[-108, '']] * len(commands)
+				receivedSize += nbBytes
 		except socket.timeout:
-			return [-2, '']
-		except socket.error (errNb, errString):
-			print 'Socket error : ' + errString
-			return [-2, '']
+			return [[-2, '']] * len(commands)
+		except socket.error as socketError:
+			print 'Socket error : ' + str(socketError)
+			return [[-2, '']] * len(commands)
+
+		retList = []
+		for reply in replies:
+			(errorString, separator, returnedString) = reply.partition(',')
+			retList.append([int(errorString), returnedString])
+		return retList
+
+	# SendAndReceiveBatch :  Send several commands at once and return the [error, returnedString] of each in order
+	def SendAndReceiveBatch (self, socketId, commands):
+		if (XPS.__usedSockets[socketId] == 0):
+			return
+
+		return self.__sendAndReceiveMultiple(socketId, commands)
 
-		for i in range(len(ret)):
-			if (ret[i] == ','):
-				return [int(ret[0:i]), ret[i+1:-9]]
+	# Convert the returned string of a getter into [error, value1, value2, ...] using the reply types of the API
+	def __parseReply (self, APIName, error, returnedString, nbValues = None):
+		if (error != 0):
+			return [error, returnedString]
+
+		converters = XPS.__replyParsers.get((APIName, nbValues))
+		if (converters is None):
+			converters = self.__buildReplyParser(APIName, nbValues)
+
+		retList = [error]
+		retList.extend([converter(field) for (converter, field) in zip(converters, returnedString.split(','))])
+		return retList
+
+	# Build (once per API and number of values) the list of conversions applied to the returned fields
+	def __buildReplyParser (self, APIName, nbValues):
+		replyTypes = self.REPLY_TYPES[APIName]
+		if (nbValues is not None):
+			replyTypes = replyTypes * (nbValues // len(replyTypes))
+
+		converters = tuple([self.REPLY_CONVERTERS[replyType] for replyType in replyTypes])
+		XPS.__replyParsers[(APIName, nbValues)] = converters
+		return converters
 
 	# TCP_ConnectToServer
 	def TCP_ConnectToServer (self, IP, port, timeOut):
@@ -57,6 +236,9 @@ class XPS:
 			XPS.__sockets[socketId].settimeout(timeOut)
 			XPS.__sockets[socketId].setblocking(1)
 		except socket.error:
+			# Frees the socket of the failed connection
+			XPS.__usedSockets[socketId] = 0
+			XPS.__nbSockets -= 1
 			return -1
 
 		return socketId
@@ -80,6 +262,10 @@ class XPS:
 	def GetLibraryVersion (self):
 		return ['XPS-Q8 Firmware Precision Platform V1.2.x']
 
+	# RoundTripCountGet :  Number of round trips to the XPS since the library was loaded (a batch of commands is one round trip)
+	def RoundTripCountGet (self):
+		return XPS.__nbRoundTrips
+
 	# ControllerMotionKernelMinMaxTimeLoadGet :  Get controller motion kernel minimum and maximum time load
 	def ControllerMotionKernelMinMaxTimeLoadGet (self, socketId):
 		if (XPS.__usedSockets[socketId] == 0):
@@ -87,17 +273,7 @@ class XPS:
 
 		command = 'ControllerMotionKernelMinMaxTimeLoadGet(double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(8):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('ControllerMotionKernelMinMaxTimeLoadGet', error, returnedString)
 
 
 	# ControllerMotionKernelMinMaxTimeLoadReset :  Reset controller motion kernel min/max time load
@@ -117,17 +293,7 @@ class XPS:
 
 		command = 'ControllerMotionKernelTimeLoadGet(double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('ControllerMotionKernelTimeLoadGet', error, returnedString)
 
 
 	# ControllerRTTimeGet :  Get controller corrector period and calculation time
@@ -137,17 +303,7 @@ class XPS:
 
 		command = 'ControllerRTTimeGet(double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('ControllerRTTimeGet', error, returnedString)
 
 
 	# ControllerSlaveStatusGet :  Read slave controller status
@@ -157,15 +313,7 @@ class XPS:
 
 		command = 'ControllerSlaveStatusGet(int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('ControllerSlaveStatusGet', error, returnedString)
 
 
 	# ControllerSlaveStatusStringGet :  Return the slave controller status string
@@ -195,15 +343,7 @@ class XPS:
 
 		command = 'ControllerStatusGet(int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('ControllerStatusGet', error, returnedString)
 
 
 	# ControllerStatusRead :  Read controller current status
@@ -213,15 +353,7 @@ class XPS:
 
 		command = 'ControllerStatusRead(int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('ControllerStatusRead', error, returnedString)
 
 
 	# ControllerStatusStringGet :  Return the controller status string
@@ -241,15 +373,7 @@ class XPS:
 
 		command = 'ElapsedTimeGet(double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('ElapsedTimeGet', error, returnedString)
 
 
 	# ErrorStringGet :  Return the error string corresponding to the error code
@@ -329,15 +453,7 @@ class XPS:
 
 		command = 'TimerGet(' + TimerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('TimerGet', error, returnedString)
 
 
 	# TimerSet :  Set a timer
@@ -499,15 +615,7 @@ class XPS:
 
 		command = 'EventExtendedStart(int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('EventExtendedStart', error, returnedString)
 
 
 	# EventExtendedAllGet :  Read all event and action configurations
@@ -583,17 +691,7 @@ class XPS:
 
 		command = 'GatheringCurrentNumberGet(int *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GatheringCurrentNumberGet', error, returnedString)
 
 
 	# GatheringStopAndSave :  Stop acquisition and save data
@@ -709,17 +807,7 @@ class XPS:
 
 		command = 'GatheringExternalCurrentNumberGet(int *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GatheringExternalCurrentNumberGet', error, returnedString)
 
 
 	# GatheringExternalDataGet :  Get a data line from external gathering buffer
@@ -769,15 +857,7 @@ class XPS:
 
 		command = 'DoubleGlobalArrayGet(' + str(Number) + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('DoubleGlobalArrayGet', error, returnedString)
 
 
 	# DoubleGlobalArraySet :  Set double global array value
@@ -803,17 +883,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(len(GPIOName)):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GPIOAnalogGet', error, returnedString, len(GPIOName))
 
 
 	# GPIOAnalogSet :  Set analog output for one or few output
@@ -845,17 +915,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(len(GPIOName)):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GPIOAnalogGainGet', error, returnedString, len(GPIOName))
 
 
 	# GPIOAnalogGainSet :  Set analog input gain (1, 2, 4 or 8) for one or few input
@@ -881,15 +941,7 @@ class XPS:
 
 		command = 'GPIODigitalGet(' + GPIOName + ',unsigned short *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('GPIODigitalGet', error, returnedString)
 
 
 	# GPIODigitalSet :  Set Digital Output for one or few output TTL
@@ -915,17 +967,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupAccelerationSetpointGet', error, returnedString, nbElement)
 
 
 	# GroupAnalogTrackingModeEnable :  Enable Analog Tracking mode on selected group
@@ -961,17 +1003,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupCorrectorOutputGet', error, returnedString, nbElement)
 
 
 	# GroupCurrentFollowingErrorGet :  Return current following errors
@@ -987,17 +1019,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupCurrentFollowingErrorGet', error, returnedString, nbElement)
 
 
 	# GroupHomeSearch :  Start home search sequence
@@ -1105,17 +1127,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement*2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupJogParametersGet', error, returnedString, nbElement*2)
 
 
 	# GroupJogCurrentGet :  Get Jog current on selected group
@@ -1131,17 +1143,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement*2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupJogCurrentGet', error, returnedString, nbElement*2)
 
 
 	# GroupJogModeEnable :  Enable Jog mode on selected group
@@ -1207,17 +1209,28 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
+		return self.__parseReply('GroupMotionStatusGet', error, returnedString, nbElement)
 
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
 
-		return retList
+	# GroupMotionStatusGetBatch :  Return the status of several groups or positioners with one network wait
+	def GroupMotionStatusGetBatch (self, socketId, GroupNames, nbElement):
+		if (XPS.__usedSockets[socketId] == 0):
+			return
+
+		commands = []
+		for GroupName in GroupNames:
+			command = 'GroupMotionStatusGet(' + GroupName + ','
+			for i in range(nbElement):
+				if (i > 0):
+					command += ','
+				command += 'int *'
+			command += ')'
+			commands.append(command)
+
+		retLists = []
+		for [error, returnedString] in self.__sendAndReceiveMultiple(socketId, commands):
+			retLists.append(self.__parseReply('GroupMotionStatusGet', error, returnedString, nbElement))
+		return retLists
 
 
 	# GroupMoveAbort :  Abort a move
@@ -1230,6 +1243,17 @@ class XPS:
 		return [error, returnedString]
 
 
+	# GroupMoveAbortBatch :  Abort the moves of several groups or positioners, in order, with one network wait
+	def GroupMoveAbortBatch (self, socketId, GroupNames):
+		if (XPS.__usedSockets[socketId] == 0):
+			return
+
+		commands = []
+		for GroupName in GroupNames:
+			commands.append('GroupMoveAbort(' + GroupName + ')')
+		return self.__sendAndReceiveMultiple(socketId, commands)
+
+
 	# GroupMoveAbortFast :  Abort quickly a move
 	def GroupMoveAbortFast (self, socketId, GroupName, AccelerationMultiplier):
 		if (XPS.__usedSockets[socketId] == 0):
@@ -1279,17 +1303,7 @@ class XPS:
 
 		command = 'GroupPositionCorrectedProfilerGet(' + GroupName + ',' + str(PositionX) + ',' + str(PositionY) + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupPositionCorrectedProfilerGet', error, returnedString)
 
 
 	# GroupPositionCurrentGet :  Return current positions
@@ -1305,17 +1319,28 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
+		return self.__parseReply('GroupPositionCurrentGet', error, returnedString, nbElement)
 
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
 
-		return retList
+	# GroupPositionCurrentGetBatch :  Return current positions of several groups or positioners with one network wait
+	def GroupPositionCurrentGetBatch (self, socketId, GroupNames, nbElement):
+		if (XPS.__usedSockets[socketId] == 0):
+			return
+
+		commands = []
+		for GroupName in GroupNames:
+			command = 'GroupPositionCurrentGet(' + GroupName + ','
+			for i in range(nbElement):
+				if (i > 0):
+					command += ','
+				command += 'double *'
+			command += ')'
+			commands.append(command)
+
+		retLists = []
+		for [error, returnedString] in self.__sendAndReceiveMultiple(socketId, commands):
+			retLists.append(self.__parseReply('GroupPositionCurrentGet', error, returnedString, nbElement))
+		return retLists
 
 
 	# GroupPositionPCORawEncoderGet :  Return PCO raw encoder positions
@@ -1325,17 +1350,7 @@ class XPS:
 
 		command = 'GroupPositionPCORawEncoderGet(' + GroupName + ',' + str(PositionX) + ',' + str(PositionY) + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupPositionPCORawEncoderGet', error, returnedString)
 
 
 	# GroupPositionSetpointGet :  Return setpoint positions
@@ -1351,17 +1366,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupPositionSetpointGet', error, returnedString, nbElement)
 
 
 	# GroupPositionTargetGet :  Return target positions
@@ -1377,17 +1382,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupPositionTargetGet', error, returnedString, nbElement)
 
 
 	# GroupReferencingActionExecute :  Execute an action in referencing mode
@@ -1427,15 +1422,7 @@ class XPS:
 
 		command = 'GroupStatusGet(' + GroupName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('GroupStatusGet', error, returnedString)
 
 
 	# GroupStatusStringGet :  Return the group status string corresponding to the group status code
@@ -1461,17 +1448,7 @@ class XPS:
 		command += ')'
 
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(nbElement):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupVelocityCurrentGet', error, returnedString, nbElement)
 
 
 	# KillAll :  Put all groups in 'Not initialized' state
@@ -1501,17 +1478,7 @@ class XPS:
 
 		command = 'PositionerAnalogTrackingPositionParametersGet(' + PositionerName + ',char *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerAnalogTrackingPositionParametersGet', error, returnedString)
 
 
 	# PositionerAnalogTrackingPositionParametersSet :  Update dynamic parameters for one axe of a group for a future analog tracking position
@@ -1531,17 +1498,7 @@ class XPS:
 
 		command = 'PositionerAnalogTrackingVelocityParametersGet(' + PositionerName + ',char *,double *,double *,double *,int *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(6):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerAnalogTrackingVelocityParametersGet', error, returnedString)
 
 
 	# PositionerAnalogTrackingVelocityParametersSet :  Update dynamic parameters for one axe of a group for a future analog tracking velocity
@@ -1561,17 +1518,7 @@ class XPS:
 
 		command = 'PositionerBacklashGet(' + PositionerName + ',double *,char *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerBacklashGet', error, returnedString)
 
 
 	# PositionerBacklashSet :  Set backlash value
@@ -1621,15 +1568,7 @@ class XPS:
 
 		command = 'PositionerCompensatedPCOCurrentStatusGet(' + PositionerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerCompensatedPCOCurrentStatusGet', error, returnedString)
 
 
 	# PositionerCompensatedPCOEnable :  Enable CIE08 compensated PCO mode execution
@@ -1705,17 +1644,7 @@ class XPS:
 
 		command = 'PositionerCompensationFrequencyNotchsGet(' + PositionerName + ',double *,double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(9):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCompensationFrequencyNotchsGet', error, returnedString)
 
 
 	# PositionerCompensationFrequencyNotchsSet :  Update frequency compensation notch filters parameters 
@@ -1735,15 +1664,7 @@ class XPS:
 
 		command = 'PositionerCompensationLowPassTwoFilterGet(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerCompensationLowPassTwoFilterGet', error, returnedString)
 
 
 	# PositionerCompensationLowPassTwoFilterSet :  Update second order low-pass filter parameters 
@@ -1763,17 +1684,7 @@ class XPS:
 
 		command = 'PositionerCompensationNotchModeFiltersGet(' + PositionerName + ',double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(8):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCompensationNotchModeFiltersGet', error, returnedString)
 
 
 	# PositionerCompensationNotchModeFiltersSet :  Update notch mode filters parameters 
@@ -1793,17 +1704,7 @@ class XPS:
 
 		command = 'PositionerCompensationPhaseCorrectionFiltersGet(' + PositionerName + ',double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(6):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCompensationPhaseCorrectionFiltersGet', error, returnedString)
 
 
 	# PositionerCompensationPhaseCorrectionFiltersSet :  Update phase correction filters parameters 
@@ -1823,17 +1724,7 @@ class XPS:
 
 		command = 'PositionerCompensationSpatialPeriodicNotchsGet(' + PositionerName + ',double *,double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(9):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCompensationSpatialPeriodicNotchsGet', error, returnedString)
 
 
 	# PositionerCompensationSpatialPeriodicNotchsSet :  Update spatial compensation notch filters parameters 
@@ -1863,17 +1754,7 @@ class XPS:
 
 		command = 'PositionerCorrectorNotchFiltersGet(' + PositionerName + ',double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(6):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorNotchFiltersGet', error, returnedString)
 
 
 	# PositionerCorrectorPIDBaseSet :  Update PIDBase parameters 
@@ -1893,17 +1774,7 @@ class XPS:
 
 		command = 'PositionerCorrectorPIDBaseGet(' + PositionerName + ',double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorPIDBaseGet', error, returnedString)
 
 
 	# PositionerCorrectorPIDFFAccelerationSet :  Update corrector parameters
@@ -1923,17 +1794,7 @@ class XPS:
 
 		command = 'PositionerCorrectorPIDFFAccelerationGet(' + PositionerName + ',bool *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(13):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorPIDFFAccelerationGet', error, returnedString)
 
 
 	# PositionerCorrectorP2IDFFAccelerationSet :  Update corrector parameters
@@ -1953,17 +1814,7 @@ class XPS:
 
 		command = 'PositionerCorrectorP2IDFFAccelerationGet(' + PositionerName + ',bool *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(15):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorP2IDFFAccelerationGet', error, returnedString)
 
 
 	# PositionerCorrectorPIDFFVelocitySet :  Update corrector parameters
@@ -1983,17 +1834,7 @@ class XPS:
 
 		command = 'PositionerCorrectorPIDFFVelocityGet(' + PositionerName + ',bool *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(12):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorPIDFFVelocityGet', error, returnedString)
 
 
 	# PositionerCorrectorPIDDualFFVoltageSet :  Update corrector parameters
@@ -2013,17 +1854,7 @@ class XPS:
 
 		command = 'PositionerCorrectorPIDDualFFVoltageGet(' + PositionerName + ',bool *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(14):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorPIDDualFFVoltageGet', error, returnedString)
 
 
 	# PositionerCorrectorPIPositionSet :  Update corrector parameters
@@ -2043,17 +1874,7 @@ class XPS:
 
 		command = 'PositionerCorrectorPIPositionGet(' + PositionerName + ',bool *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorPIPositionGet', error, returnedString)
 
 
 	# PositionerCorrectorSR1AccelerationSet :  Update corrector parameters
@@ -2073,17 +1894,7 @@ class XPS:
 
 		command = 'PositionerCorrectorSR1AccelerationGet(' + PositionerName + ',bool *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(8):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorSR1AccelerationGet', error, returnedString)
 
 
 	# PositionerCorrectorSR1ObserverAccelerationSet :  Update SR1 corrector observer parameters
@@ -2103,17 +1914,7 @@ class XPS:
 
 		command = 'PositionerCorrectorSR1ObserverAccelerationGet(' + PositionerName + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorSR1ObserverAccelerationGet', error, returnedString)
 
 
 	# PositionerCorrectorSR1OffsetAccelerationSet :  Update SR1 corrector output acceleration offset
@@ -2133,15 +1934,7 @@ class XPS:
 
 		command = 'PositionerCorrectorSR1OffsetAccelerationGet(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerCorrectorSR1OffsetAccelerationGet', error, returnedString)
 
 
 	# PositionerCorrectorTypeGet :  Read corrector type
@@ -2171,17 +1964,7 @@ class XPS:
 
 		command = 'PositionerCurrentVelocityAccelerationFiltersGet(' + PositionerName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCurrentVelocityAccelerationFiltersGet', error, returnedString)
 
 
 	# PositionerDriverFiltersGet :  Get driver filters parameters
@@ -2191,17 +1974,7 @@ class XPS:
 
 		command = 'PositionerDriverFiltersGet(' + PositionerName + ',double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(5):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerDriverFiltersGet', error, returnedString)
 
 
 	# PositionerDriverFiltersSet :  Set driver filters parameters
@@ -2221,17 +1994,7 @@ class XPS:
 
 		command = 'PositionerDriverPositionOffsetsGet(' + PositionerName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerDriverPositionOffsetsGet', error, returnedString)
 
 
 	# PositionerDriverStatusGet :  Read positioner driver status
@@ -2241,15 +2004,7 @@ class XPS:
 
 		command = 'PositionerDriverStatusGet(' + PositionerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerDriverStatusGet', error, returnedString)
 
 
 	# PositionerDriverStatusStringGet :  Return the positioner driver status string corresponding to the positioner error code
@@ -2269,17 +2024,7 @@ class XPS:
 
 		command = 'PositionerEncoderAmplitudeValuesGet(' + PositionerName + ',double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerEncoderAmplitudeValuesGet', error, returnedString)
 
 
 	# PositionerEncoderCalibrationParametersGet :  Read analog interpolated encoder calibration parameters
@@ -2289,17 +2034,7 @@ class XPS:
 
 		command = 'PositionerEncoderCalibrationParametersGet(' + PositionerName + ',double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerEncoderCalibrationParametersGet', error, returnedString)
 
 
 	# PositionerErrorGet :  Read and clear positioner error code
@@ -2309,15 +2044,7 @@ class XPS:
 
 		command = 'PositionerErrorGet(' + PositionerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerErrorGet', error, returnedString)
 
 
 	# PositionerErrorRead :  Read only positioner error code without clear it
@@ -2327,15 +2054,7 @@ class XPS:
 
 		command = 'PositionerErrorRead(' + PositionerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerErrorRead', error, returnedString)
 
 
 	# PositionerErrorStringGet :  Return the positioner status string corresponding to the positioner error code
@@ -2355,17 +2074,7 @@ class XPS:
 
 		command = 'PositionerExcitationSignalGet(' + PositionerName + ',int *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerExcitationSignalGet', error, returnedString)
 
 
 	# PositionerExcitationSignalSet :  Set excitation signal mode
@@ -2385,15 +2094,7 @@ class XPS:
 
 		command = 'PositionerHardwareStatusGet(' + PositionerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerHardwareStatusGet', error, returnedString)
 
 
 	# PositionerHardwareStatusStringGet :  Return the positioner hardware status string corresponding to the positioner error code
@@ -2413,15 +2114,7 @@ class XPS:
 
 		command = 'PositionerHardInterpolatorFactorGet(' + PositionerName + ',int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerHardInterpolatorFactorGet', error, returnedString)
 
 
 	# PositionerHardInterpolatorFactorSet :  Set hard interpolator parameters
@@ -2441,15 +2134,7 @@ class XPS:
 
 		command = 'PositionerHardInterpolatorPositionGet(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerHardInterpolatorPositionGet', error, returnedString)
 
 
 	# PositionerMaximumVelocityAndAccelerationGet :  Return maximum velocity and acceleration of the positioner
@@ -2459,17 +2144,7 @@ class XPS:
 
 		command = 'PositionerMaximumVelocityAndAccelerationGet(' + PositionerName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerMaximumVelocityAndAccelerationGet', error, returnedString)
 
 
 	# PositionerMotionDoneGet :  Read motion done parameters
@@ -2479,17 +2154,7 @@ class XPS:
 
 		command = 'PositionerMotionDoneGet(' + PositionerName + ',double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(5):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerMotionDoneGet', error, returnedString)
 
 
 	# PositionerMotionDoneSet :  Update motion done parameters
@@ -2519,17 +2184,7 @@ class XPS:
 
 		command = 'PositionerPositionCompareAquadBWindowedGet(' + PositionerName + ',double *,double *,bool *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerPositionCompareAquadBWindowedGet', error, returnedString)
 
 
 	# PositionerPositionCompareAquadBWindowedSet :  Set position compare AquadB windowed parameters
@@ -2549,17 +2204,7 @@ class XPS:
 
 		command = 'PositionerPositionCompareGet(' + PositionerName + ',double *,double *,double *,bool *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerPositionCompareGet', error, returnedString)
 
 
 	# PositionerPositionCompareSet :  Set position compare parameters
@@ -2599,17 +2244,7 @@ class XPS:
 
 		command = 'PositionerPositionComparePulseParametersGet(' + PositionerName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerPositionComparePulseParametersGet', error, returnedString)
 
 
 	# PositionerPositionComparePulseParametersSet :  Set position compare PCO pulse parameters
@@ -2629,15 +2264,7 @@ class XPS:
 
 		command = 'PositionerPositionCompareScanAccelerationLimitGet(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerPositionCompareScanAccelerationLimitGet', error, returnedString)
 
 
 	# PositionerPositionCompareScanAccelerationLimitSet :  Set position compare scan acceleration limit
@@ -2657,17 +2284,7 @@ class XPS:
 
 		command = 'PositionerPreCorrectorExcitationSignalGet(' + PositionerName + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerPreCorrectorExcitationSignalGet', error, returnedString)
 
 
 	# PositionerPreCorrectorExcitationSignalSet :  Set pre-corrector excitation signal mode
@@ -2687,15 +2304,7 @@ class XPS:
 
 		command = 'PositionerRawEncoderPositionGet(' + PositionerName + ',' + str(UserEncoderPosition) + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerRawEncoderPositionGet', error, returnedString)
 
 
 	# PositionersEncoderIndexDifferenceGet :  Return the difference between index of primary axis and secondary axis (only after homesearch)
@@ -2705,15 +2314,7 @@ class XPS:
 
 		command = 'PositionersEncoderIndexDifferenceGet(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionersEncoderIndexDifferenceGet', error, returnedString)
 
 
 	# PositionerSGammaExactVelocityAjustedDisplacementGet :  Return adjusted displacement to get exact velocity
@@ -2723,15 +2324,7 @@ class XPS:
 
 		command = 'PositionerSGammaExactVelocityAjustedDisplacementGet(' + PositionerName + ',' + str(DesiredDisplacement) + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerSGammaExactVelocityAjustedDisplacementGet', error, returnedString)
 
 
 	# PositionerSGammaParametersGet :  Read dynamic parameters for one axe of a group for a future displacement 
@@ -2741,17 +2334,7 @@ class XPS:
 
 		command = 'PositionerSGammaParametersGet(' + PositionerName + ',double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerSGammaParametersGet', error, returnedString)
 
 
 	# PositionerSGammaParametersSet :  Update dynamic parameters for one axe of a group for a future displacement
@@ -2771,17 +2354,7 @@ class XPS:
 
 		command = 'PositionerSGammaPreviousMotionTimesGet(' + PositionerName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerSGammaPreviousMotionTimesGet', error, returnedString)
 
 
 	# PositionerStageParameterGet :  Return the stage parameter
@@ -2811,17 +2384,7 @@ class XPS:
 
 		command = 'PositionerTimeFlasherGet(' + PositionerName + ',double *,double *,double *,bool *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerTimeFlasherGet', error, returnedString)
 
 
 	# PositionerTimeFlasherSet :  Set time flasher parameters
@@ -2861,17 +2424,7 @@ class XPS:
 
 		command = 'PositionerUserTravelLimitsGet(' + PositionerName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerUserTravelLimitsGet', error, returnedString)
 
 
 	# PositionerUserTravelLimitsSet :  Update UserMinimumTarget and UserMaximumTarget
@@ -2901,15 +2454,7 @@ class XPS:
 
 		command = 'PositionerWarningFollowingErrorGet(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerWarningFollowingErrorGet', error, returnedString)
 
 
 	# PositionerCorrectorAutoTuning :  Astrom&Hagglund based auto-tuning
@@ -2919,17 +2464,7 @@ class XPS:
 
 		command = 'PositionerCorrectorAutoTuning(' + PositionerName + ',' + str(TuningMode) + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerCorrectorAutoTuning', error, returnedString)
 
 
 	# PositionerAccelerationAutoScaling :  Astrom&Hagglund based auto-scaling
@@ -2939,15 +2474,7 @@ class XPS:
 
 		command = 'PositionerAccelerationAutoScaling(' + PositionerName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('PositionerAccelerationAutoScaling', error, returnedString)
 
 
 	# MultipleAxesPVTVerification :  Multiple axes PVT trajectory verification
@@ -2967,17 +2494,7 @@ class XPS:
 
 		command = 'MultipleAxesPVTVerificationResultGet(' + PositionerName + ',char *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('MultipleAxesPVTVerificationResultGet', error, returnedString)
 
 
 	# MultipleAxesPVTExecution :  Multiple axes PVT trajectory execution
@@ -2997,15 +2514,7 @@ class XPS:
 
 		command = 'MultipleAxesPVTParametersGet(' + GroupName + ',char *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('MultipleAxesPVTParametersGet', error, returnedString)
 
 
 	# MultipleAxesPVTPulseOutputSet :  Configure pulse output on trajectory
@@ -3025,17 +2534,7 @@ class XPS:
 
 		command = 'MultipleAxesPVTPulseOutputGet(' + GroupName + ',int *,int *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('MultipleAxesPVTPulseOutputGet', error, returnedString)
 
 
 	# MultipleAxesPVTLoadToMemory :  Multiple Axes Load PVT trajectory through function
@@ -3095,15 +2594,7 @@ class XPS:
 
 		command = 'SingleAxisSlaveParametersGet(' + GroupName + ',char *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('SingleAxisSlaveParametersGet', error, returnedString)
 
 
 	# SingleAxisThetaClampDisable :  Set clamping disable on selected group
@@ -3163,15 +2654,7 @@ class XPS:
 
 		command = 'SingleAxisThetaSlaveParametersGet(' + GroupName + ',char *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('SingleAxisThetaSlaveParametersGet', error, returnedString)
 
 
 	# SpindleSlaveModeEnable :  Enable the slave mode
@@ -3211,15 +2694,7 @@ class XPS:
 
 		command = 'SpindleSlaveParametersGet(' + GroupName + ',char *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('SpindleSlaveParametersGet', error, returnedString)
 
 
 	# GroupSpinParametersSet :  Modify Spin parameters on selected group and activate the continuous move
@@ -3239,17 +2714,7 @@ class XPS:
 
 		command = 'GroupSpinParametersGet(' + GroupName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupSpinParametersGet', error, returnedString)
 
 
 	# GroupSpinCurrentGet :  Get Spin current on selected group
@@ -3259,17 +2724,7 @@ class XPS:
 
 		command = 'GroupSpinCurrentGet(' + GroupName + ',double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GroupSpinCurrentGet', error, returnedString)
 
 
 	# GroupSpinModeStop :  Stop Spin mode on selected group with specified acceleration
@@ -3299,17 +2754,7 @@ class XPS:
 
 		command = 'XYLineArcVerificationResultGet(' + PositionerName + ',char *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYLineArcVerificationResultGet', error, returnedString)
 
 
 	# XYLineArcExecution :  XY trajectory execution
@@ -3329,17 +2774,7 @@ class XPS:
 
 		command = 'XYLineArcParametersGet(' + GroupName + ',char *,double *,double *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYLineArcParametersGet', error, returnedString)
 
 
 	# XYLineArcPulseOutputSet :  Configure pulse output on trajectory
@@ -3359,17 +2794,7 @@ class XPS:
 
 		command = 'XYLineArcPulseOutputGet(' + GroupName + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYLineArcPulseOutputGet', error, returnedString)
 
 
 	# XYPVTVerification :  XY PVT trajectory verification
@@ -3389,17 +2814,7 @@ class XPS:
 
 		command = 'XYPVTVerificationResultGet(' + PositionerName + ',char *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYPVTVerificationResultGet', error, returnedString)
 
 
 	# XYPVTExecution :  XY PVT trajectory execution
@@ -3419,15 +2834,7 @@ class XPS:
 
 		command = 'XYPVTParametersGet(' + GroupName + ',char *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('XYPVTParametersGet', error, returnedString)
 
 
 	# XYPVTPulseOutputSet :  Configure pulse output on trajectory
@@ -3447,17 +2854,7 @@ class XPS:
 
 		command = 'XYPVTPulseOutputGet(' + GroupName + ',int *,int *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYPVTPulseOutputGet', error, returnedString)
 
 
 	# XYPVTLoadToMemory :  XY Load PVT trajectory through function
@@ -3487,17 +2884,7 @@ class XPS:
 
 		command = 'XYZGroupPositionCorrectedProfilerGet(' + GroupName + ',' + str(PositionX) + ',' + str(PositionY) + ',' + str(PositionZ) + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYZGroupPositionCorrectedProfilerGet', error, returnedString)
 
 
 	# XYZGroupPositionPCORawEncoderGet :  Return PCO raw encoder positions
@@ -3507,17 +2894,7 @@ class XPS:
 
 		command = 'XYZGroupPositionPCORawEncoderGet(' + GroupName + ',' + str(PositionX) + ',' + str(PositionY) + ',' + str(PositionZ) + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYZGroupPositionPCORawEncoderGet', error, returnedString)
 
 
 	# XYZSplineVerification :  XYZ trajectory verifivation
@@ -3537,17 +2914,7 @@ class XPS:
 
 		command = 'XYZSplineVerificationResultGet(' + PositionerName + ',char *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYZSplineVerificationResultGet', error, returnedString)
 
 
 	# XYZSplineExecution :  XYZ trajectory execution
@@ -3567,17 +2934,7 @@ class XPS:
 
 		command = 'XYZSplineParametersGet(' + GroupName + ',char *,double *,double *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('XYZSplineParametersGet', error, returnedString)
 
 
 	# TZPVTVerification :  TZ PVT trajectory verification
@@ -3597,17 +2954,7 @@ class XPS:
 
 		command = 'TZPVTVerificationResultGet(' + PositionerName + ',char *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('TZPVTVerificationResultGet', error, returnedString)
 
 
 	# TZPVTExecution :  TZ PVT trajectory execution
@@ -3627,15 +2974,7 @@ class XPS:
 
 		command = 'TZPVTParametersGet(' + GroupName + ',char *,int *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('TZPVTParametersGet', error, returnedString)
 
 
 	# TZPVTPulseOutputSet :  Configure pulse output on trajectory
@@ -3655,17 +2994,7 @@ class XPS:
 
 		command = 'TZPVTPulseOutputGet(' + GroupName + ',int *,int *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('TZPVTPulseOutputGet', error, returnedString)
 
 
 	# TZPVTLoadToMemory :  TZ Load PVT trajectory through function
@@ -3715,15 +3044,7 @@ class XPS:
 
 		command = 'TZTrackingUserMaximumZZZTargetDifferenceGet(' + GroupName + ',double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-			j += 1
-		retList.append(eval(returnedString[i:i+j]))
-
-		return retList
+		return self.__parseReply('TZTrackingUserMaximumZZZTargetDifferenceGet', error, returnedString)
 
 
 	# TZTrackingUserMaximumZZZTargetDifferenceSet :  Set user maximum ZZZ target difference for tracking control
@@ -3763,17 +3084,7 @@ class XPS:
 
 		command = 'PositionerMotorOutputOffsetGet(' + PositionerName + ',double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(4):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('PositionerMotorOutputOffsetGet', error, returnedString)
 
 
 	# PositionerMotorOutputOffsetSet :  Set soft (user defined) motor output DAC offsets
@@ -3793,17 +3104,7 @@ class XPS:
 
 		command = 'SingleAxisThetaPositionRawGet(' + GroupName + ',double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(3):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('SingleAxisThetaPositionRawGet', error, returnedString)
 
 
 	# EEPROMCIESet :  Get raw encoder positions for single axis theta encoder
@@ -3853,17 +3154,7 @@ class XPS:
 
 		command = 'CPUCoreAndBoardSupplyVoltagesGet(double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(8):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('CPUCoreAndBoardSupplyVoltagesGet', error, returnedString)
 
 
 	# CPUTemperatureAndFanSpeedGet :  Get raw encoder positions for single axis theta encoder
@@ -3873,17 +3164,7 @@ class XPS:
 
 		command = 'CPUTemperatureAndFanSpeedGet(double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(2):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('CPUTemperatureAndFanSpeedGet', error, returnedString)
 
 
 	# ActionListGet :  Action list
@@ -4083,17 +3364,7 @@ class XPS:
 
 		command = 'GatheringUserDatasGet(double *,double *,double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(8):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('GatheringUserDatasGet', error, returnedString)
 
 
 	# ControllerMotionKernelPeriodMinMaxGet :  Get controller motion kernel min/max periods
@@ -4103,17 +3374,7 @@ class XPS:
 
 		command = 'ControllerMotionKernelPeriodMinMaxGet(double *,double *,double *,double *,double *,double *)'
 		[error, returnedString] = self.__sendAndReceive(socketId, command)
-		if (error != 0):
-			return [error, returnedString]
-
-		i, j, retList = 0, 0, [error]
-		for paramNb in range(6):
-			while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
-				j += 1
-			retList.append(eval(returnedString[i:i+j]))
-			i, j = i+j+1, 0
-
-		return retList
+		return self.__parseReply('ControllerMotionKernelPeriodMinMaxGet', error, returnedString)
 
 
 	# ControllerMotionKernelPeriodMinMaxReset :  Reset controller motion kernel min/max periods
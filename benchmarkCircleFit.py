@@ -0,0 +1,76 @@
+'''
+Benchmark for the circle fit of the cone cross sections.
+The (x, z) points of each routine saved in data/*.csv are fitted with the previous loop and np.matrix fit,
+one file at a time, and with TLCircleFit.fitCircles, all the files in one batch. The time per fit and the
+largest difference of the radii between the two are reported.
+Each fit method and outlier rejection of fitCircles is then timed on the batch, and run again after one edge of
+every routine is moved by a bad edge offset, reporting how many routines get a radius off by more than a tolerance.
+'''
+
+## Imports
+# Built in modules
+import glob
+import timeit
+import numpy as np
+# Custom modules
+import TLCircleFit
+
+# Number of repetitions of the timed fits
+numberOfRepetitions = 200
+# Offset of the bad edge added to each routine and the radius change counted as a bad fit [mm]
+badEdgeOffset = 0.05
+radiusTolerance = 0.002
+
+# Previous fit, builds the target with a loop and solves with np.matrix
+def previousFitCircle(x,y):
+    coefA = np.matrix((x, y, np.ones(len(x)))).getT()
+    coefB = []
+    for i in  range(0,len(x)):
+        coefB.append(-(x[i]**2+y[i]**2))
+    coefB = np.matrix(coefB).getT()
+    coefficients = np.linalg.lstsq(coefA,coefB,rcond=-1)
+    return np.sqrt((coefficients[0][0,0]**2 + coefficients[0][1,0]**2)/4 - coefficients[0][2,0])
+
+# Function that loads the (x, z) points of every routine in the data folder, padded with nan to the same number of points
+def loadPointSets():
+    pointSets = []
+    for fileName in sorted(glob.glob('data/*.csv')):
+        data = np.genfromtxt(fileName,delimiter=',',skip_header=1,usecols=(0,2))
+        if data.ndim == 2 and len(data) >= 3:
+            pointSets.append(data)
+    points = np.full((len(pointSets),max(len(pointSet) for pointSet in pointSets),2),np.nan)
+    for (index, pointSet) in enumerate(pointSets):
+        points[index,:len(pointSet)] = pointSet
+    return pointSets, points
+
+def main():
+    (pointSets, points) = loadPointSets()
+    print('Point sets: {} (up to {} points)'.format(len(pointSets),points.shape[1]))
+
+    previousRadii = np.array([previousFitCircle(pointSet[:,0],pointSet[:,1]) for pointSet in pointSets])
+    (centers, radii, residuals, conditionNumbers) = TLCircleFit.fitCircles(points)
+    fitted = np.isfinite(radii)
+    print('Fitted point sets: {}, largest radius difference: {:.3g} mm'.format(fitted.sum(),np.max(np.abs(radii - previousRadii)[fitted])))
+    print('Median RMS residual: {:.3g} mm, largest condition number: {:.3g}'.format(np.median(np.sqrt(np.nanmean(residuals[fitted]**2,axis=1))),np.max(conditionNumbers[fitted])))
+
+    previousTime = timeit.timeit(lambda: [previousFitCircle(pointSet[:,0],pointSet[:,1]) for pointSet in pointSets],number=numberOfRepetitions)
+    batchTime = timeit.timeit(lambda: TLCircleFit.fitCircles(points),number=numberOfRepetitions)
+    print('Previous fit: {:.1f} us per point set'.format(1e6 * previousTime / (numberOfRepetitions * len(pointSets))))
+    print('Batch fit: {:.1f} us per point set'.format(1e6 * batchTime / (numberOfRepetitions * len(pointSets))))
+
+    # Moves one random edge of each routine along x
+    randomState = np.random.RandomState(0)
+    badPoints = points.copy()
+    badIndices = [randomState.randint(len(pointSet)) for pointSet in pointSets]
+    badPoints[np.arange(len(pointSets)),badIndices,0] += badEdgeOffset
+
+    print('Method | outlier rejection | us per point set | routines off by more than {} mm with a bad edge'.format(radiusTolerance))
+    for method in ('algebraic','taubin','geometric'):
+        for outlierRejection in (None,'huber','ransac'):
+            fitTime = timeit.timeit(lambda: TLCircleFit.fitCircles(points,method,outlierRejection),number=10)
+            (centers, cleanRadii, residuals, conditionNumbers) = TLCircleFit.fitCircles(points,method,outlierRejection)
+            (centers, badRadii, residuals, conditionNumbers) = TLCircleFit.fitCircles(badPoints,method,outlierRejection)
+            print('{} | {} | {:.1f} | {}'.format(method,outlierRejection,1e6 * fitTime / (10 * len(pointSets)),np.sum(np.abs(badRadii - cleanRadii) > radiusTolerance)))
+
+if __name__ == '__main__':
+    main()
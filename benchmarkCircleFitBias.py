@@ -0,0 +1,72 @@
+'''
+Benchmark for the bias of the circle fits on clean cross sections of the routine.
+Cross sections are made like the routine makes them: three sweeps along x at z offsets of 0, -5 and -8 um, each giving
+the two side edges, and the top edge found above the middle of each sweep. The edges get gaussian noise along their
+sweep direction. The cross sections are drawn with the first sweep anywhere across the cone (routine) and with all the
+sweeps near the top of the cone (short arc), where the algebraic (Kasa) fit is biased towards smaller radii.
+Each fit method and outlier rejection of TLCircleFit.fitCircles reports the mean error of the radius (bias), its RMS
+error and the number of cross sections it could not fit, for each noise level.
+'''
+
+## Imports
+# Built in modules
+import timeit
+import numpy as np
+# Custom modules
+import TLCircleFit
+
+# Number of cross sections of each geometry and the noise levels of the edges [mm]
+numberOfCrossSections = 2000
+noiseLevels = [0.0005,0.002]
+# Range of the radii of the cross sections [mm], those of the routines saved in data/*.csv
+radiusRange = (0.012,0.1)
+# Offsets along z of the three sweeps of a cross section [mm]
+passOffsets = [0.0,-0.005,-0.008]
+# Range of the first sweep along z, relative to the radius (-1 is the top of the cross section), for each geometry
+firstSweepRanges = {'routine': (-0.8,0.2), 'short arc': (-0.9,-0.6)}
+
+# Function that returns the (N, 9, 2) clean edges and the radii of cross sections with the first sweep in a range
+def makeCrossSections(firstSweepRange,randomState):
+    radii = randomState.uniform(radiusRange[0],radiusRange[1],numberOfCrossSections)
+    firstSweeps = radii * randomState.uniform(firstSweepRange[0],firstSweepRange[1],numberOfCrossSections)
+    # Keeps the sweeps inside the cross section
+    sweepLevels = np.maximum(firstSweeps[:,np.newaxis] + np.array(passOffsets),-0.95 * radii[:,np.newaxis])
+    halfChords = np.sqrt(radii[:,np.newaxis]**2 - sweepLevels**2)
+
+    # Side 1, side 2 and top edge of each sweep, the top is above the middle of the sweep
+    points = np.zeros((numberOfCrossSections,3 * len(passOffsets),2))
+    points[:,0::3,0] = -halfChords
+    points[:,1::3,0] = halfChords
+    points[:,0::3,1] = sweepLevels
+    points[:,1::3,1] = sweepLevels
+    points[:,2::3,1] = -radii[:,np.newaxis]
+    return points, radii
+
+# Function that adds the noise along the sweep direction, x for the side edges and z for the top edges
+def addNoise(points,noiseLevel,randomState):
+    noisyPoints = points.copy()
+    noise = randomState.normal(0,noiseLevel,points.shape[:2])
+    noisyPoints[:,0::3,0] += noise[:,0::3]
+    noisyPoints[:,1::3,0] += noise[:,1::3]
+    # The top is found above the middle of the two noisy side edges
+    noisyPoints[:,2::3,0] += (noise[:,0::3] + noise[:,1::3]) / 2
+    noisyPoints[:,2::3,1] += noise[:,2::3]
+    return noisyPoints
+
+def main():
+    randomState = np.random.RandomState(0)
+    print('Geometry | noise [um] | method | outlier rejection | bias [um] | RMS error [um] | not fitted | us per cross section')
+    for geometry in sorted(firstSweepRanges):
+        (points, radii) = makeCrossSections(firstSweepRanges[geometry],randomState)
+        for noiseLevel in noiseLevels:
+            noisyPoints = addNoise(points,noiseLevel,randomState)
+            for method in ('algebraic','taubin','geometric'):
+                for outlierRejection in (None,'huber','ransac'):
+                    fitTime = timeit.timeit(lambda: TLCircleFit.fitCircles(noisyPoints,method,outlierRejection),number=1)
+                    (centers, fittedRadii, residuals, conditionNumbers) = TLCircleFit.fitCircles(noisyPoints,method,outlierRejection)
+                    fitted = np.isfinite(fittedRadii)
+                    errors = 1000 * (fittedRadii - radii)[fitted]
+                    print('{} | {} | {} | {} | {:.2f} | {:.2f} | {} | {:.1f}'.format(geometry,1000 * noiseLevel,method,outlierRejection,np.mean(errors),np.sqrt(np.mean(errors**2)),np.sum(~fitted),1e6 * fitTime / numberOfCrossSections))
+
+if __name__ == '__main__':
+    main()
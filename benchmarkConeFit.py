@@ -0,0 +1,74 @@
+'''
+Benchmark for the cone fit of TLOptimization on the routines saved in data/*.csv.
+Each routine is fitted with the previous solver (a Python loop over the points for the cost and finite difference
+gradients in optimize.minimize) and with the vectorized residuals and analytic gradient, through optimize.minimize
+and optimize.least_squares. The time to solution, the number of cost evaluations and the agreement of the solution
+and the final cost with the previous solver are reported. Routines agree when the solutions are within the
+agreement distance and the final costs within the agreement ratio (the routines with few y positions can have
+several minima far apart with nearly the same cost).
+'''
+
+## Imports
+# Built in modules
+import glob
+import time
+import numpy as np
+from scipy import optimize
+# Custom modules
+import TLOptimization
+
+# Distance between the solutions [mm] and relative difference of the final costs under which two solvers agree
+agreementDistance = 0.001
+agreementRatio = 0.001
+
+# Function that loads the (N, 3) points of every routine in the data folder
+def loadRoutines():
+    routines = []
+    for fileName in sorted(glob.glob('data/*.csv')):
+        data = np.genfromtxt(fileName,delimiter=',',skip_header=1,usecols=(0,1,2))
+        if data.ndim == 2 and len(data) >= 3:
+            routines.append(data)
+    return routines
+
+# Previous solver, sums distanceToCone over a list of points and lets optimize.minimize take finite differences
+def previousSolve(optimization,data,initialGuess):
+    points = [point for point in data]
+    cost = lambda startingPoint: sum([optimization.distanceToCone(point + startingPoint) for point in points])
+    return optimize.minimize(cost,initialGuess)
+
+# Initial guess that puts the centroid of the routine on the axis of the cone, the focal length over the radius of the light
+# times the mean distance from the centroid away from the apex
+def initialGuess(optimization,data):
+    centroid = data.mean(axis=0)
+    meanRadius = np.mean(np.hypot(data[:,0] - centroid[0],data[:,2] - centroid[2]))
+    return -centroid + np.array([0,optimization.focalLength / optimization.radius * meanRadius,0])
+
+def main():
+    routines = loadRoutines()
+    optimization = TLOptimization.Optimization()
+    print('Routines: {}'.format(len(routines)))
+
+    solvers = [('previous',lambda data, guess: previousSolve(optimization,data,guess)),
+        ('minimize',lambda data, guess: optimization.solve(data,'minimize',guess)),
+        ('least_squares',lambda data, guess: optimization.solve(data,'least_squares',guess))]
+
+    results = {}
+    print('Solver | total time [ms] | mean cost evaluations | median solution difference [mm] | routines in agreement | routines with a lower cost')
+    for (name, solve) in solvers:
+        (solutions, costs, evaluations) = ([], [], [])
+        startTime = time.time()
+        for data in routines:
+            result = solve(data,initialGuess(optimization,data))
+            solutions.append(result.x)
+            costs.append(np.sum(optimization.residuals(data,result.x)**2))
+            evaluations.append(result.nfev)
+        totalTime = time.time() - startTime
+        results[name] = (np.array(solutions), np.array(costs))
+
+        solutionDifferences = np.max(np.abs(results[name][0] - results['previous'][0]),axis=1)
+        costDifferences = (results[name][1] - results['previous'][1]) / results['previous'][1]
+        agreement = np.sum((solutionDifferences < agreementDistance) & (np.abs(costDifferences) < agreementRatio))
+        print('{} | {:.1f} | {:.1f} | {:.3g} | {}/{} | {}'.format(name,1000 * totalTime,np.mean(evaluations),np.median(solutionDifferences),agreement,len(routines),np.sum(costDifferences < -agreementRatio)))
+
+if __name__ == '__main__':
+    main()
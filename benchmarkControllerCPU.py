@@ -0,0 +1,76 @@
+'''
+Benchmark for the CPU used by the system controller command loop.
+Compares the previous loop that polled queue_SCtoUI.empty() without sleeping against the blocking
+command loop in SystemController.run, during an idle session and during a routine.
+The equipment is not initialized, the routine is emulated by a command that waits like a routine waits on the stages.
+'''
+
+## Imports
+# Built in modules
+import multiprocessing
+import threading
+import time
+import os
+# Custom modules
+import TLSystemController
+import TLSampleRing
+
+# Length of the idle session in seconds
+idleSessionTime = 5.0
+# Number of routine passes and the time each pass waits on the stages and camera in seconds
+routinePasses = 20
+routinePassTime = 0.2
+
+# Function that reproduces the previous system controller loop, busy polling the queue for commands
+def runBusyPolling(systemController):
+    while systemController.systemControllerRunning:
+        if not systemController.queue_SCtoUI.empty():
+            (_command, _payload) = systemController.queue_SCtoUI.get()
+            systemController._commandList[_command](**_payload)
+
+# Function that creates a system controller without the equipment attached
+def createSystemController():
+    systemController = TLSystemController.SystemController(10,multiprocessing.Queue(),multiprocessing.Queue(),TLSampleRing.SampleRing(),multiprocessing.Event())
+    systemController.initializeEquipment = lambda: None
+    systemController.heartbeat = lambda: None
+    systemController.shutDown = lambda: setattr(systemController,'systemControllerRunning',False)
+    systemController._commandList['shutDown'] = systemController.shutDown
+    # Routine pass that waits like collectDataPoint waits on the stages and the pixel counter
+    systemController._commandList['routinePass'] = lambda: time.sleep(routinePassTime)
+    return systemController
+
+# Function that runs a session on a command loop and returns the CPU time used as a fraction of the wall time
+def measureSession(loopFunction,sendCommands):
+    systemController = createSystemController()
+    loopThread = threading.Thread(target=loopFunction, args=(systemController,))
+
+    startTimes = os.times()
+    startTime = time.time()
+    loopThread.start()
+    sendCommands(systemController.queue_SCtoUI)
+    systemController.queue_SCtoUI.put(('shutDown',{}))
+    loopThread.join()
+    endTimes = os.times()
+    wallTime = time.time() - startTime
+
+    cpuTime = (endTimes[0] - startTimes[0]) + (endTimes[1] - startTimes[1])
+    return cpuTime / wallTime
+
+# Function that sends no commands for the idle session time
+def idleSession(queue_SCtoUI):
+    time.sleep(idleSessionTime)
+
+# Function that sends the routine passes with a short gap between them, like a user driven routine
+def routineSession(queue_SCtoUI):
+    for i in range(routinePasses):
+        queue_SCtoUI.put(('routinePass',{}))
+        time.sleep(routinePassTime * 1.5)
+
+def main():
+    for (sessionName, sendCommands) in (('Idle session',idleSession),('Routine',routineSession)):
+        busyPollingUtilisation = measureSession(runBusyPolling,sendCommands)
+        blockingUtilisation = measureSession(TLSystemController.SystemController.run,sendCommands)
+        print('{}: busy polling loop {:.1f}% CPU, blocking command loop {:.1f}% CPU'.format(sessionName,100 * busyPollingUtilisation,100 * blockingUtilisation))
+
+if __name__ == '__main__':
+    main()
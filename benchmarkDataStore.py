@@ -0,0 +1,66 @@
+'''
+Benchmark for the data point store.
+Appends the points of a routine and reads their positions back for a fit, the previous way (an object per point in
+a global list and an array rebuilt point by point) and with TLDataStore (a structured array and an (N, 3) view).
+Each append costs a few microseconds more than creating an object (nothing next to the seconds a pass takes), reading
+the positions becomes a constant time view.
+'''
+
+## Imports
+# Built in modules
+import datetime
+import timeit
+import numpy as np
+# Custom modules
+import TLDataStore
+
+# Numbers of points in the routines compared
+routineSizes = [18,180,1800]
+# Number of repetitions of the timed routines
+numberOfRepetitions = 50
+
+# Previous data point, one object per point registered in a list
+class PreviousDataPoint():
+    def __init__(self,x,y,z,pixelTriggerValue,pointType,time,instances):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.pixelTriggerValue = pixelTriggerValue
+        self.pointType = pointType
+        self.time = time
+        instances.append(self)
+
+# Previous routine, creates the objects
+def previousAppend(points):
+    instances = []
+    for (x, y, z) in points:
+        PreviousDataPoint(x,y,z,5,1,datetime.datetime.now().time(),instances)
+    return instances
+
+# Previous readData, rebuilds the positions point by point
+def previousRead(instances):
+    return np.array([np.array([instance.x,instance.y,instance.z]) for instance in instances])
+
+# Data store routine, appends the points
+def dataStoreAppend(points,dataStore):
+    dataStore.clear()
+    for (x, y, z) in points:
+        dataStore.append(x,y,z,5,1)
+    return dataStore
+
+def main():
+    randomState = np.random.RandomState(0)
+    dataStore = TLDataStore.DataStore()
+    print('Points | append previous [ms] | append data store [ms] | read previous [us] | read data store [us]')
+    for routineSize in routineSizes:
+        points = [tuple(point) for point in randomState.uniform(size=(routineSize,3))]
+        instances = previousAppend(points)
+        dataStoreAppend(points,dataStore)
+        assert np.array_equal(previousRead(instances),dataStore.positions())
+
+        appendTimes = [timeit.timeit(lambda: previousAppend(points),number=numberOfRepetitions),timeit.timeit(lambda: dataStoreAppend(points,dataStore),number=numberOfRepetitions)]
+        readTimes = [timeit.timeit(lambda: previousRead(instances),number=numberOfRepetitions),timeit.timeit(lambda: dataStore.positions(),number=numberOfRepetitions)]
+        print('{} | {:.3f} | {:.3f} | {:.1f} | {:.1f}'.format(routineSize,1000 * appendTimes[0] / numberOfRepetitions,1000 * appendTimes[1] / numberOfRepetitions,1e6 * readTimes[0] / numberOfRepetitions,1e6 * readTimes[1] / numberOfRepetitions))
+
+if __name__ == '__main__':
+    main()
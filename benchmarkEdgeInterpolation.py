@@ -0,0 +1,68 @@
+'''
+Benchmark for the precision of the scattering edge position against the sweep velocity.
+Sweeps of the stages through a scattering edge are simulated with the camera frame rate, a smooth pixel count
+profile and noise. The position of the first frame past the threshold (previous detection) is compared against
+the interpolated, linear fit and sigmoid fit crossings of the edge detector, along with the time a sweep across
+the cone takes at each velocity.
+'''
+
+## Imports
+# Built in modules
+import numpy as np
+# Custom modules
+import TLEdgeDetection
+
+# Camera frame rate [frames/s]
+frameRate = 30.0
+# Pixel count threshold used by the system controller
+thresholdPixelCount = 10
+# Pixel count inside the cone, width of the edge profile [mm] and noise of the pixel count [pixels]
+scatteringPixelCount = 200.0
+edgeWidth = 0.0005
+pixelCountNoise = 2.0
+# Distance swept across the cone for each side [mm]
+sweepDistance = 0.145
+# Sweep velocities compared [mm/s]
+sweepVelocities = [0.001,0.0025,0.005,0.01,0.02]
+# Number of simulated sweeps for each velocity
+numberOfSweeps = 200
+
+# Function that returns the pixel count profile of the edge (edge at position 0)
+def edgeProfile(positions):
+    return scatteringPixelCount / (1 + np.exp(-positions / edgeWidth))
+
+# Position where the noiseless profile crosses the threshold
+trueEdgePosition = edgeWidth * np.log(thresholdPixelCount / (scatteringPixelCount - thresholdPixelCount))
+
+# Function that simulates the samples of a sweep through the edge at a velocity
+def simulateSweep(velocity,randomState):
+    # The sweep starts 20 frames before the edge with a random frame phase
+    startPosition = trueEdgePosition - velocity * (20 + randomState.uniform()) / frameRate
+    sampleTimes = np.arange(60) / frameRate
+    positions = startPosition + velocity * sampleTimes
+    pixelCounts = np.maximum(edgeProfile(positions) + randomState.normal(0,pixelCountNoise,len(positions)),0)
+    return sampleTimes, positions, pixelCounts
+
+def main():
+    randomState = np.random.RandomState(0)
+    edgeDetectors = [(edgeFit,TLEdgeDetection.EdgeDetector(thresholdPixelCount,edgeFit)) for edgeFit in ('interpolate','linear','sigmoid')]
+
+    print('Velocity [mm/s] | sweep time [s] | RMS edge position error [um]: first frame, ' + ', '.join(edgeFit for (edgeFit, edgeDetector) in edgeDetectors))
+    for velocity in sweepVelocities:
+        errors = dict((name,[]) for name in ['first frame'] + [edgeFit for (edgeFit, edgeDetector) in edgeDetectors])
+        for sweep in range(numberOfSweeps):
+            (sampleTimes, positions, pixelCounts) = simulateSweep(velocity,randomState)
+
+            # Previous detection, the position of the first frame above the threshold
+            firstFrame = np.flatnonzero(pixelCounts > thresholdPixelCount)[0]
+            errors['first frame'].append(positions[firstFrame] - trueEdgePosition)
+
+            for (edgeFit, edgeDetector) in edgeDetectors:
+                (crossingTime, crossingIndex) = edgeDetector.findEdge(sampleTimes,pixelCounts,'begin')
+                errors[edgeFit].append(np.interp(crossingTime,sampleTimes,positions) - trueEdgePosition)
+
+        rmsErrors = [1000 * np.sqrt(np.mean(np.square(errors[name]))) for name in ['first frame'] + [edgeFit for (edgeFit, edgeDetector) in edgeDetectors]]
+        print('{:.4f} | {:.1f} | '.format(velocity,sweepDistance / velocity) + ', '.join('{:.3f}'.format(rmsError) for rmsError in rmsErrors))
+
+if __name__ == '__main__':
+    main()
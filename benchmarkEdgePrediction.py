@@ -0,0 +1,64 @@
+'''
+Simulation benchmark for the predicted-edge seeding of the routine passes.
+The passes of tipLocatorRoutine are simulated on a cone whose cross section is a circle that grows down the cone,
+with noise on the recorded edges. The distance the stages scan along x on each pass (from the start point to side 2)
+is reported without seeding (every pass starts cold at x_start) and with the start point and sweep length seeded
+from the cone fit of the previous passes, along with the error of the predicted sides.
+'''
+
+## Imports
+# Built in modules
+import numpy as np
+# Custom modules
+import TLEdgePrediction
+
+# Starting location of the routine and z offsets of the passes [mm]
+(x_start, y_start, z_start) = (73.7, 35.0, -1.0)
+passOffsets = [0.0,-0.005,-0.008]
+# Cone center in the x-z plane, radius at y_start [mm] and slope of the laser beam
+(coneCenter_X, coneCenter_Z, coneRadius) = (74.2, -0.97, 0.08)
+laserSlope = 25e-3
+# Noise on the recorded edge positions [mm]
+edgeNoise = 0.0005
+# Distance swept when the pass is not seeded [mm]
+movementDistance = 1.0
+# Velocity scheduler window parameters used by the seeding
+(safetyFactor, minimumWindow) = (2.0, 0.005)
+
+# Function that returns the side 1, side 2 and top edges of a pass at y and z
+def passEdges(y,z,randomState):
+    radius = coneRadius - laserSlope * (y - y_start)
+    halfChord = np.sqrt(radius**2 - (z - coneCenter_Z)**2)
+    noise = randomState.normal(0,edgeNoise,3)
+    return [[coneCenter_X - halfChord + noise[0],y,z],[coneCenter_X + halfChord + noise[1],y,z],[coneCenter_X,y,coneCenter_Z - radius + noise[2]]]
+
+def main():
+    randomState = np.random.RandomState(0)
+    edgePredictor = TLEdgePrediction.EdgePredictor(laserSlope)
+
+    print('Pass | y [mm] | z [mm] | scan distance cold [mm] | scan distance seeded [mm] | side prediction error [um]')
+    (totalCold, totalSeeded) = (0.0, 0.0)
+    # Three passes at y_start and three at the y position of the target radius
+    for (passNumber, (y, z)) in enumerate([(y_start,z_start + offset) for offset in passOffsets] + [(y_start - 0.8,z_start + offset) for offset in passOffsets]):
+        edges = passEdges(y,z,randomState)
+
+        # The cold pass scans from x_start to side 2
+        scanCold = edges[1][0] - x_start
+        predictedEdges = edgePredictor.predictEdges(y,z)
+        if len(predictedEdges) == 0:
+            (scanSeeded, predictionError) = (scanCold, float('nan'))
+        else:
+            # The seeded pass starts at the window before the predicted side 1
+            (side1, side1Uncertainty) = predictedEdges['side 1']
+            seededStart = max(x_start,side1 - safetyFactor * max(side1Uncertainty,minimumWindow))
+            scanSeeded = edges[1][0] - seededStart
+            predictionError = 1000 * max(abs(side1 - edges[0][0]),abs(predictedEdges['side 2'][0] - edges[1][0]))
+
+        edgePredictor.addEdges(edges)
+        (totalCold, totalSeeded) = (totalCold + scanCold, totalSeeded + scanSeeded)
+        print('{} | {:.3f} | {:.3f} | {:.4f} | {:.4f} | {:.1f}'.format(passNumber + 1,y,z,scanCold,scanSeeded,predictionError))
+
+    print('Total scan distance: cold {:.3f} mm, seeded {:.3f} mm'.format(totalCold,totalSeeded))
+
+if __name__ == '__main__':
+    main()
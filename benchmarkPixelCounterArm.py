@@ -0,0 +1,82 @@
+'''
+Benchmark for the arm to first sample latency of the pixel counter.
+Compares spawning a new pixel counter process and queue for every detection (previous behavior of
+detectScatteringBegin/Ending) against arming the persistent pixel counter created in initializeEquipment.
+The capture engine is emulated by a thread that publishes pixel counts above the threshold into the sample ring.
+'''
+
+## Imports
+# Built in modules
+import multiprocessing
+import threading
+import time
+import timeit
+# Custom modules
+import TLPixelCounter
+import TLSampleRing
+import TLClock
+
+# Number of detections that are timed for each method
+numberOfDetections = 50
+# Pixel count threshold used by the system controller
+thresholdPixelCount = 10
+
+# Function that emulates the capture engine publishing pixel counts until scattering is detected
+def feedPixelCounts(sampleRing,event_scatteringDetected):
+    while not event_scatteringDetected.is_set():
+        sampleRing.publish(TLClock.monotonicTime(),thresholdPixelCount + 1)
+        time.sleep(0.0005)
+
+# Function that times a single detection from the arm command until the first sample reaches the system controller
+def timeDetection(sampleRing,event_scatteringDetected,armPixelCounter):
+    event_scatteringDetected.clear()
+    feederThread = threading.Thread(target=feedPixelCounts, args=(sampleRing,event_scatteringDetected))
+    feederThread.start()
+    startTime = timeit.default_timer()
+    queue_SCtoPixelCounter = armPixelCounter()
+    queue_SCtoPixelCounter.get()
+    latency = timeit.default_timer() - startTime
+    feederThread.join()
+    return latency
+
+def main():
+    sampleRing = TLSampleRing.SampleRing()
+    event_scatteringDetected = multiprocessing.Event()
+
+    ## Previous behavior, a new queue and process for every detection
+    spawnedProcesses = []
+    def spawnPixelCounter():
+        queue_SCtoPixelCounter = multiprocessing.Queue()
+        queue_pixelCounterCommands = multiprocessing.Queue()
+        queue_pixelCounterCommands.put(('arm','begin',thresholdPixelCount))
+        queue_pixelCounterCommands.put(('shutDown',))
+        routinePixelCounter = TLPixelCounter.PixelCounter(queue_SCtoPixelCounter,queue_pixelCounterCommands,sampleRing,event_scatteringDetected)
+        routinePixelCounterProcess = multiprocessing.Process(target=routinePixelCounter.run, args=())
+        routinePixelCounterProcess.daemon = True
+        routinePixelCounterProcess.start()
+        spawnedProcesses.append(routinePixelCounterProcess)
+        return queue_SCtoPixelCounter
+    spawnLatencies = [timeDetection(sampleRing,event_scatteringDetected,spawnPixelCounter) for i in range(numberOfDetections)]
+    for routinePixelCounterProcess in spawnedProcesses:
+        routinePixelCounterProcess.join()
+
+    ## Persistent pixel counter that is armed for every detection
+    queue_SCtoPixelCounter = multiprocessing.Queue()
+    queue_pixelCounterCommands = multiprocessing.Queue()
+    routinePixelCounter = TLPixelCounter.PixelCounter(queue_SCtoPixelCounter,queue_pixelCounterCommands,sampleRing,event_scatteringDetected)
+    routinePixelCounterProcess = multiprocessing.Process(target=routinePixelCounter.run, args=())
+    routinePixelCounterProcess.daemon = True
+    routinePixelCounterProcess.start()
+    def armPixelCounter():
+        queue_pixelCounterCommands.put(('arm','begin',thresholdPixelCount))
+        return queue_SCtoPixelCounter
+    armLatencies = [timeDetection(sampleRing,event_scatteringDetected,armPixelCounter) for i in range(numberOfDetections)]
+    queue_pixelCounterCommands.put(('shutDown',))
+    routinePixelCounterProcess.join()
+
+    for (name, latencies) in (('New process per detection',spawnLatencies),('Persistent pixel counter',armLatencies)):
+        latencies = sorted(latencies)
+        print('{}: mean {:.2f} ms, median {:.2f} ms, max {:.2f} ms'.format(name,1000*sum(latencies)/len(latencies),1000*latencies[len(latencies)//2],1000*latencies[-1]))
+
+if __name__ == '__main__':
+    main()
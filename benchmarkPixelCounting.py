@@ -0,0 +1,87 @@
+'''
+Benchmark that compares the frames per second of the red pixel counting engine (whole frame and region of
+interest) against the SimpleCV processing chain that was used in TLUI.processVideo.
+Synthetic 640x480 frames with a red scattering spot are used so the benchmark can be run without the camera.
+'''
+
+## Imports
+# Built in modules
+import timeit
+import numpy as np
+# Custom modules
+import TLRedPixelCounter
+
+# Size of the frames produced by the camera
+frameHeight = 480
+frameWidth = 640
+# Threshold value used by the UI
+thresholdValue = 0.15
+# Number of frames processed for each counting path
+numberOfFrames = 500
+
+# Function that creates a BGR frame with a red scattering spot in the center
+def createFrame():
+    frame = np.random.randint(0,30,(frameHeight,frameWidth,3)).astype(np.uint8)
+    rows, columns = np.ogrid[:frameHeight,:frameWidth]
+    spot = (rows - frameHeight/2)**2 + (columns - frameWidth/2)**2 < 40**2
+    frame[spot,2] = 200
+    return frame
+
+# Function that counts the pixels the same way the previous SimpleCV chain did
+def countPixelsSimpleCV(frame):
+    import SimpleCV
+    import cv2
+    videoFeed = SimpleCV.Image(frame,cv2image=True)
+    videoFeedBlank = videoFeed * 0
+    (redVideoChannel, greenVideoChannel, blueVideoChannel) = videoFeed.splitChannels()
+    videoFeedConverted = videoFeedBlank.mergeChannels(redVideoChannel,redVideoChannel,redVideoChannel)
+    videoFeedConverted = videoFeedConverted.binarize(255 * thresholdValue).invert()
+    pixelSumMatrix = videoFeedConverted.getNumpy()
+    return cv2.countNonZero(pixelSumMatrix[:,:,0])
+
+# Function that reproduces the full frame allocations of the SimpleCV chain with NumPy (used when SimpleCV is not installed)
+def countPixelsChainEmulated(frame):
+    videoFeedBlank = frame * 0
+    redVideoChannel = frame[:,:,2].copy()
+    greenVideoChannel = frame[:,:,1].copy()
+    blueVideoChannel = frame[:,:,0].copy()
+    videoFeedConverted = np.dstack((redVideoChannel,redVideoChannel,redVideoChannel)) + videoFeedBlank
+    videoFeedConverted = np.where(videoFeedConverted > 255 * thresholdValue,0,255).astype(np.uint8)
+    videoFeedConverted = 255 - videoFeedConverted
+    pixelSumMatrix = videoFeedConverted.transpose(1,0,2).copy()
+    return int(np.count_nonzero(pixelSumMatrix[:,:,0]))
+
+# Function that times a counting function and returns the frames per second and last count
+def timeCountingPath(countFunction,frames):
+    startTime = timeit.default_timer()
+    for frame in frames:
+        pixelSum = countFunction(frame)
+    elapsedTime = timeit.default_timer() - startTime
+    return len(frames)/elapsedTime, pixelSum
+
+def main():
+    frames = [createFrame() for i in range(10)] * (numberOfFrames // 10)
+
+    # Picks the previous processing chain, SimpleCV if it is available
+    try:
+        import SimpleCV
+        previousPath = ('SimpleCV chain',countPixelsSimpleCV)
+    except ImportError:
+        previousPath = ('SimpleCV chain (NumPy emulation)',countPixelsChainEmulated)
+
+    redPixelCounter = TLRedPixelCounter.RedPixelCounter(thresholdValue)
+
+    # Counting engine that learns the region of interest from the scattering spot in the first frame
+    regionPixelCounter = TLRedPixelCounter.RedPixelCounter(thresholdValue,autoRegionOfInterest=True)
+
+    (previousFramesPerSecond, previousCount) = timeCountingPath(previousPath[1],frames)
+    (engineFramesPerSecond, engineCount) = timeCountingPath(redPixelCounter.countRedPixels,frames)
+    (regionFramesPerSecond, regionCount) = timeCountingPath(regionPixelCounter.countRedPixels,frames)
+
+    print('{}: {:.1f} frames/s ({} pixels)'.format(previousPath[0],previousFramesPerSecond,previousCount))
+    print('Red pixel counting engine: {:.1f} frames/s ({} pixels)'.format(engineFramesPerSecond,engineCount))
+    print('Red pixel counting engine with learned region of interest {}: {:.1f} frames/s ({} pixels)'.format(regionPixelCounter.retrieveRegionOfInterest(),regionFramesPerSecond,regionCount))
+    print('Speed up: {:.1f}x, {:.1f}x with region of interest'.format(engineFramesPerSecond/previousFramesPerSecond,regionFramesPerSecond/previousFramesPerSecond))
+
+if __name__ == '__main__':
+    main()
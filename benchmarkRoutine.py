@@ -0,0 +1,198 @@
+'''
+End to end benchmark of the tip locator routines.
+Runs SystemController.tipLocatorRoutine, tipLocatorRoutine_PrecisionTest and tipLocatorRoutine_FocalPoint against
+a TLXPSSimulator server (through the real XPS driver and sockets) and a TLSyntheticCamera feeding the capture engine,
+the shared sample ring and the pixel counter process, and prints the results as JSON.
+For each routine the total time, the time of each collectDataPoint and the time the routine thread spent in moves,
+aborts, sleeps, detection, fitting and stage queries are reported with the XPS round trips, the detection latency
+and the distance of the recorded edges to the synthetic cone.
+Each routine has its own cone, placed so that every pass finds its edges, and the stages of the routines with slow
+hard coded velocities run faster than the real time (timeScale), the camera, the detection and the sleeps do not.
+The sweeps run on their own threads, so their time is part of the detection the routine thread waits on.
+tipLocatorRoutine stops adding levels once its fits converge, so its number of data points can change between runs.
+The data file of each routine is not written (retrieveDataPoints is skipped) so data/ keeps only the lab routines.
+
+Run with the names of the routines to benchmark, all three by default.
+'''
+
+## Imports
+# Built in modules
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import numpy as np
+# Custom modules
+import TLCaptureEngine
+import TLCircleFit
+import TLClock
+import TLParameters
+import TLRedPixelCounter
+import TLSampleRing
+import TLSyntheticCamera
+import TLSystemController
+import TLXPSSimulator
+import TLXYZStages
+
+# Port and reply latency [s] of the XPS simulator
+simulatorPort = 5011
+simulatorLatency = 0.0005
+# Frame rate [frames/s] and size of the synthetic camera, small frames keep the rendering out of the way of the routine
+cameraFrameRate = 100.0
+cameraFrameSize = (120,160)
+cameraSpotRadius = 3.0
+# Pixel count that triggers a scattering event and the threshold of the red pixels
+thresholdPixelCount = 10
+thresholdValue = 0.15
+
+# Routine of each scenario with the laser cone of the synthetic camera (focal point, axis, focal length and radius
+# of the light entering the lens [mm]), the position the stages start at and how much faster the stages run than the real time
+# The focal point routine sweeps on both sides of the focal point (its first pass at y = -10, the others at y = -6 to -8),
+# so its cone is tilted and the first pass crosses the other nappe
+scenarios = {
+    'tipLocatorRoutine': {'focalPoint':(73.8,37.0,-0.96),'axis':(0.0,1.0,0.0),'focalLength':10.0,'radius':0.25,'startPosition':(73.7,35.0,-1.0),'timeScale':1.0},
+    'tipLocatorRoutine_PrecisionTest': {'focalPoint':(73.52,34.0,-1.15),'axis':(0.0,1.0,0.0),'focalLength':10.0,'radius':0.25,'startPosition':(73.4,30.0,-1.15),'timeScale':10.0},
+    'tipLocatorRoutine_FocalPoint': {'focalPoint':(40.65,-7.5,4.61),'axis':(-0.5,1.0,-0.04),'focalLength':10.0,'radius':1.6,'startPosition':(41.55,-10.0,4.27),'timeScale':1000.0},
+}
+routineNames = ['tipLocatorRoutine','tipLocatorRoutine_PrecisionTest','tipLocatorRoutine_FocalPoint']
+
+# Time spent by the routine thread in each phase, a phase called inside another one is counted in the outer phase only
+class PhaseTimer():
+    def __init__(self):
+        self.routineThread = threading.current_thread()
+        self.phaseTimes = {}
+        self._depth = 0
+
+    # Method that returns the function timed under the phase name when it is called by the routine thread
+    def wrap(self,phaseName,function):
+        def timedFunction(*args,**kwargs):
+            if threading.current_thread() is not self.routineThread or self._depth > 0:
+                return function(*args,**kwargs)
+            self._depth += 1
+            startTime = TLClock.monotonicTime()
+            try:
+                return function(*args,**kwargs)
+            finally:
+                self.phaseTimes[phaseName] = self.phaseTimes.get(phaseName,0.0) + TLClock.monotonicTime() - startTime
+                self._depth -= 1
+        return timedFunction
+
+# Stand-in for the time module of the system controller that times its sleeps
+class TimedTimeModule():
+    def __init__(self,phaseTimer):
+        self.sleep = phaseTimer.wrap('sleep',time.sleep)
+
+    def __getattr__(self,name):
+        return getattr(time,name)
+
+# Function that returns the function with the duration of each of its calls appended to a list
+def recordDurations(function,durations):
+    def recordedFunction(*args,**kwargs):
+        startTime = TLClock.monotonicTime()
+        try:
+            return function(*args,**kwargs)
+        finally:
+            durations.append(TLClock.monotonicTime() - startTime)
+    return recordedFunction
+
+# Function that times the stages, detection and fitting methods of the system controller
+def instrumentSystemController(systemController,phaseTimer,collectDataPointTimes,detectionLatencies):
+    stages = systemController.substrateStages
+    for methodName in ('moveStageAbsolute','moveStageRelative'):
+        setattr(stages,methodName,phaseTimer.wrap('move',getattr(stages,methodName)))
+    stages.moveStageAbort = phaseTimer.wrap('abort',stages.moveStageAbort)
+    for methodName in ('retrieveStagePosition','updateStageVelocity'):
+        setattr(stages,methodName,phaseTimer.wrap('stageQueries',getattr(stages,methodName)))
+
+    # The latency is the time from the capture of the detecting frame to the detection reaching the routine
+    for methodName in ('detectScatteringBegin','detectScatteringEnding'):
+        def detect(detectMethod=getattr(systemController,methodName)):
+            pixelCount = detectMethod()
+            detectionLatencies.append(TLClock.monotonicTime() - systemController.lastScatteringTime)
+            return pixelCount
+        setattr(systemController,methodName,phaseTimer.wrap('detection',detect))
+
+    systemController.coneFit.fit = phaseTimer.wrap('fitting',systemController.coneFit.fit)
+    systemController.edgePredictor.addEdges = phaseTimer.wrap('fitting',systemController.edgePredictor.addEdges)
+    systemController.collectDataPoint = recordDurations(systemController.collectDataPoint,collectDataPointTimes)
+    # Keeps the data folder for the routines of the lab
+    systemController.retrieveDataPoints = lambda: None
+
+# Function that runs a routine against the simulated stages and camera and returns its results
+def benchmarkRoutine(routineName):
+    scenario = scenarios[routineName]
+
+    # Simulated XPS system, the stages of the system controller connect to it
+    simulator = TLXPSSimulator.XPSSimulator('127.0.0.1',simulatorPort,simulatorLatency,scenario['timeScale'],scenario['startPosition'])
+    simulator.startInBackground()
+    (TLXYZStages.XPSAddress, TLXYZStages.XPSPort) = ('127.0.0.1', simulatorPort)
+
+    systemController = TLSystemController.SystemController(thresholdPixelCount,multiprocessing.Queue(),multiprocessing.Queue(),TLSampleRing.SampleRing(),multiprocessing.Event())
+    systemController.initializeEquipment()
+
+    # Synthetic camera that renders the cone from the simulated stage position
+    camera = TLSyntheticCamera.SyntheticCamera(simulator.currentPositions,scenario['focalPoint'],scenario['axis'],scenario['focalLength'],scenario['radius'],frameRate=cameraFrameRate,frameSize=cameraFrameSize,spotRadius=cameraSpotRadius,randomState=np.random.RandomState(0))
+    captureEngine = TLCaptureEngine.CaptureEngine(TLRedPixelCounter.RedPixelCounter(thresholdValue),camera=camera)
+    captureEngine.subscribe(systemController.sampleRing.publish)
+    captureEngine.start()
+
+    # Times the phases of the routine thread, the circle fits are timed on the class as the routine creates its own fitter
+    phaseTimer = PhaseTimer()
+    (collectDataPointTimes, detectionLatencies) = ([], [])
+    instrumentSystemController(systemController,phaseTimer,collectDataPointTimes,detectionLatencies)
+    (previousTimeModule, previousFitCircle) = (TLSystemController.time, TLCircleFit.CircleFit.fitCircle)
+    TLSystemController.time = TimedTimeModule(phaseTimer)
+    TLCircleFit.CircleFit.fitCircle = phaseTimer.wrap('fitting',TLCircleFit.CircleFit.fitCircle)
+
+    # Runs the routine with its printing discarded
+    (roundTripCountStart, commandCountStart, frameCountStart) = (systemController.substrateStages.retrieveRoundTripCount(), simulator.commandCount, camera.frameCount)
+    standardOutput = sys.stdout
+    sys.stdout = open(os.devnull,'w')
+    try:
+        startTime = TLClock.monotonicTime()
+        getattr(systemController,routineName)()
+        totalTime = TLClock.monotonicTime() - startTime
+    finally:
+        sys.stdout.close()
+        sys.stdout = standardOutput
+        (TLSystemController.time, TLCircleFit.CircleFit.fitCircle) = (previousTimeModule, previousFitCircle)
+    roundTrips = systemController.substrateStages.retrieveRoundTripCount() - roundTripCountStart
+
+    # Distance of the recorded edges to the surface of the cone
+    points = TLParameters.kHNSCTL_dataStore.positions()
+    edgeErrors = np.array([camera.distanceToCone(point) for point in points])
+
+    # Stops the pixel counter, the camera and the simulator
+    captureEngine.stop()
+    systemController.shutDown()
+    simulator.shutdown()
+    simulator.server_close()
+
+    phaseTimes = dict((phaseName, round(phaseTime,4)) for (phaseName, phaseTime) in phaseTimer.phaseTimes.items())
+    phaseTimes['other'] = round(totalTime - sum(phaseTimer.phaseTimes.values()),4)
+    return {
+        'timeScale': scenario['timeScale'],
+        'totalTime': round(totalTime,3),
+        'dataPoints': len(points),
+        'timePerDataPoint': round(totalTime / max(len(points),1),4),
+        'collectDataPoint': {'calls': len(collectDataPointTimes), 'meanTime': round(float(np.mean(collectDataPointTimes)),4) if collectDataPointTimes else None, 'times': [round(collectTime,4) for collectTime in collectDataPointTimes]},
+        'phaseTimes': phaseTimes,
+        'xpsRoundTrips': roundTrips,
+        'xpsCommands': simulator.commandCount - commandCountStart,
+        'detections': len(detectionLatencies),
+        'detectionLatency': {'mean': round(float(np.mean(detectionLatencies)),4), 'max': round(float(np.max(detectionLatencies)),4)} if detectionLatencies else None,
+        'frames': camera.frameCount - frameCountStart,
+        'edgeErrorRMS': round(float(np.sqrt(np.mean(edgeErrors**2))),6) if len(edgeErrors) else None,
+    }
+
+def main():
+    selectedRoutines = sys.argv[1:] if len(sys.argv) > 1 else routineNames
+    results = {}
+    for routineName in selectedRoutines:
+        results[routineName] = benchmarkRoutine(routineName)
+    print(json.dumps(results,indent=2,sort_keys=True))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+'''
+Benchmark that counts the XPS round trips made by the data point collection of a tip locator routine
+(six passes of collectDataPoint, as in tipLocatorRoutine).
+The previous behavior (new stage connection per pass, three SGamma reads and three writes for every velocity
+change) is compared against the shared stage session with cached SGamma parameters.
+The XPS system is replaced by a stand-in that counts the commands, and scattering is detected immediately.
+'''
+
+## Imports
+# Built in modules
+import multiprocessing
+# Custom modules
+import XPS_Q8_drivers
+import TLXYZStages
+import TLSystemController
+import TLSampleRing
+
+# Number of collectDataPoint passes in a routine
+routinePasses = 6
+
+# Stand-in for the XPS system that counts the round trips and connections
+class CountingXPS():
+    roundTrips = 0
+    connections = 0
+
+    def __init__(self):
+        pass
+    def RoundTripCountGet(self):
+        return CountingXPS.roundTrips
+    def TCP_ConnectToServer(self, IP, port, timeOut):
+        CountingXPS.connections += 1
+        return CountingXPS.connections
+    def TCP_CloseSocket(self, socketId):
+        pass
+    def _command(self, *reply):
+        CountingXPS.roundTrips += 1
+        return [0] + list(reply)
+    def PositionerSGammaParametersGet(self, socketId, PositionerName):
+        return self._command(0.1, 10.0, 0.005, 0.05)
+    def PositionerSGammaParametersSet(self, socketId, PositionerName, Velocity, Acceleration, MinimumTjerkTime, MaximumTjerkTime):
+        return self._command('')
+    def GroupMoveAbsolute(self, socketId, GroupName, TargetPosition):
+        return self._command('')
+    def GroupMoveRelative(self, socketId, GroupName, TargetDisplacement):
+        return self._command('')
+    def GroupMoveAbort(self, socketId, GroupName):
+        return self._command('')
+    def GroupPositionCurrentGet(self, socketId, GroupName, nbElement):
+        return self._command(*([1.0] * nbElement))
+    def GroupStatusGet(self, socketId, GroupName):
+        return self._command(12)
+    def GroupMoveAbortBatch(self, socketId, GroupNames):
+        CountingXPS.roundTrips += 1
+        return [[0, ''] for GroupName in GroupNames]
+    def GroupPositionCurrentGetBatch(self, socketId, GroupNames, nbElement):
+        CountingXPS.roundTrips += 1
+        return [[0] + [1.0] * nbElement for GroupName in GroupNames]
+    def GroupMotionStatusGetBatch(self, socketId, GroupNames, nbElement):
+        CountingXPS.roundTrips += 1
+        return [[0] + [0] * nbElement for GroupName in GroupNames]
+
+# Stages that update the velocity the way they did before the SGamma parameters were cached
+class PreviousXYZStages(TLXYZStages.XYZStages):
+    def updateStageVelocity(self,velocity,positioners=None):
+        self._sGammaParameters = {}
+        self._positionerVelocities = {}
+        TLXYZStages.XYZStages.updateStageVelocity(self,velocity)
+
+# Function that runs the routine passes and returns the number of round trips and connections
+def countRoutine(previousBehavior):
+    CountingXPS.roundTrips = 0
+    CountingXPS.connections = 0
+
+    systemController = TLSystemController.SystemController(10,multiprocessing.Queue(),multiprocessing.Queue(),TLSampleRing.SampleRing(),multiprocessing.Event())
+    systemController.startPixelCounter = lambda: None
+    systemController.initializeEquipment()
+    # Scattering is detected as soon as the detection is started
+    systemController.detectScatteringBegin = lambda: systemController.thresholdPixelCount
+    systemController.detectScatteringEnding = lambda: systemController.thresholdPixelCount
+
+    if previousBehavior:
+        # Every pass created and initialized its own stages
+        def acquireNewStages():
+            stages = PreviousXYZStages()
+            stages.initializeStages()
+            return stages
+        systemController.stageSession.acquireStages = acquireNewStages
+
+    for i in range(routinePasses):
+        systemController.collectDataPoint([73.7,35,-1],systemController.substrateStages.positioner_X,[1])
+
+    return CountingXPS.roundTrips, CountingXPS.connections
+
+def main():
+    XPS_Q8_drivers.XPS = CountingXPS
+
+    (previousRoundTrips, previousConnections) = countRoutine(True)
+    (sessionRoundTrips, sessionConnections) = countRoutine(False)
+
+    print('Previous behavior: {} XPS round trips, {} socket connections for {} passes'.format(previousRoundTrips,previousConnections,routinePasses))
+    print('Stage session with cached SGamma parameters: {} XPS round trips, {} socket connections for {} passes'.format(sessionRoundTrips,sessionConnections,routinePasses))
+
+if __name__ == '__main__':
+    main()
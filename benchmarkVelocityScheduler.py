@@ -0,0 +1,99 @@
+'''
+Simulation benchmark for the velocity scheduler of collectDataPoint.
+A routine of passes is simulated, each finding side 1, side 2 and the top of the cone with a coarse pass, a
+backup and a precise pass. The frame rate and detection latency of the camera are modelled and the stages are
+taken to stop where they are when the detection reaches the system controller.
+The routine wall time and the position error of the recorded edges are reported for the previous fixed
+velocities and for the velocity scheduler at several target resolutions.
+'''
+
+## Imports
+# Built in modules
+import math
+import numpy as np
+# Custom modules
+import TLVelocityScheduler
+
+# Camera frame interval and detection latency [s]
+frameInterval = 1 / 30.0
+detectionLatency = 0.05
+# Time to settle after an abort and overhead of each move command [s]
+settleTime = 0.1
+moveOverhead = 0.05
+# Velocity of the quick moves [mm/s]
+velocityMovement = 0.1
+# Number of passes (collectDataPoint calls) in the routine
+routinePasses = 6
+# Width of the cone and distance from the midpoint to the top [mm]
+coneWidth = 0.12
+topDistance = 0.05
+
+# Function that simulates a pass along an axis from the start location to the edge at the velocity
+# Returns the time the pass took and the location the stages stopped at
+def simulatePass(startLocation,edgeLocation,velocity,randomState):
+    # Time the stages cross the edge and the first frame after it (random frame phase)
+    if edgeLocation <= startLocation:
+        crossingTime = 0.0
+    else:
+        crossingTime = (edgeLocation - startLocation) / velocity
+    framePhase = randomState.uniform(0,frameInterval)
+    detectionTime = framePhase + frameInterval * math.ceil((crossingTime - framePhase) / frameInterval) + detectionLatency
+    return detectionTime + settleTime + moveOverhead, startLocation + velocity * detectionTime
+
+# Function that simulates finding an edge with a coarse pass, a backup and a precise pass
+# Returns the time taken and the location recorded for the edge
+def simulateFindEdge(startLocation,edgeLocation,plan,randomState):
+    (approachDistance, coarseVelocity, backupDistance, preciseVelocity) = plan
+    passTime = 0.0
+
+    # Quick approach to the window around the predicted edge
+    if approachDistance > 0:
+        passTime += approachDistance / velocityMovement + moveOverhead
+        startLocation += approachDistance
+
+    # Coarse pass, backup and precise pass
+    (coarseTime, stopLocation) = simulatePass(startLocation,edgeLocation,coarseVelocity,randomState)
+    passTime += coarseTime + backupDistance / velocityMovement + moveOverhead
+    (preciseTime, recordedLocation) = simulatePass(stopLocation - backupDistance,edgeLocation,preciseVelocity,randomState)
+    return passTime + preciseTime, recordedLocation
+
+# Function that simulates a routine, planPass(edgeName, startLocation) returns the plan of each pass
+# and recordEdge(edgeName, location) is told where each edge was found
+def simulateRoutine(planPass,recordEdge,randomState):
+    routineTime = 0.0
+    errors = []
+    for passNumber in range(routinePasses):
+        # The cone moves a little between the passes as the stages step down it
+        side1 = 0.3 + 0.002 * passNumber + randomState.normal(0,0.001)
+        side2 = side1 + coneWidth - 0.001 * passNumber
+        top = topDistance + 0.0005 * passNumber
+
+        # Side 1 is searched from the starting location, side 2 from where side 1 was found and the top from the midpoint
+        for (edgeName, startLocation, edgeLocation) in (('side 1',0.0,side1),('side 2',side1,side2),('top',0.0,top)):
+            (passTime, recordedLocation) = simulateFindEdge(startLocation,edgeLocation,planPass(edgeName,startLocation),randomState)
+            recordEdge(edgeName,recordedLocation)
+            routineTime += passTime
+            errors.append(recordedLocation - edgeLocation)
+
+    return routineTime, 1000 * math.sqrt(np.mean(np.square(errors)))
+
+def main():
+    print('Velocities | routine wall time [s] | RMS edge position error [um]')
+
+    # Previous fixed velocities and backup distance, as run (the precise pass ran at the initial velocity) and as intended
+    for (name, coarseVelocity, preciseVelocity) in (('Previous, 0.005 mm/s coarse and precise',0.005,0.005),('Fixed, 0.005 mm/s coarse, 0.001 mm/s precise',0.005,0.001)):
+        fixedPlan = lambda edgeName, startLocation: (0.0,coarseVelocity,0.025,preciseVelocity)
+        (routineTime, rmsError) = simulateRoutine(fixedPlan,lambda edgeName, location: None,np.random.RandomState(0))
+        print('{} | {:.1f} | {:.3f}'.format(name,routineTime,rmsError))
+
+    # Velocity scheduler with the measured frame rate and latency
+    for targetResolution in (0.00003,0.0001,0.0003):
+        velocityScheduler = TLVelocityScheduler.VelocityScheduler(targetResolution=targetResolution,maximumVelocity=velocityMovement)
+        velocityScheduler.updateFrameRate(frameInterval * np.arange(30))
+        velocityScheduler.detectionLatency = detectionLatency
+        planPass = lambda edgeName, startLocation: velocityScheduler.planPass(edgeName,startLocation,1)
+        (routineTime, rmsError) = simulateRoutine(planPass,velocityScheduler.recordEdge,np.random.RandomState(0))
+        print('Velocity scheduler, {} um target resolution | {:.1f} | {:.3f}'.format(1000 * targetResolution,routineTime,rmsError))
+
+if __name__ == '__main__':
+    main()
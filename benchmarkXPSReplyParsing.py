@@ -0,0 +1,62 @@
+'''
+Micro-benchmark for the parsing of the XPS replies polled during every scan
+(GroupPositionCurrentGet, GroupMotionStatusGet, PositionerSGammaParametersGet).
+The previous parsing, which walked the reply one character at a time and eval'd each field, is compared
+against the typed reply parser of the driver, called through the usual getter methods.
+The replies are recorded reply strings played back by a stand-in transport, so no XPS system is needed.
+'''
+
+## Imports
+# Built in modules
+import timeit
+# Custom modules
+import XPS_Q8_drivers
+
+# Number of replies parsed for each getter
+numberOfReplies = 100000
+
+# Recorded replies (error, returned string) and the arguments of the getter that produced them
+recordedReplies = [
+    ('GroupPositionCurrentGet', ('XYZ.X', 1), [0, '73.70000138473']),
+    ('GroupPositionCurrentGet', ('XYZ', 3), [0, '73.70000138473,35.00000217438,-0.99999862148']),
+    ('GroupMotionStatusGet', ('XYZ.X', 1), [0, '0']),
+    ('PositionerSGammaParametersGet', ('XYZ.Z',), [0, '0.5,10,0.005,0.05']),
+    ]
+
+# Function that parses a reply the way the getters did before the typed reply parser
+def parseReplyEval(error, returnedString, nbValues):
+    if (error != 0):
+        return [error, returnedString]
+
+    i, j, retList = 0, 0, [error]
+    for paramNb in range(nbValues):
+        while ((i+j) < len(returnedString) and returnedString[i+j] != ','):
+            j += 1
+        retList.append(eval(returnedString[i:i+j]))
+        i, j = i+j+1, 0
+
+    return retList
+
+# Function that creates a driver whose transport plays back a recorded reply
+def createPlaybackXPS(reply):
+    XPSSystem = XPS_Q8_drivers.XPS()
+    XPSSystem._XPS__usedSockets[0] = 1
+    XPSSystem._XPS__sendAndReceive = lambda socketId, command: reply
+    return XPSSystem
+
+def main():
+    for (APIName, arguments, reply) in recordedReplies:
+        XPSSystem = createPlaybackXPS(reply)
+        getter = getattr(XPSSystem, APIName)
+        nbValues = len(reply[1].split(','))
+
+        # Both parsings must give the same values
+        assert parseReplyEval(reply[0], reply[1], nbValues) == getter(0, *arguments)
+
+        evalTime = timeit.timeit(lambda: parseReplyEval(reply[0], reply[1], nbValues), number=numberOfReplies)
+        typedTime = timeit.timeit(lambda: getter(0, *arguments), number=numberOfReplies)
+
+        print('{} {}: eval parsing {:.2f} us/reply, typed reply parser {:.2f} us/reply ({:.1f}x)'.format(APIName, reply[1], 1e6 * evalTime / numberOfReplies, 1e6 * typedTime / numberOfReplies, evalTime / typedTime))
+
+if __name__ == '__main__':
+    main()
@@ -9,29 +9,29 @@ from scipy import ndimage
 import numpy as np
 import cv2
 import time
+import TLRedPixelCounter
+import TLSyntheticCamera
 
 processVideoRunning = True
-camera = SimpleCV.Camera(0)
+# Renders the frames from the laser cone and a fixed tip position instead of using the camera
+useSyntheticCamera = False
+if useSyntheticCamera:
+    # Tip a micron inside the edge of the light, 1 mm from the focal point
+    camera = TLSyntheticCamera.SyntheticCamera(lambda: (0.049,1.0,0.0),frameRate=10.0)
+else:
+    camera = SimpleCV.Camera(0)
 thresholdValue = 0.15
+# Region of interest as (top, bottom, left, right), None learns it from the first scattering blob
+regionOfInterest = None
+redPixelCounter = TLRedPixelCounter.RedPixelCounter(thresholdValue,regionOfInterest=regionOfInterest,autoRegionOfInterest=regionOfInterest is None)
 
 
 while processVideoRunning:
     # print('Inside processVideo loop')
     # Creates the video feed form the camera for processing
     videoFeed = camera.getImage()
-    # Creates a blank video feed for merging desired channel into
-    videoFeedBlank = videoFeed * 0
-    # Splits the video into its three color channels
-    (redVideoChannel, greenVideoChannel, blueVideoChannel) = videoFeed.splitChannels()
-    # Merges the red video channel into all three color channels of blank video feed to create grayscale video
-    videoFeedConverted = videoFeedBlank.mergeChannels(redVideoChannel,redVideoChannel,redVideoChannel)
-    # Threasholds video based on the specified threshold value
-    videoFeedConverted = videoFeedConverted.binarize(255 * thresholdValue).invert()
-
-    # Creates a matrix of values for video feed
-    pixelSumMatrix = videoFeedConverted.getNumpy()
-    # Counts the number of elements in the matrix with a value greater than 0, this is the number of colored pixels
-    pixelSum = cv2.countNonZero(pixelSumMatrix[:,:,0])
+    # Counts the number of red pixels above the threshold value straight from the frame buffer
+    pixelSum = redPixelCounter.countRedPixels(videoFeed.getNumpyCv2())
     print(pixelSum)
     time.sleep(.1)
 